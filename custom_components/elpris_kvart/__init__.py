@@ -2,31 +2,76 @@
 """The Elpris Kvart integration."""
 
 import asyncio
+import bisect
 import logging
+from collections import Counter
+from collections.abc import Callable
 from datetime import date as DateObject
 from datetime import datetime as DateTimeObject
-from datetime import timedelta
+from datetime import timedelta, tzinfo
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
 
 from .const import (
     API_BASE_URL,
+    CONF_API_BASE_URL,
+    CONF_API_TOKEN,
+    CONF_HUB_ENABLED,
+    CONF_MEMORY_BUDGET_KB,
     CONF_PRICE_AREA,
+    CONF_PRICE_THRESHOLDS_ORE,
+    CONF_RETENTION_DAYS,
+    CONF_SURCHARGE_ORE,
     DAILY_FETCH_HOUR,
+    DEFAULT_MEMORY_BUDGET_KB,
     DEFAULT_PRICE_AREA,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_SURCHARGE_ORE,
     DOMAIN,
+    EXTRA_PRICE_COLUMNS,
     INTEGRATION_NAME,
+    MANUFACTURER,
+    MODEL,
     NORMAL_UPDATE_INTERVAL_HOURS,
     PLATFORMS,
+    PRICE_COLUMN_EUR,
+    PRICE_COLUMN_EXR,
+    RELOAD_OPTIONS,
     RETRY_INTERVAL_MINUTES,
+    ROLLING_WINDOWS_DAYS,
 )
+from .estimate import ESTIMATE_HISTORY_DAYS, PriceEstimate, async_estimate_day
+from .normalize import DataQuality, normalize_day
+from .rolling import RollingPriceStats
+from .snapshot import PriceSnapshot, rows_digest
+from .store import PriceCache
+from .timeline import SLOT_SECONDS, SlotTimeline
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# URLs whose last response (ETag, rows) is kept for revalidation
+ETAG_CACHE_SIZE = 4
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Elpris Kvart integration."""
+    from .services import async_setup_services
+    from .websocket_api import async_register_websocket_commands
+
+    async_register_websocket_commands(hass)
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Elpris Kvart from a config entry."""
@@ -36,24 +81,93 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     coordinator = ElprisDataUpdateCoordinator(hass, price_area, entry)
 
-    await coordinator.async_config_entry_first_refresh()
+    # Serve cached prices right away; the first network fetch runs in the
+    # background so a slow API never delays startup or fails the entry.
+    await coordinator.async_restore_cached_prices()
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    from .areas import get_area_store
+
+    entry.async_on_unload(get_area_store(hass).async_register(coordinator))
     entry.async_on_unload(entry.add_update_listener(options_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if thresholds := entry.options.get(CONF_PRICE_THRESHOLDS_ORE):
+        from .thresholds import ThresholdEventScheduler
+
+        scheduler = ThresholdEventScheduler(hass, coordinator, thresholds)
+        entry.async_on_unload(scheduler.async_start())
+
+    if entry.options.get(CONF_HUB_ENABLED):
+        from .hub import async_register_hub_view
+
+        async_register_hub_view(hass)
+
+    entry.async_create_background_task(
+        hass,
+        coordinator.async_refresh(),
+        f"{DOMAIN}_first_refresh_{price_area.lower()}",
+    )
+
     return True
 
 
 async def options_update_listener(hass: HomeAssistant, entry: ConfigEntry):
-    """Handle options update."""
+    """Handle options update.
+
+    Options that add or remove entities or helpers reload the entry; all
+    others are applied in place on the running coordinator, keeping its
+    prices and making no API calls.
+    """
+    coordinator: ElprisDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    changed = {
+        key
+        for key in entry.options.keys() | coordinator.applied_options.keys()
+        if entry.options.get(key) != coordinator.applied_options.get(key)
+    }
+    if changed & RELOAD_OPTIONS:
+        _LOGGER.debug(
+            f"Configuration options {sorted(changed)} for {entry.title} have "
+            "been updated, reloading integration."
+        )
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
     _LOGGER.debug(
-        f"Configuration options for {entry.title} have been updated, "
-        "reloading integration."
+        f"Applying configuration options {sorted(changed)} for {entry.title} "
+        "without reloading."
+    )
+    await coordinator.async_apply_options()
+
+
+def _is_number(value) -> bool:
+    """Return True for int/float column values (bool excluded)."""
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def get_coordinator_for_area(
+    hass: HomeAssistant, price_area: str
+) -> "ElprisDataUpdateCoordinator | None":
+    """Return the coordinator of the loaded entry for a price area."""
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if (
+            isinstance(coordinator, ElprisDataUpdateCoordinator)
+            and coordinator.price_area == price_area
+        ):
+            return coordinator
+    return None
+
+
+def device_info(entry: ConfigEntry, price_area: str) -> DeviceInfo:
+    """Return the device that all entities of an entry belong to."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=f"{INTEGRATION_NAME} ({price_area})",
+        manufacturer=MANUFACTURER,
+        model=f"{MODEL} ({price_area})",
+        entry_type=DeviceEntryType.SERVICE,
     )
-    await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -65,30 +179,60 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 class ElprisApi:
-    """Simple class to communicate with the ElprisetJustNu API."""
+    """Simple class to communicate with the ElprisetJustNu API.
+
+    The base URL may also point at another instance's hub, which serves
+    its cached prices in the same layout and needs an access token of that
+    instance. The token is never sent to the public API. Responses with an
+    ETag are kept for a few URLs and revalidated with If-None-Match.
+    """
 
-    def __init__(self, session, price_area: str):
+    def __init__(
+        self,
+        session,
+        price_area: str,
+        base_url: str = API_BASE_URL,
+        token: str | None = None,
+    ):
         """Initialize the API communication."""
         self._session = session
         self._price_area = price_area
+        self.base_url = base_url
+        self.token = token
+        self._etags: dict[str, tuple[str, list]] = {}
 
     async def get_prices(self, target_date: DateObject) -> list | None:
         """Fetch prices for a specific date and price area."""
         year = target_date.year
         month_day_str = target_date.strftime("%m-%d")
-        api_url = f"{API_BASE_URL}/{year}/{month_day_str}_{self._price_area}.json"
+        api_url = f"{self.base_url}/{year}/{month_day_str}_{self._price_area}.json"
         _LOGGER.debug(f"Requesting prices from: {api_url}")
 
+        headers = {}
+        if self.token and self.base_url != API_BASE_URL:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if (cached := self._etags.get(api_url)) is not None:
+            headers["If-None-Match"] = cached[0]
         try:
-            async with self._session.get(api_url, timeout=20) as response:
+            async with self._session.get(
+                api_url, headers=headers, timeout=20
+            ) as response:
                 if response.status == 404:
                     _LOGGER.info(
                         f"Prices not found (404) for {target_date} "
                         f"in area {self._price_area}."
                     )
                     return None
+                if response.status == 304 and cached is not None:
+                    _LOGGER.debug(f"Prices for {target_date} not modified")
+                    return cached[1]
                 response.raise_for_status()
                 data = await response.json()
+                if etag := response.headers.get("ETag"):
+                    self._etags.pop(api_url, None)
+                    if len(self._etags) >= ETAG_CACHE_SIZE:
+                        del self._etags[next(iter(self._etags))]
+                    self._etags[api_url] = (etag, data)
                 _LOGGER.debug(
                     f"Successfully fetched {len(data)} price points for {target_date}"
                 )
@@ -104,19 +248,95 @@ class ElprisApi:
         return None
 
 
-class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]]):
+class ElprisDataUpdateCoordinator(DataUpdateCoordinator[PriceSnapshot]):
     """Class to manage fetching and updating Elpris data."""
 
     def __init__(self, hass: HomeAssistant, price_area: str, entry: ConfigEntry):
         """Initialize the data update coordinator."""
-        self.api = ElprisApi(async_get_clientsession(hass), price_area)
+        self.api = ElprisApi(
+            async_get_clientsession(hass),
+            price_area,
+            entry.options.get(CONF_API_BASE_URL) or API_BASE_URL,
+            entry.options.get(CONF_API_TOKEN),
+        )
+        self.cache = PriceCache(hass, price_area)
         self.price_area = price_area
         self._entry = entry
 
-        self.all_prices: dict[DateObject, list] = {}
+        # In-memory working set, owned by the cache so it can be LRU-bounded.
+        self.all_prices: dict[DateObject, list] = self.cache.memory
+        self._last_prune_date: DateObject | None = None
         self.tomorrow_prices_successfully_fetched_for_date: DateObject | None = None
         self.last_api_call_timestamp: DateTimeObject | None = None
 
+        # Per-day slot timelines and prices aligned to them, rebuilt once per
+        # refresh so lookups are integer slot arithmetic on UTC epochs.
+        self._timelines: dict[DateObject, SlotTimeline] = {}
+        self.slot_prices: dict[DateObject, list[float | None]] = {}
+        # The other numeric columns (EUR price, exchange rate) on the same
+        # slots, for days whose rows carry them.
+        self.slot_columns: dict[str, dict[DateObject, list[float | None]]] = {
+            column: {} for column in EXTRA_PRICE_COLUMNS
+        }
+        self.hourly_prices: dict[DateObject, list[dict]] = {}
+        self._hour_of_slot: dict[DateObject, list[int | None]] = {}
+        # How each day's rows mapped onto its slots (resolution, duplicates,
+        # gaps), recomputed with the slots.
+        self.data_quality: dict[DateObject, DataQuality] = {}
+        # Per-day content versions: a day's version only changes when its
+        # rows do, keyed on a content hash and the time zone they map onto.
+        # Both are kept for evicted days, so a day reloaded unchanged from
+        # disk keeps its version; they are trimmed with the disk retention.
+        self.day_versions: dict[DateObject, int] = {}
+        self._day_keys: dict[DateObject, tuple[int, tzinfo]] = {}
+        self._day_version_counter = 0
+        # (day, version) of the published days, see published_days().
+        self._published_key: tuple | None = None
+        # Days kept in memory for open websocket subscriptions, counted per
+        # subscription, on top of the published days.
+        self._subscribed_days: Counter[DateObject] = Counter()
+        # Sorted price arrays per combination of days, built lazily once per
+        # refresh so rank lookups on each tick are a bisect.
+        self._sorted_prices: dict[tuple[DateObject, ...], list[float]] = {}
+        # Slot start epochs where the quarter price or the hourly aggregate
+        # changes; entities only wake at these instants and at midnight.
+        self._change_points: list[int] = []
+        self._hour_change_points: list[int] = []
+        # Bumped whenever the prices of a published day change; consumers
+        # key their caches on it. The snapshot is what the coordinator
+        # publishes as its data, so an unchanged refresh, an eviction or a
+        # historic day loaded for a query does not notify listeners.
+        self.data_version = 0
+        self.snapshot: PriceSnapshot | None = None
+        # Estimated prices for tomorrow from cached history, computed once
+        # per day in the background until the real prices are fetched.
+        self.estimate: PriceEstimate | None = None
+        self._estimate_pending: DateObject | None = None
+        # Target day and history versions of the last attempt that gave no
+        # estimate, so it is only retried once the history changes.
+        self._estimate_failed_key: tuple | None = None
+        # Rolling multi-day distributions, moved forward in the background
+        # when the date or the data version changes.
+        self.rolling = RollingPriceStats(ROLLING_WINDOWS_DAYS)
+        self._rolling_key: tuple[DateObject, int] | None = None
+
+        # Batched entity updates: values shared by all entities are computed
+        # once per refresh or price change, then every entity is written in
+        # a single callback.
+        self._entity_listeners: list[CALLBACK_TYPE] = []
+        self._unsub_entity_tick: CALLBACK_TYPE | None = None
+        self.current_price_sek: float | None = None
+        self.current_price_eur: float | None = None
+        self.current_exchange_rate: float | None = None
+        self.current_hour: dict | None = None
+        self._current_ranks: dict[tuple[DateObject, ...], tuple | None] = {}
+
+        # Options the running coordinator was set up or last updated with.
+        # Bumping options_version invalidates caches derived from options,
+        # such as price lists including the surcharge.
+        self.applied_options = dict(entry.options)
+        self.options_version = 0
+
         self._current_update_interval = timedelta(hours=NORMAL_UPDATE_INTERVAL_HOURS)
 
         super().__init__(
@@ -125,12 +345,37 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
             name=f"{INTEGRATION_NAME} ({self.price_area})",
             update_method=self._async_update_data,
             update_interval=self._current_update_interval,
+            always_update=False,
         )
 
+    async def async_restore_cached_prices(self) -> None:
+        """Load yesterday's, today's and tomorrow's prices from the cache."""
+        today_local_date = dt_util.now().date()
+        tomorrow_local_date = today_local_date + timedelta(days=1)
+        for day in (
+            today_local_date - timedelta(days=1),
+            today_local_date,
+            tomorrow_local_date,
+        ):
+            await self.cache.async_get_day(day)
+
+        if not self.all_prices:
+            _LOGGER.debug(f"No cached prices for {self.price_area}, waiting for API.")
+            return
+
+        if self.all_prices.get(tomorrow_local_date):
+            self.tomorrow_prices_successfully_fetched_for_date = tomorrow_local_date
+        self._rebuild_slot_prices()
+        _LOGGER.debug(
+            f"Restored cached prices for {self.price_area}: "
+            f"{sorted(self.all_prices.keys())}"
+        )
+        self.async_set_updated_data(self.snapshot)
+
     def _parse_and_validate_prices(
         self, raw_prices_list: list, expected_date: DateObject
     ) -> list:
-        """Parses raw price data, validates, and ensures SEK_per_kWh is float."""
+        """Parses raw price data, validates, and keeps numeric columns as floats."""
         parsed_prices = []
         if not isinstance(raw_prices_list, list):
             _LOGGER.warning(
@@ -165,6 +410,10 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
                 }
                 if time_end_str:
                     entry_to_add["time_end"] = time_end_str
+                # Keep the other numeric columns (EUR_per_kWh, EXR) too.
+                for key, value in item.items():
+                    if key not in entry_to_add and _is_number(value):
+                        entry_to_add[key] = float(value)
                 parsed_prices.append(entry_to_add)
 
             except (KeyError, ValueError, TypeError) as e:
@@ -177,7 +426,537 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
         parsed_prices.sort(key=lambda p: dt_util.parse_datetime(p["time_start"]))
         return parsed_prices
 
-    async def _async_update_data(self) -> dict[DateObject, list]:
+    def get_timeline(self, day: DateObject) -> SlotTimeline:
+        """Return the cached slot timeline for a local date."""
+        time_zone = dt_util.get_default_time_zone()
+        timeline = self._timelines.get(day)
+        if timeline is None or timeline.time_zone is not time_zone:
+            timeline = self._timelines[day] = SlotTimeline(day, time_zone)
+        return timeline
+
+    def locate_slot(self, timestamp: float) -> tuple[SlotTimeline, int]:
+        """Return the timeline and slot index containing a UTC timestamp."""
+        for timeline in self._timelines.values():
+            if timeline.contains(timestamp):
+                return timeline, timeline.slot_at(timestamp)
+        day = dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).date()
+        timeline = self.get_timeline(day)
+        return timeline, timeline.slot_at(timestamp)
+
+    @staticmethod
+    def published_days(today: DateObject) -> tuple[DateObject, ...]:
+        """Return the days whose prices are published: yesterday to tomorrow."""
+        return (today - timedelta(days=1), today, today + timedelta(days=1))
+
+    def _rebuild_slot_prices(self) -> None:
+        """Normalize the cached rows of each day onto its slot timeline.
+
+        A day is only normalized again when it was reloaded or its rows (by
+        content hash) or timeline changed, and only gets a new version in
+        the latter case. data_version, the change points and the published
+        snapshot only change when a published day was added, changed or
+        dropped, so refreshes that fetched nothing new, evictions and days
+        loaded for a historic query do no further work.
+        """
+        changed_days = set()
+        for day in [day for day in self.slot_prices if day not in self.all_prices]:
+            for derived in (
+                self.slot_prices,
+                self.hourly_prices,
+                self._hour_of_slot,
+                self.data_quality,
+                *self.slot_columns.values(),
+            ):
+                derived.pop(day, None)
+            changed_days.add(day)
+
+        for day, prices in self.all_prices.items():
+            timeline = self.get_timeline(day)
+            day_key = (rows_digest(prices), timeline.time_zone)
+            if self._day_keys.get(day) == day_key and day in self.slot_prices:
+                continue
+            slots, quality = normalize_day(prices, timeline)
+            if not quality.complete:
+                _LOGGER.debug(
+                    f"Prices for {self.price_area} {day} are missing "
+                    f"{quality.missing_slots} slots: {quality.gaps}"
+                )
+            self.slot_prices[day] = slots
+            for column, column_slots in self.slot_columns.items():
+                if any(column in item for item in prices):
+                    column_slots[day] = normalize_day(prices, timeline, column)[0]
+                else:
+                    column_slots.pop(day, None)
+            self.hourly_prices[day], self._hour_of_slot[day] = self._aggregate_hours(
+                timeline, slots
+            )
+            self.data_quality[day] = quality
+            if self._day_keys.get(day) != day_key:
+                self._day_keys[day] = day_key
+                self._day_version_counter += 1
+                self.day_versions[day] = self._day_version_counter
+            changed_days.add(day)
+
+        today = dt_util.now().date()
+        keep = set(self.slot_prices) | {today}
+        for day in [day for day in self._timelines if day not in keep]:
+            del self._timelines[day]
+        if changed_days:
+            self._sorted_prices = {
+                days: prices
+                for days, prices in self._sorted_prices.items()
+                if changed_days.isdisjoint(days)
+            }
+
+        published = [
+            day for day in self.published_days(today) if day in self.slot_prices
+        ]
+        published_key = tuple((day, self.day_versions[day]) for day in published)
+        if published_key == self._published_key and self.snapshot is not None:
+            return
+        self._published_key = published_key
+        self._rebuild_change_points(published)
+        self.data_version += 1
+        self.snapshot = PriceSnapshot(
+            self.data_version,
+            {day: self.all_prices[day] for day in published},
+            dict(published_key),
+        )
+
+    def _rebuild_change_points(self, days: list[DateObject]) -> None:
+        """Run-length encode the slot series into the starts of each run."""
+        quarter_series = []
+        hour_series = []
+        for day in days:
+            timeline = self.get_timeline(day)
+            hours = self.hourly_prices[day]
+            hour_of_slot = self._hour_of_slot[day]
+            for slot, price in enumerate(self.slot_prices[day]):
+                start_ts = timeline.slot_start_ts(slot)
+                hour = hour_of_slot[slot]
+                quarter_series.append((start_ts, price))
+                hour_series.append(
+                    (
+                        start_ts,
+                        (hours[hour]["mean"], hours[hour]["min"], hours[hour]["max"])
+                        if hour is not None
+                        else None,
+                    )
+                )
+        self._change_points = self._run_starts(quarter_series)
+        self._hour_change_points = self._run_starts(hour_series)
+
+    @staticmethod
+    def _run_starts(series: list[tuple[int, object]]) -> list[int]:
+        """Return the start of every run of equal values in a slot series.
+
+        A jump in time (a day missing from the cache) also starts a run.
+        """
+        starts = []
+        previous_end = None
+        previous_value = None
+        for start_ts, value in series:
+            if start_ts != previous_end or value != previous_value:
+                starts.append(start_ts)
+            previous_end = start_ts + SLOT_SECONDS
+            previous_value = value
+        return starts
+
+    @staticmethod
+    def _aggregate_hours(
+        timeline: SlotTimeline, slots: list[float | None]
+    ) -> tuple[list[dict], list[int | None]]:
+        """Aggregate slot prices into local hours (mean/min/max, SEK/kWh).
+
+        Hours are split on the local HH:00 labels of the timeline, so the
+        repeated hour on the autumn DST day becomes two separate hours.
+        """
+        hours: list[dict] = []
+        hour_of_slot: list[int | None] = [None] * len(slots)
+        group_start = 0
+        for slot in range(len(slots) + 1):
+            if slot < len(slots) and (
+                slot == group_start or not timeline.label(slot).endswith(":00")
+            ):
+                continue
+            values = [v for v in slots[group_start:slot] if v is not None]
+            if values:
+                for grouped_slot in range(group_start, slot):
+                    hour_of_slot[grouped_slot] = len(hours)
+                hours.append(
+                    {
+                        "time_start": dt_util.as_local(
+                            timeline.slot_start(group_start)
+                        ).isoformat(),
+                        "time_end": dt_util.as_local(
+                            timeline.slot_start(slot)
+                        ).isoformat(),
+                        "mean": sum(values) / len(values),
+                        "min": min(values),
+                        "max": max(values),
+                    }
+                )
+            group_start = slot
+        return hours, hour_of_slot
+
+    def get_slot_price(self, timeline: SlotTimeline, slot: int) -> float | None:
+        """Return the spot price (SEK/kWh) of a slot, if known."""
+        prices = self.slot_prices.get(timeline.date)
+        if not prices:
+            return None
+        return prices[slot]
+
+    def get_spot_price_sek_at(self, moment: DateTimeObject) -> float | None:
+        """Return the spot price (SEK/kWh) in effect at a given instant."""
+        return self.get_slot_price(*self.locate_slot(moment.timestamp()))
+
+    def get_column_at(self, column: str, moment: DateTimeObject) -> float | None:
+        """Return another price column (EUR_per_kWh, EXR) in effect at moment."""
+        timeline, slot = self.locate_slot(moment.timestamp())
+        values = self.slot_columns[column].get(timeline.date)
+        if not values:
+            return None
+        return values[slot]
+
+    def get_hourly_aggregate_at(self, moment: DateTimeObject) -> dict | None:
+        """Return the hourly mean/min/max (SEK/kWh) for the hour at moment."""
+        timeline, slot = self.locate_slot(moment.timestamp())
+        hour_of_slot = self._hour_of_slot.get(timeline.date)
+        if not hour_of_slot or hour_of_slot[slot] is None:
+            return None
+        return self.hourly_prices[timeline.date][hour_of_slot[slot]]
+
+    def get_sorted_prices(self, days: tuple[DateObject, ...]) -> list[float]:
+        """Return all known slot prices of the given days in ascending order."""
+        sorted_prices = self._sorted_prices.get(days)
+        if sorted_prices is None:
+            sorted_prices = sorted(
+                price
+                for day in days
+                for price in self.slot_prices.get(day, [])
+                if price is not None
+            )
+            self._sorted_prices[days] = sorted_prices
+        return sorted_prices
+
+    def get_price_rank(
+        self, price: float, days: tuple[DateObject, ...]
+    ) -> tuple[int, int, float] | None:
+        """Return (rank, count, percentile) of a price among the given days.
+
+        Rank 1 is the cheapest slot. The percentile is the share of the other
+        slots that are strictly cheaper, 0 for the cheapest and 100 for the
+        most expensive.
+        """
+        sorted_prices = self.get_sorted_prices(days)
+        count = len(sorted_prices)
+        if not count:
+            return None
+        cheaper = bisect.bisect_left(sorted_prices, price)
+        percentile = 100.0 * cheaper / (count - 1) if count > 1 else 0.0
+        return cheaper + 1, count, min(percentile, 100.0)
+
+    def get_current_price_rank(
+        self, days: tuple[DateObject, ...]
+    ) -> tuple[int, int, float] | None:
+        """Return the rank of the current price, computed once per update."""
+        if self.current_price_sek is None:
+            return None
+        if days not in self._current_ranks:
+            self._current_ranks[days] = self.get_price_rank(
+                self.current_price_sek, days
+            )
+        return self._current_ranks[days]
+
+    def _update_current_values(self) -> None:
+        """Recompute the values shared by all entities for the current time."""
+        self._current_ranks = {}
+        if not self.data or not self.last_update_success:
+            self.current_price_sek = None
+            self.current_price_eur = None
+            self.current_exchange_rate = None
+            self.current_hour = None
+            return
+        now = dt_util.utcnow()
+        self.current_price_sek = self.get_spot_price_sek_at(now)
+        self.current_price_eur = self.get_column_at(PRICE_COLUMN_EUR, now)
+        self.current_exchange_rate = self.get_column_at(PRICE_COLUMN_EXR, now)
+        self.current_hour = self.get_hourly_aggregate_at(now)
+
+    @callback
+    def async_add_entity_listener(self, update_callback: CALLBACK_TYPE) -> Callable:
+        """Register an entity for batched updates at refreshes and price changes."""
+        self._entity_listeners.append(update_callback)
+        self._update_current_values()
+        if self._unsub_entity_tick is None:
+            self._schedule_entity_tick()
+
+        @callback
+        def remove_listener() -> None:
+            self._entity_listeners.remove(update_callback)
+            if not self._entity_listeners and self._unsub_entity_tick is not None:
+                self._unsub_entity_tick()
+                self._unsub_entity_tick = None
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners, then update all entities in one pass."""
+        super().async_update_listeners()
+        self._async_update_entities()
+
+    @callback
+    def _async_update_entities(self) -> None:
+        """Compute the shared values once and write every entity."""
+        if not self._entity_listeners:
+            return
+        self._update_current_values()
+        for update_callback in list(self._entity_listeners):
+            update_callback()
+        self._schedule_entity_tick()
+
+    def _schedule_entity_tick(self) -> None:
+        """Wake at the next quarter or hourly price change, or midnight."""
+        if self._unsub_entity_tick is not None:
+            self._unsub_entity_tick()
+            self._unsub_entity_tick = None
+        if not self._entity_listeners:
+            return
+        now = dt_util.utcnow()
+        self._unsub_entity_tick = async_track_point_in_time(
+            self.hass,
+            self._async_entity_tick,
+            min(
+                self.next_change_after(now),
+                self.next_change_after(now, hourly=True),
+            ),
+        )
+
+    @callback
+    def _async_entity_tick(self, now: DateTimeObject) -> None:
+        self._unsub_entity_tick = None
+        self._schedule_rolling_update()
+        self._async_update_entities()
+
+    def get_tomorrow_estimate(self) -> PriceEstimate | None:
+        """Return the estimate for tomorrow while its real prices are missing."""
+        tomorrow = dt_util.now().date() + timedelta(days=1)
+        if (
+            self.estimate is None
+            or self.estimate.date != tomorrow
+            or self.slot_prices.get(tomorrow)
+        ):
+            return None
+        return self.estimate
+
+    def _estimate_key(self, day: DateObject) -> tuple:
+        """Return the target day with the data versions of its history."""
+        return (
+            day,
+            tuple(
+                self.day_versions.get(day - timedelta(days=offset))
+                for offset in range(1, ESTIMATE_HISTORY_DAYS + 1)
+            ),
+        )
+
+    def _schedule_estimate(self, day: DateObject) -> None:
+        """Estimate a day's prices in the background unless already done."""
+        if (
+            self.slot_prices.get(day)
+            or (self.estimate is not None and self.estimate.date == day)
+            or self._estimate_pending == day
+        ):
+            return
+        key = self._estimate_key(day)
+        if key == self._estimate_failed_key:
+            return
+        self._estimate_pending = day
+        self._entry.async_create_background_task(
+            self.hass,
+            self._async_update_estimate(day, key),
+            f"{DOMAIN}_estimate_{self.price_area.lower()}",
+        )
+
+    async def _async_update_estimate(self, day: DateObject, key: tuple) -> None:
+        try:
+            estimate = await async_estimate_day(self.hass, self.cache, day)
+        finally:
+            self._estimate_pending = None
+        if estimate is None:
+            self._estimate_failed_key = key
+            return
+        self._estimate_failed_key = None
+        self.estimate = estimate
+        self._async_update_entities()
+
+    def _schedule_rolling_update(self) -> None:
+        """Move the rolling windows in the background on a new day or data."""
+        key = (dt_util.now().date(), self.data_version)
+        if key == self._rolling_key:
+            return
+        self._rolling_key = key
+        self._entry.async_create_background_task(
+            self.hass,
+            self._async_update_rolling(key[0]),
+            f"{DOMAIN}_rolling_{self.price_area.lower()}",
+        )
+
+    async def _async_update_rolling(self, today: DateObject) -> None:
+        await self.rolling.async_update(
+            self.hass, self.cache, self.slot_prices, self.day_versions, today
+        )
+        self._async_update_entities()
+
+    def get_horizon(
+        self,
+        start: DateTimeObject,
+        end: DateTimeObject,
+        include_estimate: bool = False,
+    ) -> tuple[list[int], list[float | None]]:
+        """Return slot start epochs and prices for today and tomorrow within
+        [start, end), including the slot that is running at start.
+
+        With include_estimate, tomorrow's slots come from the estimate until
+        its real prices are available.
+        """
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        today = dt_util.now().date()
+        estimate = self.get_tomorrow_estimate() if include_estimate else None
+        slot_starts: list[int] = []
+        prices: list[float | None] = []
+        for day in (today, today + timedelta(days=1)):
+            timeline = self.get_timeline(day)
+            day_prices = self.slot_prices.get(day)
+            if not day_prices and estimate is not None and estimate.date == day:
+                day_prices = estimate.slots
+            day_prices = day_prices or [None] * len(timeline)
+            for slot, price in enumerate(day_prices):
+                slot_start = timeline.slot_start_ts(slot)
+                if slot_start + SLOT_SECONDS <= start_ts:
+                    continue
+                if slot_start + SLOT_SECONDS > end_ts:
+                    break
+                slot_starts.append(slot_start)
+                prices.append(price)
+        return slot_starts, prices
+
+    def next_slot_start(self, moment: DateTimeObject) -> DateTimeObject:
+        """Return the UTC start of the slot following the one at moment."""
+        timeline, slot = self.locate_slot(moment.timestamp())
+        return dt_util.utc_from_timestamp(timeline.slot_start_ts(slot + 1))
+
+    def next_change_after(
+        self, moment: DateTimeObject, hourly: bool = False
+    ) -> DateTimeObject:
+        """Return the UTC instant of the next price change after moment.
+
+        With ``hourly`` the hourly mean/min/max is followed instead of the
+        quarter price. The next local midnight is always a boundary, since daily
+        attributes and rankings roll over then.
+        """
+        points = self._hour_change_points if hourly else self._change_points
+        midnight = dt_util.as_utc(
+            dt_util.start_of_local_day(
+                dt_util.as_local(moment).date() + timedelta(days=1)
+            )
+        )
+        index = bisect.bisect_right(points, moment.timestamp())
+        if index < len(points):
+            return min(dt_util.utc_from_timestamp(points[index]), midnight)
+        return midnight
+
+    def get_surcharge_sek(self) -> float:
+        """Return the configured surcharge in SEK/kWh."""
+        surcharge_val = self._entry.options.get(
+            CONF_SURCHARGE_ORE,
+            self._entry.data.get(CONF_SURCHARGE_ORE, DEFAULT_SURCHARGE_ORE),
+        )
+        try:
+            return float(surcharge_val) / 100.0
+        except (ValueError, TypeError):
+            return DEFAULT_SURCHARGE_ORE / 100.0
+
+    @property
+    def retention_days(self) -> int:
+        """Return the number of days of prices kept on disk."""
+        try:
+            return max(
+                int(
+                    self._entry.options.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS)
+                ),
+                2,
+            )
+        except (ValueError, TypeError):
+            return DEFAULT_RETENTION_DAYS
+
+    def _get_memory_budget_bytes(self) -> int:
+        try:
+            budget_kb = float(
+                self._entry.options.get(CONF_MEMORY_BUDGET_KB, DEFAULT_MEMORY_BUDGET_KB)
+            )
+        except (ValueError, TypeError):
+            budget_kb = DEFAULT_MEMORY_BUDGET_KB
+        return int(budget_kb * 1024)
+
+    @callback
+    def async_pin_days(self, days: list[DateObject]) -> CALLBACK_TYPE:
+        """Keep days in memory until the returned callback is called."""
+        self._subscribed_days.update(days)
+        self.cache.pinned.update(days)
+
+        @callback
+        def unpin_days() -> None:
+            self._subscribed_days.subtract(days)
+            self._subscribed_days = +self._subscribed_days
+            self.cache.pinned = {
+                *self.published_days(dt_util.now().date()),
+                *self._subscribed_days,
+            }
+
+        return unpin_days
+
+    async def _async_apply_retention(self, today: DateObject) -> None:
+        """Evict cold days from memory and prune expired days from disk."""
+        self.cache.pinned = {*self.published_days(today), *self._subscribed_days}
+        self.cache.memory_budget_bytes = self._get_memory_budget_bytes()
+        if evicted := self.cache.evict():
+            _LOGGER.debug(f"Evicted cold price days from memory: {evicted}")
+        if self._last_prune_date != today:
+            await self.cache.async_prune(today, self.retention_days)
+            self._last_prune_date = today
+            cutoff = today - timedelta(days=self.retention_days)
+            for day in [day for day in self._day_keys if day < cutoff]:
+                del self._day_keys[day]
+                self.day_versions.pop(day, None)
+
+    async def async_apply_options(self) -> None:
+        """Apply changed options from the existing data, without any fetch."""
+        self.applied_options = dict(self._entry.options)
+        self.options_version += 1
+        self.api.base_url = self._entry.options.get(CONF_API_BASE_URL) or API_BASE_URL
+        self.api.token = self._entry.options.get(CONF_API_TOKEN)
+        # Re-run retention with the new memory budget and retention days.
+        self._last_prune_date = None
+        await self._async_apply_retention(dt_util.now().date())
+        self._async_update_entities()
+
+    async def async_ensure_days(self, days: list[DateObject]) -> None:
+        """Make sure the given days are in memory, reloading them from disk."""
+        loaded = False
+        for day in days:
+            if self.cache.get(day) is None and await self.cache.async_get_day(day):
+                loaded = True
+        if loaded:
+            self._rebuild_slot_prices()
+
+    async def _async_fetch_prices(self, day: DateObject) -> list | None:
+        """Request a day's prices from the API and note when it was asked."""
+        self.last_api_call_timestamp = dt_util.utcnow()
+        return await self.api.get_prices(day)
+
+    async def _async_update_data(self) -> PriceSnapshot:
         """Fetch data from API and update internal state."""
         _LOGGER.debug(f"Coordinator update triggered for price area {self.price_area}")
 
@@ -190,10 +969,11 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
             or not self.all_prices[today_local_date]
         ):
             _LOGGER.info(f"Fetching prices for today: {today_local_date}")
-            prices_today_raw = await self.api.get_prices(today_local_date)
+            prices_today_raw = await self._async_fetch_prices(today_local_date)
             if prices_today_raw:
-                self.all_prices[today_local_date] = self._parse_and_validate_prices(
-                    prices_today_raw, today_local_date
+                await self.cache.async_save_day(
+                    today_local_date,
+                    self._parse_and_validate_prices(prices_today_raw, today_local_date),
                 )
             else:
                 _LOGGER.warning(f"Could not fetch prices for today {today_local_date}.")
@@ -208,10 +988,13 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
                 f"Attempting to fetch prices for tomorrow: {tomorrow_local_date} "
                 f"(current time: {now_local.strftime('%H:%M')})"
             )
-            prices_tomorrow_raw = await self.api.get_prices(tomorrow_local_date)
+            prices_tomorrow_raw = await self._async_fetch_prices(tomorrow_local_date)
             if prices_tomorrow_raw:
-                self.all_prices[tomorrow_local_date] = self._parse_and_validate_prices(
-                    prices_tomorrow_raw, tomorrow_local_date
+                await self.cache.async_save_day(
+                    tomorrow_local_date,
+                    self._parse_and_validate_prices(
+                        prices_tomorrow_raw, tomorrow_local_date
+                    ),
                 )
                 self.tomorrow_prices_successfully_fetched_for_date = tomorrow_local_date
                 _LOGGER.info(
@@ -260,15 +1043,7 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
             if self.update_interval != timedelta(hours=NORMAL_UPDATE_INTERVAL_HOURS):
                 self.update_interval = timedelta(hours=NORMAL_UPDATE_INTERVAL_HOURS)
 
-        day_before_yesterday = today_local_date - timedelta(days=2)
-        keys_to_delete = [
-            date_key for date_key in self.all_prices if date_key < day_before_yesterday
-        ]
-        if keys_to_delete:
-            _LOGGER.debug(f"Cleaning up old price data for dates: {keys_to_delete}")
-            for key_to_delete in keys_to_delete:
-                if key_to_delete in self.all_prices:
-                    del self.all_prices[key_to_delete]
+        await self._async_apply_retention(today_local_date)
 
         if not self.all_prices.get(today_local_date):
             _LOGGER.warning(
@@ -282,5 +1057,7 @@ class ElprisDataUpdateCoordinator(DataUpdateCoordinator[dict[DateObject, list]])
             f"Next update: {self.update_interval}."
         )
 
-        self.last_api_call_timestamp = dt_util.utcnow()
-        return self.all_prices
+        self._rebuild_slot_prices()
+        self._schedule_estimate(tomorrow_local_date)
+        self._schedule_rolling_update()
+        return self.snapshot
@@ -0,0 +1,370 @@
+# Version: 2025-12-19-rev18
+"""Price anomaly detection against a slot-of-day baseline for Elpris Kvart."""
+
+import logging
+import math
+from collections.abc import Callable
+from datetime import date as DateObject
+from datetime import datetime as DateTimeObject
+from datetime import timedelta
+from typing import NamedTuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator
+from .const import (
+    ANOMALY_BASELINE_DAYS,
+    ANOMALY_DEVIATION,
+    ANOMALY_MIN_BASELINE_DAYS,
+    ANOMALY_NEGATIVE,
+    ANOMALY_SPIKE,
+    ANOMALY_SPIKE_MIN_SEK,
+    ANOMALY_SPIKE_RATIO,
+    ATTR_ANOMALY_KIND,
+    ATTR_BASELINE_MEAN_SEK,
+    ATTR_PRICE_AREA,
+    ATTR_PRICE_SEK,
+    ATTR_SLOT_END,
+    ATTR_SLOT_START,
+    ATTR_Z_SCORE,
+    CONF_ANOMALY_SIGMA,
+    DEFAULT_ANOMALY_SIGMA,
+    DOMAIN,
+    EVENT_PRICE_ANOMALY,
+)
+from .daywindow import DaySummaries, DayWindow
+from .store import PriceCache
+from .timeline import SLOT_SECONDS, SlotTimeline
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Anomaly(NamedTuple):
+    """An abnormal quarter."""
+
+    timestamp: int
+    kind: str
+    price_sek: float
+    baseline_mean_sek: float | None
+    z_score: float | None
+
+
+class SlotOfDayBaseline:
+    """Price mean and spread per local quarter of day over recent days.
+
+    Quarters are keyed by their wall-clock label, so 08:15 on a DST day
+    compares with 08:15 on other days. Each day's contribution is kept
+    with the data version it came from; when the window moves or a day
+    changes, only that day is added to or subtracted from the per-label
+    count, sum and sum of squares.
+    """
+
+    def __init__(self, days: int = ANOMALY_BASELINE_DAYS):
+        """Initialize an empty baseline over the given number of days."""
+        self.window_days = days
+        self.count: dict[str, int] = {}
+        self.total: dict[str, float] = {}
+        self.total_sq: dict[str, float] = {}
+        self._days: DaySummaries[dict[str, float]] = DaySummaries(_profile)
+        self._window: DayWindow[dict[str, float]] = DayWindow(self._merge)
+
+    @property
+    def days(self) -> int:
+        """Return the number of days in the baseline."""
+        return len(self._window.members)
+
+    def _merge(self, profile: dict[str, float], sign: int) -> None:
+        for label, price in profile.items():
+            count = self.count.get(label, 0) + sign
+            if count:
+                self.count[label] = count
+                self.total[label] = self.total.get(label, 0.0) + sign * price
+                self.total_sq[label] = (
+                    self.total_sq.get(label, 0.0) + sign * price * price
+                )
+            else:
+                for stats in (self.count, self.total, self.total_sq):
+                    stats.pop(label, None)
+
+    def apply(
+        self,
+        first: DateObject,
+        last: DateObject,
+        profiles: dict[DateObject, tuple[int | None, dict[str, float]]],
+    ) -> None:
+        """Store new day profiles and move the window to [first, last]."""
+        self._days.apply(first, last, profiles)
+        self._window.move(first, last, self._days.days)
+
+    async def async_update(
+        self,
+        hass: HomeAssistant,
+        cache: PriceCache,
+        slot_prices: dict[DateObject, list[float | None]],
+        day_versions: dict[DateObject, int],
+        today: DateObject,
+    ) -> None:
+        """Profile new or changed days before today and move the window."""
+        last = today - timedelta(days=1)
+        first = today - timedelta(days=self.window_days)
+        profiles = await self._days.async_collect(
+            hass, cache, slot_prices, day_versions, first, last
+        )
+        self.apply(first, last, profiles)
+
+    def stats(self, label: str) -> tuple[int, float, float] | None:
+        """Return (days, mean, standard deviation) for a quarter of day."""
+        count = self.count.get(label)
+        if not count:
+            return None
+        mean = self.total[label] / count
+        variance = max(self.total_sq[label] / count - mean * mean, 0.0)
+        return count, mean, math.sqrt(variance)
+
+
+def _profile(slots: list[float | None], timeline: SlotTimeline) -> dict[str, float]:
+    """Return the known prices of a day keyed by quarter label."""
+    return {
+        timeline.label(slot): price
+        for slot, price in enumerate(slots)
+        if price is not None
+    }
+
+
+def find_anomalies(
+    slot_starts: list[int],
+    labels: list[str],
+    prices_sek: list[float | None],
+    baseline: SlotOfDayBaseline,
+    sigma: float,
+) -> list[Anomaly]:
+    """Return the abnormal quarters of a price series.
+
+    A quarter is, in order of precedence, negative; a spike (at least
+    ANOMALY_SPIKE_RATIO times and ANOMALY_SPIKE_MIN_SEK above the mean of
+    its known neighbours); or a deviation of more than sigma standard
+    deviations from the baseline for its quarter of day. Deviations need
+    ANOMALY_MIN_BASELINE_DAYS of history; sigma 0 disables them.
+    """
+    anomalies = []
+    for index, (slot_start, label, price) in enumerate(
+        zip(slot_starts, labels, prices_sek, strict=True)
+    ):
+        if price is None:
+            continue
+        mean = z_score = None
+        if (stats := baseline.stats(label)) is not None:
+            days, mean, stddev = stats
+            if stddev > 0 and days >= ANOMALY_MIN_BASELINE_DAYS:
+                z_score = (price - mean) / stddev
+        neighbours = [
+            prices_sek[other]
+            for other in (index - 1, index + 1)
+            if 0 <= other < len(prices_sek) and prices_sek[other] is not None
+        ]
+        neighbour_mean = sum(neighbours) / len(neighbours) if neighbours else None
+        if price < 0:
+            kind = ANOMALY_NEGATIVE
+        elif (
+            neighbour_mean is not None
+            and neighbour_mean > 0
+            and price >= ANOMALY_SPIKE_RATIO * neighbour_mean
+            and price - neighbour_mean >= ANOMALY_SPIKE_MIN_SEK
+        ):
+            kind = ANOMALY_SPIKE
+        elif sigma > 0 and z_score is not None and abs(z_score) > sigma:
+            kind = ANOMALY_DEVIATION
+        else:
+            continue
+        anomalies.append(Anomaly(slot_start, kind, price, mean, z_score))
+    return anomalies
+
+
+class AnomalyScheduler:
+    """Detect anomalies once per data change and time their alerts.
+
+    Today's and tomorrow's quarters are classified when the data, the
+    options or the date change. Only the next anomaly boundary has a timer:
+    at the start of an abnormal quarter elpris_kvart_price_anomaly is fired
+    and the listeners (the binary sensor) are told; at its end they are
+    told again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+    ):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._entry = entry
+        self.baseline = SlotOfDayBaseline()
+        self.anomalies: list[Anomaly] = []
+        self._by_start: dict[int, Anomaly] = {}
+        self._boundaries: list[int] = []
+        self._next_index = 0
+        self._key: tuple | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> Callable:
+        """Start following coordinator updates; returns a stop callback."""
+        unsub_coordinator = self.coordinator.async_add_entity_listener(
+            self._async_handle_coordinator_update
+        )
+        self._async_handle_coordinator_update()
+
+        @callback
+        def stop() -> None:
+            unsub_coordinator()
+            self._cancel_timer()
+
+        return stop
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable:
+        """Register an entity callback."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @property
+    def sigma(self) -> float:
+        """Return the configured deviation limit in standard deviations."""
+        try:
+            return float(
+                self._entry.options.get(CONF_ANOMALY_SIGMA, DEFAULT_ANOMALY_SIGMA)
+            )
+        except (TypeError, ValueError):
+            return DEFAULT_ANOMALY_SIGMA
+
+    def current(self) -> Anomaly | None:
+        """Return the anomaly of the running quarter, if any."""
+        timeline, slot = self.coordinator.locate_slot(dt_util.utcnow().timestamp())
+        return self._by_start.get(timeline.slot_start_ts(slot))
+
+    def upcoming(self) -> list[Anomaly]:
+        """Return anomalies of the running and later quarters."""
+        now_ts = dt_util.utcnow().timestamp()
+        return [a for a in self.anomalies if a.timestamp + SLOT_SECONDS > now_ts]
+
+    def _cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_handle_coordinator_update(self) -> None:
+        key = (
+            dt_util.now().date(),
+            self.coordinator.data_version,
+            self.coordinator.options_version,
+        )
+        if key == self._key:
+            return
+        self._key = key
+        self._entry.async_create_background_task(
+            self.hass,
+            self._async_recompute(key[0]),
+            f"{DOMAIN}_anomalies_{self.coordinator.price_area.lower()}",
+        )
+
+    async def _async_recompute(self, today: DateObject) -> None:
+        coordinator = self.coordinator
+        await self.baseline.async_update(
+            self.hass,
+            coordinator.cache,
+            coordinator.slot_prices,
+            coordinator.day_versions,
+            today,
+        )
+        slot_starts: list[int] = []
+        labels: list[str] = []
+        prices: list[float | None] = []
+        for day in (today, today + timedelta(days=1)):
+            timeline = coordinator.get_timeline(day)
+            day_prices = coordinator.slot_prices.get(day) or [None] * len(timeline)
+            for slot, price in enumerate(day_prices):
+                slot_starts.append(timeline.slot_start_ts(slot))
+                labels.append(timeline.label(slot))
+                prices.append(price)
+        self.anomalies = find_anomalies(
+            slot_starts, labels, prices, self.baseline, self.sigma
+        )
+        self._by_start = {anomaly.timestamp: anomaly for anomaly in self.anomalies}
+        self._boundaries = sorted(
+            {a.timestamp for a in self.anomalies}
+            | {a.timestamp + SLOT_SECONDS for a in self.anomalies}
+        )
+        now_ts = dt_util.utcnow().timestamp()
+        self._next_index = next(
+            (i for i, ts in enumerate(self._boundaries) if ts > now_ts),
+            len(self._boundaries),
+        )
+        _LOGGER.debug(
+            f"{len(self.upcoming())} upcoming price anomalies for "
+            f"{coordinator.price_area} ({self.baseline.days} baseline days)"
+        )
+        self._schedule_next()
+        self._notify()
+
+    def _schedule_next(self) -> None:
+        self._cancel_timer()
+        if self._next_index >= len(self._boundaries):
+            return
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass,
+            self._async_boundary_reached,
+            dt_util.utc_from_timestamp(self._boundaries[self._next_index]),
+        )
+
+    @callback
+    def _async_boundary_reached(self, now: DateTimeObject) -> None:
+        self._unsub_timer = None
+        now_ts = now.timestamp()
+        while (
+            self._next_index < len(self._boundaries)
+            and self._boundaries[self._next_index] <= now_ts
+        ):
+            boundary = self._boundaries[self._next_index]
+            self._next_index += 1
+            if (anomaly := self._by_start.get(boundary)) is not None:
+                self.hass.bus.async_fire(
+                    EVENT_PRICE_ANOMALY,
+                    anomaly_event_data(self.coordinator.price_area, anomaly),
+                )
+        self._schedule_next()
+        self._notify()
+
+    def _notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+def anomaly_event_data(price_area: str | None, anomaly: Anomaly) -> dict:
+    """Return the event and attribute payload describing an anomaly."""
+    data = {
+        ATTR_ANOMALY_KIND: anomaly.kind,
+        ATTR_SLOT_START: dt_util.utc_from_timestamp(anomaly.timestamp).isoformat(),
+        ATTR_SLOT_END: dt_util.utc_from_timestamp(
+            anomaly.timestamp + SLOT_SECONDS
+        ).isoformat(),
+        ATTR_PRICE_SEK: round(anomaly.price_sek, 4),
+        ATTR_BASELINE_MEAN_SEK: None
+        if anomaly.baseline_mean_sek is None
+        else round(anomaly.baseline_mean_sek, 4),
+        ATTR_Z_SCORE: None if anomaly.z_score is None else round(anomaly.z_score, 2),
+    }
+    if price_area is not None:
+        data = {ATTR_PRICE_AREA: price_area, **data}
+    return data
@@ -0,0 +1,173 @@
+# Version: 2025-12-19-rev18
+"""Shared price store across the price areas of all loaded entries."""
+
+from collections.abc import Callable
+from datetime import date as DateObject
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator
+from .const import DOMAIN
+from .timeline import SLOT_SECONDS
+
+DATA_AREA_STORE = f"{DOMAIN}_area_store"
+
+
+class AreaPriceStore:
+    """Quarter prices of every loaded price area, indexed by (area, slot).
+
+    The store does not copy prices: it reads each area's coordinator, whose
+    slot arrays share the same local timeline, so a slot index means the
+    same quarter in every area. Derived values (current prices, per-day
+    spread series) are computed once per data change or quarter and shared
+    by all sensors that compare areas.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize an empty store."""
+        self.hass = hass
+        self.coordinators: dict[str, ElprisDataUpdateCoordinator] = {}
+        self.current_prices: dict[str, float | None] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsubs: dict[str, CALLBACK_TYPE] = {}
+        self._current_key: tuple | None = None
+        self._spreads: dict[tuple[str, str, DateObject], tuple] = {}
+
+    @callback
+    def async_register(self, coordinator: ElprisDataUpdateCoordinator) -> Callable:
+        """Add an area's coordinator; returns a callback that removes it."""
+        area = coordinator.price_area
+        self.coordinators[area] = coordinator
+        if self._listeners:
+            self._subscribe(area)
+        self._async_area_updated()
+
+        @callback
+        def unregister() -> None:
+            if self.coordinators.get(area) is not coordinator:
+                return
+            del self.coordinators[area]
+            if unsub := self._unsubs.pop(area, None):
+                unsub()
+            self._spreads = {
+                spread_key: series
+                for spread_key, series in self._spreads.items()
+                if area not in spread_key[:2]
+            }
+            self._async_area_updated()
+
+        return unregister
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable:
+        """Register a sensor callback, following the areas while any exist."""
+        self._listeners.append(update_callback)
+        if len(self._listeners) == 1:
+            for area in self.coordinators:
+                self._subscribe(area)
+            self._current_key = None
+            self._update_current_prices()
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+            if not self._listeners:
+                for unsub in self._unsubs.values():
+                    unsub()
+                self._unsubs = {}
+
+        return remove_listener
+
+    def _subscribe(self, area: str) -> None:
+        if area not in self._unsubs:
+            self._unsubs[area] = self.coordinators[area].async_add_entity_listener(
+                self._async_area_updated
+            )
+
+    def _update_current_prices(self) -> bool:
+        """Recompute the current price per area; False if nothing changed."""
+        now_ts = dt_util.utcnow().timestamp()
+        key = (
+            int(now_ts) // SLOT_SECONDS,
+            tuple(
+                (area, coordinator.data_version)
+                for area, coordinator in sorted(self.coordinators.items())
+            ),
+        )
+        if key == self._current_key:
+            return False
+        self._current_key = key
+        today = dt_util.now().date()
+        self._spreads = {
+            spread_key: series
+            for spread_key, series in self._spreads.items()
+            if spread_key[2] >= today
+        }
+        self.current_prices = {
+            area: self.price_at(area, now_ts) for area in sorted(self.coordinators)
+        }
+        return True
+
+    @callback
+    def _async_area_updated(self) -> None:
+        """Notify sensors once per data change or quarter across all areas."""
+        if not self._listeners or not self._update_current_prices():
+            return
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def price_at(self, area: str, timestamp: float) -> float | None:
+        """Return an area's spot price (SEK/kWh) at a UTC epoch."""
+        if (coordinator := self.coordinators.get(area)) is None:
+            return None
+        timeline, slot = coordinator.locate_slot(timestamp)
+        return self.price(area, timeline.date, slot)
+
+    def price(self, area: str, day: DateObject, slot: int) -> float | None:
+        """Return an area's spot price (SEK/kWh) for a slot of a day."""
+        if (coordinator := self.coordinators.get(area)) is None:
+            return None
+        prices = coordinator.slot_prices.get(day)
+        if not prices or not 0 <= slot < len(prices):
+            return None
+        return prices[slot]
+
+    def cheapest_area(self, areas: list[str]) -> str | None:
+        """Return the area with the lowest current price among areas."""
+        priced = [
+            (price, area)
+            for area in areas
+            if (price := self.current_prices.get(area)) is not None
+        ]
+        return min(priced)[1] if priced else None
+
+    def spread_series(
+        self, area: str, other: str, day: DateObject
+    ) -> list[float | None]:
+        """Return area minus other per slot of a day, cached per data version."""
+        coordinators = (self.coordinators.get(area), self.coordinators.get(other))
+        if None in coordinators:
+            return []
+        versions = tuple(c.day_versions.get(day) for c in coordinators)
+        cached = self._spreads.get((area, other, day))
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        prices = [c.slot_prices.get(day) or [] for c in coordinators]
+        series = (
+            [
+                None if own is None or theirs is None else own - theirs
+                for own, theirs in zip(*prices, strict=True)
+            ]
+            if prices[0] and len(prices[0]) == len(prices[1])
+            else []
+        )
+        self._spreads[(area, other, day)] = (versions, series)
+        return series
+
+
+def get_area_store(hass: HomeAssistant) -> AreaPriceStore:
+    """Return the shared area store, creating it on first use."""
+    if (store := hass.data.get(DATA_AREA_STORE)) is None:
+        store = hass.data[DATA_AREA_STORE] = AreaPriceStore(hass)
+    return store
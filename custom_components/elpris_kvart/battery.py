@@ -0,0 +1,327 @@
+# Version: 2025-12-19-rev18
+"""Battery dispatch planning for Elpris Kvart."""
+
+import logging
+from bisect import bisect_right
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime as DateTimeObject
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+)
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator
+from .const import (
+    ATTR_CAPACITY_KWH,
+    ATTR_EFFICIENCY_PCT,
+    ATTR_MAX_SOC_PCT,
+    ATTR_MIN_SOC_PCT,
+    BATTERY_ACTION_CHARGE,
+    BATTERY_ACTION_DISCHARGE,
+    BATTERY_ACTION_IDLE,
+    CONF_BATTERY_CAPACITY_KWH,
+    CONF_BATTERY_CHARGE_KW,
+    CONF_BATTERY_DISCHARGE_KW,
+    CONF_BATTERY_EFFICIENCY_PCT,
+    CONF_BATTERY_MAX_SOC_PCT,
+    CONF_BATTERY_MIN_SOC_PCT,
+    DEFAULT_BATTERY_EFFICIENCY_PCT,
+    DEFAULT_BATTERY_MAX_SOC_PCT,
+    DEFAULT_BATTERY_MIN_SOC_PCT,
+    DOMAIN,
+)
+from .optimizer import BatteryPlan, plan_battery
+from .timeline import SLOT_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+PLANNING_HORIZON = timedelta(days=2)
+_IDLE_POWER_KW = 1e-6
+
+
+def action_for_power(power_kw: float) -> str:
+    """Return the battery action for a planned grid-side power."""
+    if power_kw > _IDLE_POWER_KW:
+        return BATTERY_ACTION_CHARGE
+    if power_kw < -_IDLE_POWER_KW:
+        return BATTERY_ACTION_DISCHARGE
+    return BATTERY_ACTION_IDLE
+
+
+@dataclass(frozen=True)
+class BatterySettings:
+    """Physical limits of a home battery."""
+
+    capacity_kwh: float
+    charge_power_kw: float
+    discharge_power_kw: float
+    efficiency_pct: float = DEFAULT_BATTERY_EFFICIENCY_PCT
+    min_soc_pct: float = DEFAULT_BATTERY_MIN_SOC_PCT
+    max_soc_pct: float = DEFAULT_BATTERY_MAX_SOC_PCT
+
+    @classmethod
+    def from_options(cls, options: dict) -> "BatterySettings | None":
+        """Build settings from entry options, None if planning is disabled."""
+        try:
+            capacity_kwh = float(options.get(CONF_BATTERY_CAPACITY_KWH, 0.0))
+            charge_power_kw = float(options.get(CONF_BATTERY_CHARGE_KW, 0.0))
+            return cls(
+                capacity_kwh,
+                charge_power_kw,
+                float(options.get(CONF_BATTERY_DISCHARGE_KW, charge_power_kw)),
+                float(
+                    options.get(
+                        CONF_BATTERY_EFFICIENCY_PCT, DEFAULT_BATTERY_EFFICIENCY_PCT
+                    )
+                ),
+                float(
+                    options.get(CONF_BATTERY_MIN_SOC_PCT, DEFAULT_BATTERY_MIN_SOC_PCT)
+                ),
+                float(
+                    options.get(CONF_BATTERY_MAX_SOC_PCT, DEFAULT_BATTERY_MAX_SOC_PCT)
+                ),
+            ).validated()
+        except (TypeError, ValueError):
+            return None
+
+    def validation_error(self) -> str | None:
+        """Return why the limits are inconsistent, or None if they are valid."""
+        if self.capacity_kwh <= 0:
+            return f"{ATTR_CAPACITY_KWH} must be greater than 0"
+        if self.efficiency_pct <= 0:
+            return f"{ATTR_EFFICIENCY_PCT} must be greater than 0"
+        if not 0 <= self.min_soc_pct <= 100:
+            return f"{ATTR_MIN_SOC_PCT} must be between 0 and 100"
+        if not 0 <= self.max_soc_pct <= 100:
+            return f"{ATTR_MAX_SOC_PCT} must be between 0 and 100"
+        if self.min_soc_pct >= self.max_soc_pct:
+            return f"{ATTR_MIN_SOC_PCT} must be lower than {ATTR_MAX_SOC_PCT}"
+        return None
+
+    def validated(self) -> "BatterySettings | None":
+        """Return these settings, or None if the limits are inconsistent."""
+        return None if self.validation_error() else self
+
+    def plan(self, prices: list[float | None], soc_pct: float) -> BatteryPlan:
+        """Plan dispatch from the given state of charge."""
+        return plan_battery(
+            prices,
+            self.capacity_kwh,
+            self.charge_power_kw,
+            self.discharge_power_kw,
+            self.efficiency_pct / 100.0,
+            self.capacity_kwh * soc_pct / 100.0,
+            self.capacity_kwh * self.min_soc_pct / 100.0,
+            self.capacity_kwh * self.max_soc_pct / 100.0,
+        )
+
+
+@dataclass(frozen=True)
+class BatterySchedule:
+    """A battery plan aligned to the slots it was computed for."""
+
+    slot_starts: list[int]
+    prices: list[float | None]
+    plan: BatteryPlan
+    capacity_kwh: float
+    data_version: int
+
+    def index_at(self, timestamp: float) -> int | None:
+        """Return the plan index of the slot running at timestamp."""
+        index = bisect_right(self.slot_starts, timestamp) - 1
+        if index < 0 or timestamp >= self.slot_starts[index] + SLOT_SECONDS:
+            return None
+        return index
+
+    def soc_pct(self, index: int) -> float:
+        """Return the planned state of charge at the end of a slot."""
+        return 100.0 * self.plan.soc_kwh[index] / self.capacity_kwh
+
+    def blocks(self, start_index: int = 0) -> list[dict]:
+        """Merge consecutive slots with the same non-idle action."""
+        blocks: list[dict] = []
+        previous_action = BATTERY_ACTION_IDLE
+        for index in range(start_index, len(self.slot_starts)):
+            action = action_for_power(self.plan.power_kw[index])
+            end_ts = self.slot_starts[index] + SLOT_SECONDS
+            if action == BATTERY_ACTION_IDLE:
+                previous_action = action
+                continue
+            if action == previous_action:
+                blocks[-1]["end"] = _local_iso(end_ts)
+                blocks[-1]["soc_pct"] = round(self.soc_pct(index), 1)
+            else:
+                blocks.append(
+                    {
+                        "start": _local_iso(self.slot_starts[index]),
+                        "end": _local_iso(end_ts),
+                        "action": action,
+                        "soc_pct": round(self.soc_pct(index), 1),
+                    }
+                )
+            previous_action = action
+        return blocks
+
+
+def _local_iso(timestamp: float) -> str:
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).isoformat()
+
+
+async def async_plan_horizon(
+    hass: HomeAssistant,
+    coordinator: ElprisDataUpdateCoordinator,
+    settings: BatterySettings,
+    soc_pct: float,
+) -> BatterySchedule | None:
+    """Plan over known prices from now on, in the executor."""
+    now = dt_util.utcnow()
+    data_version = coordinator.data_version
+    slot_starts, prices = coordinator.get_horizon(now, now + PLANNING_HORIZON)
+    if not any(price is not None for price in prices):
+        return None
+    plan = await hass.async_add_executor_job(settings.plan, prices, soc_pct)
+    return BatterySchedule(
+        slot_starts, prices, plan, settings.capacity_kwh, data_version
+    )
+
+
+class BatteryDispatcher:
+    """Keep a battery schedule in step with prices and state of charge.
+
+    The plan is recomputed in the executor when new prices arrive, when a
+    new quarter starts and when the state of charge moves by at least one
+    percent. Requests arriving while a plan is being computed are coalesced
+    into a single rerun.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: ElprisDataUpdateCoordinator,
+        settings: BatterySettings,
+        soc_entity_id: str,
+    ):
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self.settings = settings
+        self.soc_entity_id = soc_entity_id
+
+        self.soc_pct: float | None = None
+        self.schedule: BatterySchedule | None = None
+
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._plan_key: tuple | None = None
+        self._replan_pending = False
+        self._replanning = False
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable:
+        """Register an entity callback and start planning on first listener."""
+        self._listeners.append(update_callback)
+        if not self._unsubs:
+            self._unsubs = [
+                async_track_state_change_event(
+                    self.hass, [self.soc_entity_id], self._async_handle_soc_event
+                ),
+                self.coordinator.async_add_listener(self.async_request_replan),
+            ]
+            self._schedule_slot_tick()
+            self._update_soc(self.hass.states.get(self.soc_entity_id))
+            self.async_request_replan()
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+            if not self._listeners:
+                for unsub in self._unsubs:
+                    unsub()
+                self._unsubs = []
+                if self._unsub_timer is not None:
+                    self._unsub_timer()
+                    self._unsub_timer = None
+
+        return remove_listener
+
+    def current_index(self) -> int | None:
+        """Return the plan index for the current quarter."""
+        if self.schedule is None:
+            return None
+        return self.schedule.index_at(dt_util.utcnow().timestamp())
+
+    def _update_soc(self, state) -> None:
+        if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return
+        try:
+            soc_pct = float(state.state)
+        except ValueError:
+            _LOGGER.debug(f"Ignoring non-numeric state of charge: {state.state}")
+            return
+        self.soc_pct = min(max(soc_pct, 0.0), 100.0)
+
+    @callback
+    def _async_handle_soc_event(self, event: Event) -> None:
+        self._update_soc(event.data.get("new_state"))
+        self.async_request_replan()
+
+    def _schedule_slot_tick(self) -> None:
+        self._unsub_timer = async_track_point_in_time(
+            self.hass,
+            self._async_slot_tick,
+            self.coordinator.next_slot_start(dt_util.utcnow()),
+        )
+
+    @callback
+    def _async_slot_tick(self, now: DateTimeObject) -> None:
+        self._schedule_slot_tick()
+        self.async_request_replan()
+
+    def _current_key(self) -> tuple | None:
+        if self.soc_pct is None or not self.coordinator.data:
+            return None
+        slot_ts = int(dt_util.utcnow().timestamp()) // SLOT_SECONDS
+        return (self.coordinator.data_version, slot_ts, round(self.soc_pct))
+
+    @callback
+    def async_request_replan(self) -> None:
+        """Recompute the plan unless nothing it depends on has changed."""
+        if self._current_key() in (None, self._plan_key):
+            return
+        if self._replanning:
+            self._replan_pending = True
+            return
+        self._replanning = True
+        self.entry.async_create_background_task(
+            self.hass,
+            self._async_replan(),
+            f"{DOMAIN}_battery_plan_{self.coordinator.price_area}",
+        )
+
+    async def _async_replan(self) -> None:
+        try:
+            while True:
+                self._replan_pending = False
+                key = self._current_key()
+                if key is None:
+                    break
+                self.schedule = await async_plan_horizon(
+                    self.hass, self.coordinator, self.settings, self.soc_pct
+                )
+                self._plan_key = key
+                for update_callback in list(self._listeners):
+                    update_callback()
+                if not self._replan_pending:
+                    break
+        finally:
+            self._replanning = False
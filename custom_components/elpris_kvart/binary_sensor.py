@@ -0,0 +1,95 @@
+# Version: 2025-12-19-rev18
+"""Binary sensor platform for Elpris Kvart."""
+
+import logging
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import ElprisDataUpdateCoordinator, device_info
+from .anomalies import AnomalyScheduler, anomaly_event_data
+from .const import (
+    ATTR_BASELINE_DAYS,
+    ATTR_PRICE_AREA,
+    ATTR_SIGMA,
+    ATTR_UPCOMING_ANOMALIES,
+    CONF_PRICE_AREA,
+    DEFAULT_PRICE_AREA,
+    DOMAIN,
+    ICON_PRICE_ANOMALY,
+    INTEGRATION_NAME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upcoming anomalies listed in the attributes, to bound the state size
+MAX_LISTED_ANOMALIES = 16
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Elpris Kvart binary sensor platform."""
+    coordinator: ElprisDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    price_area = entry.data.get(CONF_PRICE_AREA, DEFAULT_PRICE_AREA)
+
+    # The scheduler fires anomaly events whether or not the entity is enabled.
+    scheduler = AnomalyScheduler(hass, coordinator, entry)
+    entry.async_on_unload(scheduler.async_start())
+
+    async_add_entities([ElprisPriceAnomalySensor(scheduler, entry, price_area)])
+    _LOGGER.debug(f"Added {INTEGRATION_NAME} binary sensor entities.")
+
+
+class ElprisPriceAnomalySensor(BinarySensorEntity):
+    """On during quarters with a negative, spiking or deviating price."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_icon = ICON_PRICE_ANOMALY
+
+    def __init__(
+        self,
+        scheduler: AnomalyScheduler,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        self._scheduler = scheduler
+        self._price_area = price_area
+        self._attr_name = "Prisavvikelse"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_price_anomaly"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_device_info = device_info(entry, price_area)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._scheduler.async_add_listener(self._handle_scheduler_update)
+        )
+        self._update_from_scheduler()
+
+    @callback
+    def _handle_scheduler_update(self) -> None:
+        self._update_from_scheduler()
+        self.async_write_ha_state()
+
+    def _update_from_scheduler(self) -> None:
+        current = self._scheduler.current()
+        self._attr_is_on = current is not None
+        attrs = {
+            ATTR_PRICE_AREA: self._price_area,
+            ATTR_SIGMA: self._scheduler.sigma,
+            ATTR_BASELINE_DAYS: self._scheduler.baseline.days,
+        }
+        if current is not None:
+            attrs.update(anomaly_event_data(None, current))
+        attrs[ATTR_UPCOMING_ANOMALIES] = [
+            anomaly_event_data(None, anomaly)
+            for anomaly in self._scheduler.upcoming()[:MAX_LISTED_ANOMALIES]
+        ]
+        self._attr_extra_state_attributes = attrs
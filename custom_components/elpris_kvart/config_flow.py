@@ -5,13 +5,42 @@ import logging
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.core import callback
 from homeassistant.helpers import selector
 
 from .const import (
+    CONF_ANOMALY_SIGMA,
+    CONF_API_BASE_URL,
+    CONF_API_TOKEN,
+    CONF_BATTERY_CAPACITY_KWH,
+    CONF_BATTERY_CHARGE_KW,
+    CONF_BATTERY_DISCHARGE_KW,
+    CONF_BATTERY_EFFICIENCY_PCT,
+    CONF_BATTERY_MAX_SOC_PCT,
+    CONF_BATTERY_MIN_SOC_PCT,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_COMPARE_AREAS,
+    CONF_ENERGY_SENSOR,
+    CONF_HUB_ENABLED,
+    CONF_MEMORY_BUDGET_KB,
+    CONF_PEAK_COUNT,
+    CONF_PEAK_FEE_SEK_PER_KW,
+    CONF_PEAK_HIGH_LOAD_ONLY,
     CONF_PRICE_AREA,
+    CONF_PRICE_THRESHOLDS_ORE,
+    CONF_RETENTION_DAYS,
     CONF_SURCHARGE_ORE,
+    DEFAULT_ANOMALY_SIGMA,
+    DEFAULT_BATTERY_EFFICIENCY_PCT,
+    DEFAULT_BATTERY_MAX_SOC_PCT,
+    DEFAULT_BATTERY_MIN_SOC_PCT,
+    DEFAULT_LEVEL_THRESHOLDS_PCT,
+    DEFAULT_MEMORY_BUDGET_KB,
+    DEFAULT_PEAK_COUNT,
+    DEFAULT_PEAK_FEE_SEK_PER_KW,
     DEFAULT_PRICE_AREA,
+    DEFAULT_RETENTION_DAYS,
     DEFAULT_SURCHARGE_ORE,
     DOMAIN,
     INTEGRATION_NAME,
@@ -20,6 +49,42 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Battery options: (default, maximum, unit)
+BATTERY_NUMBER_OPTIONS = {
+    CONF_BATTERY_CAPACITY_KWH: (0.0, 1000.0, "kWh"),
+    CONF_BATTERY_CHARGE_KW: (0.0, 1000.0, "kW"),
+    CONF_BATTERY_DISCHARGE_KW: (0.0, 1000.0, "kW"),
+    CONF_BATTERY_EFFICIENCY_PCT: (DEFAULT_BATTERY_EFFICIENCY_PCT, 100.0, "%"),
+    CONF_BATTERY_MIN_SOC_PCT: (DEFAULT_BATTERY_MIN_SOC_PCT, 100.0, "%"),
+    CONF_BATTERY_MAX_SOC_PCT: (DEFAULT_BATTERY_MAX_SOC_PCT, 100.0, "%"),
+}
+
+# Option groups shown in the options menu, one step each
+OPTIONS_MENU = [
+    "prices",
+    "levels",
+    "cost",
+    "peaks",
+    "battery",
+    "areas",
+    "anomalies",
+    "storage",
+    "hub",
+]
+
+
+def _parse_price_thresholds(values: list[str]) -> list[float] | None:
+    """Parse threshold strings (öre/kWh, comma or dot decimals)."""
+    try:
+        return sorted({float(value.replace(",", ".")) for value in values})
+    except ValueError:
+        return None
+
+
+def _valid_api_base_url(value: str | None) -> bool:
+    """Accept an empty value (public API) or an http(s) URL."""
+    return not value or value.startswith(("http://", "https://"))
+
 
 class ElprisKvartConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Elpris Kvart."""
@@ -98,7 +163,11 @@ class ElprisKvartConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
 
 class ElprisKvartOptionsFlowHandler(config_entries.OptionsFlow):
-    """Handle an options flow for Elpris Kvart."""
+    """Handle an options flow for Elpris Kvart.
+
+    The options are grouped per feature behind a menu. Each step only
+    changes its own keys and keeps the rest of the entry's options.
+    """
 
     def __init__(self, config_entry: config_entries.ConfigEntry):
         """Initialize options flow."""
@@ -109,21 +178,63 @@ class ElprisKvartOptionsFlowHandler(config_entries.OptionsFlow):
         )
 
     async def async_step_init(self, user_input=None):
-        """Manage the options."""
+        """Show the option groups."""
+        return self.async_show_menu(step_id="init", menu_options=OPTIONS_MENU)
+
+    def _option(self, key: str, default=None):
+        return self._config_entry.options.get(key, default)
+
+    def _suggested(self, key: str) -> dict:
+        return {"suggested_value": self._config_entry.options.get(key)}
+
+    def _save(self, updates: dict, cleared: tuple[str, ...] = ()):
+        """Merge one step's options into the entry's options and finish."""
+        options = {**self._config_entry.options, **updates}
+        for key in cleared:
+            options.pop(key, None)
+        return self.async_create_entry(title="", data=options)
+
+    def _save_with_optional(
+        self, updates: dict, user_input: dict, optional: tuple[str, ...]
+    ):
+        """Save, dropping optional keys that were left empty."""
+        cleared = []
+        for key in optional:
+            if value := user_input.get(key):
+                updates[key] = value
+            else:
+                cleared.append(key)
+        return self._save(updates, tuple(cleared))
+
+    async def async_step_prices(self, user_input=None):
+        """Manage the surcharge and the spot price event thresholds."""
         errors = {}
         if user_input is not None:
             try:
                 surcharge = float(user_input[CONF_SURCHARGE_ORE])
+            except ValueError:
+                errors["base"] = "invalid_surcharge_format"
+            else:
+                price_thresholds = _parse_price_thresholds(
+                    user_input.get(CONF_PRICE_THRESHOLDS_ORE, [])
+                )
                 if surcharge < 0:
                     errors["base"] = "negative_surcharge"
+                elif price_thresholds is None:
+                    errors["base"] = "invalid_price_thresholds"
+                elif price_thresholds:
+                    return self._save(
+                        {
+                            CONF_SURCHARGE_ORE: surcharge,
+                            CONF_PRICE_THRESHOLDS_ORE: price_thresholds,
+                        }
+                    )
                 else:
-                    updated_options = {**self._config_entry.options}
-                    updated_options[CONF_SURCHARGE_ORE] = surcharge
-                    return self.async_create_entry(title="", data=updated_options)
-            except ValueError:
-                errors["base"] = "invalid_surcharge_format"
+                    return self._save(
+                        {CONF_SURCHARGE_ORE: surcharge}, (CONF_PRICE_THRESHOLDS_ORE,)
+                    )
 
-        options_schema = vol.Schema(
+        schema = vol.Schema(
             {
                 vol.Required(
                     CONF_SURCHARGE_ORE, default=self.current_surcharge
@@ -135,14 +246,298 @@ class ElprisKvartOptionsFlowHandler(config_entries.OptionsFlow):
                         unit_of_measurement="öre",
                     )
                 ),
+                vol.Optional(
+                    CONF_PRICE_THRESHOLDS_ORE,
+                    default=[
+                        f"{value:g}"
+                        for value in self._option(CONF_PRICE_THRESHOLDS_ORE, [])
+                    ],
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(multiple=True, suffix="öre/kWh")
+                ),
             }
         )
-
         return self.async_show_form(
-            step_id="init",
-            data_schema=options_schema,
+            step_id="prices",
+            data_schema=schema,
             errors=errors,
             description_placeholders={
                 "surcharge_help_text": "Ändra ditt elpåslag i öre per kWh."
             },
         )
+
+    async def async_step_levels(self, user_input=None):
+        """Manage the percentile limits of the price levels."""
+        errors = {}
+        if user_input is not None:
+            thresholds = [
+                float(user_input[key]) for key in DEFAULT_LEVEL_THRESHOLDS_PCT
+            ]
+            if thresholds != sorted(thresholds):
+                errors["base"] = "invalid_level_thresholds"
+            else:
+                return self._save(
+                    dict(zip(DEFAULT_LEVEL_THRESHOLDS_PCT, thresholds, strict=True))
+                )
+
+        schema = vol.Schema(
+            {
+                vol.Required(key, default=self._option(key, default)): (
+                    selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0.0,
+                            max=100.0,
+                            step=1.0,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="%",
+                        )
+                    )
+                )
+                for key, default in DEFAULT_LEVEL_THRESHOLDS_PCT.items()
+            }
+        )
+        return self.async_show_form(step_id="levels", data_schema=schema, errors=errors)
+
+    async def async_step_cost(self, user_input=None):
+        """Manage the consumption sensor used for the cost sensors."""
+        if user_input is not None:
+            return self._save_with_optional({}, user_input, (CONF_ENERGY_SENSOR,))
+
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_ENERGY_SENSOR, description=self._suggested(CONF_ENERGY_SENSOR)
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain="sensor",
+                        device_class=[
+                            SensorDeviceClass.ENERGY,
+                            SensorDeviceClass.POWER,
+                        ],
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(step_id="cost", data_schema=schema)
+
+    async def async_step_peaks(self, user_input=None):
+        """Manage the monthly power peaks for a capacity tariff."""
+        if user_input is not None:
+            return self._save(
+                {
+                    CONF_PEAK_COUNT: int(user_input[CONF_PEAK_COUNT]),
+                    CONF_PEAK_FEE_SEK_PER_KW: float(
+                        user_input[CONF_PEAK_FEE_SEK_PER_KW]
+                    ),
+                    CONF_PEAK_HIGH_LOAD_ONLY: bool(
+                        user_input[CONF_PEAK_HIGH_LOAD_ONLY]
+                    ),
+                }
+            )
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_PEAK_COUNT,
+                    default=self._option(CONF_PEAK_COUNT, DEFAULT_PEAK_COUNT),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=10,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="timmar",
+                    )
+                ),
+                vol.Required(
+                    CONF_PEAK_FEE_SEK_PER_KW,
+                    default=self._option(
+                        CONF_PEAK_FEE_SEK_PER_KW, DEFAULT_PEAK_FEE_SEK_PER_KW
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0.0,
+                        step=0.01,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="kr/kW",
+                    )
+                ),
+                vol.Required(
+                    CONF_PEAK_HIGH_LOAD_ONLY,
+                    default=self._option(CONF_PEAK_HIGH_LOAD_ONLY, False),
+                ): selector.BooleanSelector(),
+            }
+        )
+        return self.async_show_form(step_id="peaks", data_schema=schema)
+
+    async def async_step_battery(self, user_input=None):
+        """Manage the home battery used for the battery plan."""
+        errors = {}
+        if user_input is not None:
+            battery = {key: float(user_input[key]) for key in BATTERY_NUMBER_OPTIONS}
+            if battery[CONF_BATTERY_MIN_SOC_PCT] >= battery[CONF_BATTERY_MAX_SOC_PCT]:
+                errors["base"] = "invalid_battery_soc"
+            else:
+                return self._save_with_optional(
+                    battery, user_input, (CONF_BATTERY_SOC_SENSOR,)
+                )
+
+        schema = vol.Schema(
+            {
+                **{
+                    vol.Required(key, default=self._option(key, default)): (
+                        selector.NumberSelector(
+                            selector.NumberSelectorConfig(
+                                min=0.0,
+                                max=maximum,
+                                step=0.1,
+                                mode=selector.NumberSelectorMode.BOX,
+                                unit_of_measurement=unit,
+                            )
+                        )
+                    )
+                    for key, (default, maximum, unit) in BATTERY_NUMBER_OPTIONS.items()
+                },
+                vol.Optional(
+                    CONF_BATTERY_SOC_SENSOR,
+                    description=self._suggested(CONF_BATTERY_SOC_SENSOR),
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain="sensor", device_class=SensorDeviceClass.BATTERY
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(
+            step_id="battery", data_schema=schema, errors=errors
+        )
+
+    async def async_step_areas(self, user_input=None):
+        """Manage the other price areas this entry is compared with."""
+        own_area = self._config_entry.data.get(CONF_PRICE_AREA)
+        if user_input is not None:
+            return self._save(
+                {
+                    CONF_COMPARE_AREAS: [
+                        area
+                        for area in user_input.get(CONF_COMPARE_AREAS, [])
+                        if area != own_area
+                    ]
+                }
+            )
+
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_COMPARE_AREAS, default=self._option(CONF_COMPARE_AREAS, [])
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=[area for area in PRICE_AREAS if area != own_area],
+                        multiple=True,
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(step_id="areas", data_schema=schema)
+
+    async def async_step_anomalies(self, user_input=None):
+        """Manage the deviation limit of the price anomaly detection."""
+        if user_input is not None:
+            return self._save(
+                {CONF_ANOMALY_SIGMA: float(user_input[CONF_ANOMALY_SIGMA])}
+            )
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_ANOMALY_SIGMA,
+                    default=self._option(CONF_ANOMALY_SIGMA, DEFAULT_ANOMALY_SIGMA),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0.0,
+                        max=10.0,
+                        step=0.1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="σ",
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(step_id="anomalies", data_schema=schema)
+
+    async def async_step_storage(self, user_input=None):
+        """Manage how long prices are kept on disk and in memory."""
+        if user_input is not None:
+            return self._save(
+                {
+                    CONF_RETENTION_DAYS: int(user_input[CONF_RETENTION_DAYS]),
+                    CONF_MEMORY_BUDGET_KB: float(user_input[CONF_MEMORY_BUDGET_KB]),
+                }
+            )
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_RETENTION_DAYS,
+                    default=self._option(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=2,
+                        max=3660,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="dagar",
+                    )
+                ),
+                vol.Required(
+                    CONF_MEMORY_BUDGET_KB,
+                    default=self._option(
+                        CONF_MEMORY_BUDGET_KB, DEFAULT_MEMORY_BUDGET_KB
+                    ),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        step=64,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="kB",
+                    )
+                ),
+            }
+        )
+        return self.async_show_form(step_id="storage", data_schema=schema)
+
+    async def async_step_hub(self, user_input=None):
+        """Manage where prices are fetched from and whether they are shared."""
+        errors = {}
+        if user_input is not None:
+            api_base_url = (user_input.get(CONF_API_BASE_URL) or "").rstrip("/")
+            if not _valid_api_base_url(api_base_url):
+                errors["base"] = "invalid_api_base_url"
+            else:
+                return self._save_with_optional(
+                    {CONF_HUB_ENABLED: bool(user_input[CONF_HUB_ENABLED])},
+                    {
+                        CONF_API_BASE_URL: api_base_url,
+                        CONF_API_TOKEN: (user_input.get(CONF_API_TOKEN) or "").strip(),
+                    },
+                    (CONF_API_BASE_URL, CONF_API_TOKEN),
+                )
+
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_API_BASE_URL, description=self._suggested(CONF_API_BASE_URL)
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(type=selector.TextSelectorType.URL)
+                ),
+                vol.Optional(
+                    CONF_API_TOKEN, description=self._suggested(CONF_API_TOKEN)
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(type=selector.TextSelectorType.PASSWORD)
+                ),
+                vol.Required(
+                    CONF_HUB_ENABLED, default=self._option(CONF_HUB_ENABLED, False)
+                ): selector.BooleanSelector(),
+            }
+        )
+        return self.async_show_form(step_id="hub", data_schema=schema, errors=errors)
@@ -2,7 +2,7 @@
 """Constants for the Elpris Kvart integration."""
 
 DOMAIN = "elpris_kvart"
-PLATFORMS = ["sensor"]
+PLATFORMS = ["sensor", "binary_sensor"]
 
 # Integration Identity
 INTEGRATION_NAME = "Elpris Kvart"
@@ -16,10 +16,177 @@ PRICE_AREAS = ["SE1", "SE2", "SE3", "SE4"]
 
 # API details
 API_BASE_URL = "https://www.elprisetjustnu.se/api/v1/prices"
+# Path under which a hub instance serves its cached prices in the same layout
+HUB_URL_PREFIX = f"/api/{DOMAIN}/v1/prices"
+
+# Price columns of the API rows; every numeric column is kept when parsing
+PRICE_COLUMN_SEK = "SEK_per_kWh"
+PRICE_COLUMN_EUR = "EUR_per_kWh"
+PRICE_COLUMN_EXR = "EXR"  # SEK per EUR
+EXTRA_PRICE_COLUMNS = (PRICE_COLUMN_EUR, PRICE_COLUMN_EXR)
+
+# Persistent cache
+STORAGE_VERSION = 1
+DEFAULT_RETENTION_DAYS = 35
+DEFAULT_MEMORY_BUDGET_KB = 512
 
 # Configuration keys
 CONF_PRICE_AREA = "price_area"
 CONF_SURCHARGE_ORE = "surcharge_ore"  # Surcharge is always configured in öre
+CONF_ENERGY_SENSOR = "energy_sensor"  # Power (W/kW) or energy (Wh/kWh) sensor
+CONF_RETENTION_DAYS = "retention_days"  # Days of prices kept on disk
+CONF_MEMORY_BUDGET_KB = "memory_budget_kb"  # Budget for cold days in memory
+CONF_LEVEL_VERY_CHEAP_PCT = "level_very_cheap_pct"
+CONF_LEVEL_CHEAP_PCT = "level_cheap_pct"
+CONF_LEVEL_EXPENSIVE_PCT = "level_expensive_pct"
+CONF_LEVEL_VERY_EXPENSIVE_PCT = "level_very_expensive_pct"
+CONF_PRICE_THRESHOLDS_ORE = "price_thresholds_ore"  # Spot price event thresholds
+CONF_COMPARE_AREAS = "compare_areas"  # Other price areas to compare against
+CONF_BATTERY_CAPACITY_KWH = "battery_capacity_kwh"  # 0 disables battery planning
+CONF_BATTERY_CHARGE_KW = "battery_charge_kw"
+CONF_BATTERY_DISCHARGE_KW = "battery_discharge_kw"
+CONF_BATTERY_EFFICIENCY_PCT = "battery_efficiency_pct"  # Round-trip efficiency
+CONF_BATTERY_MIN_SOC_PCT = "battery_min_soc_pct"
+CONF_BATTERY_MAX_SOC_PCT = "battery_max_soc_pct"
+CONF_BATTERY_SOC_SENSOR = "battery_soc_sensor"  # State of charge sensor (%)
+CONF_API_BASE_URL = "api_base_url"  # Public API or another instance's hub
+CONF_API_TOKEN = "api_token"  # Access token for another instance's hub
+CONF_HUB_ENABLED = "hub_enabled"  # Serve cached prices to other instances
+CONF_ANOMALY_SIGMA = "anomaly_sigma"  # Deviation limit in standard deviations
+CONF_PEAK_COUNT = "peak_count"  # Hourly peaks averaged per month, 0 disables
+CONF_PEAK_FEE_SEK_PER_KW = "peak_fee_sek_per_kw"  # Capacity fee per kW and month
+CONF_PEAK_HIGH_LOAD_ONLY = "peak_high_load_only"  # Only count high-load hours
+
+# Options that add or remove entities, event helpers or the hub view; changing
+# one reloads the entry, all other options are applied to the running
+# coordinator.
+RELOAD_OPTIONS = frozenset(
+    {
+        CONF_ENERGY_SENSOR,
+        CONF_PRICE_THRESHOLDS_ORE,
+        CONF_COMPARE_AREAS,
+        CONF_BATTERY_CAPACITY_KWH,
+        CONF_BATTERY_CHARGE_KW,
+        CONF_BATTERY_DISCHARGE_KW,
+        CONF_BATTERY_EFFICIENCY_PCT,
+        CONF_BATTERY_MIN_SOC_PCT,
+        CONF_BATTERY_MAX_SOC_PCT,
+        CONF_BATTERY_SOC_SENSOR,
+        CONF_PEAK_COUNT,
+        CONF_PEAK_HIGH_LOAD_ONLY,
+        CONF_HUB_ENABLED,
+    }
+)
+
+# Price level categories and default percentile thresholds (upper bounds)
+PRICE_LEVEL_VERY_CHEAP = "very_cheap"
+PRICE_LEVEL_CHEAP = "cheap"
+PRICE_LEVEL_NORMAL = "normal"
+PRICE_LEVEL_EXPENSIVE = "expensive"
+PRICE_LEVEL_VERY_EXPENSIVE = "very_expensive"
+PRICE_LEVELS = [
+    PRICE_LEVEL_VERY_CHEAP,
+    PRICE_LEVEL_CHEAP,
+    PRICE_LEVEL_NORMAL,
+    PRICE_LEVEL_EXPENSIVE,
+    PRICE_LEVEL_VERY_EXPENSIVE,
+]
+DEFAULT_LEVEL_THRESHOLDS_PCT = {
+    CONF_LEVEL_VERY_CHEAP_PCT: 10.0,
+    CONF_LEVEL_CHEAP_PCT: 35.0,
+    CONF_LEVEL_EXPENSIVE_PCT: 65.0,
+    CONF_LEVEL_VERY_EXPENSIVE_PCT: 90.0,
+}
+
+# Battery planning
+DEFAULT_BATTERY_EFFICIENCY_PCT = 90.0
+DEFAULT_BATTERY_MIN_SOC_PCT = 10.0
+DEFAULT_BATTERY_MAX_SOC_PCT = 100.0
+BATTERY_ACTION_CHARGE = "charge"
+BATTERY_ACTION_DISCHARGE = "discharge"
+BATTERY_ACTION_IDLE = "idle"
+BATTERY_ACTIONS = [BATTERY_ACTION_CHARGE, BATTERY_ACTION_DISCHARGE, BATTERY_ACTION_IDLE]
+
+# Capacity tariff peaks: high-load hours are weekdays from start to end hour
+DEFAULT_PEAK_COUNT = 0
+DEFAULT_PEAK_FEE_SEK_PER_KW = 0.0
+PEAK_HIGH_LOAD_START_HOUR = 7
+PEAK_HIGH_LOAD_END_HOUR = 20
+
+# Price anomalies: the baseline is the same quarter of day on recent days
+ANOMALY_NEGATIVE = "negative"
+ANOMALY_SPIKE = "spike"
+ANOMALY_DEVIATION = "deviation"
+ANOMALY_KINDS = [ANOMALY_NEGATIVE, ANOMALY_SPIKE, ANOMALY_DEVIATION]
+ANOMALY_BASELINE_DAYS = 28
+ANOMALY_MIN_BASELINE_DAYS = 5
+ANOMALY_SPIKE_RATIO = 2.0  # Times the mean of the neighbouring quarters
+ANOMALY_SPIKE_MIN_SEK = 0.5  # And at least this much above it
+DEFAULT_ANOMALY_SIGMA = 3.0
+
+# Rolling price distributions (days up to and including today)
+ROLLING_WINDOWS_DAYS = (7, 30)
+
+# Price estimate for tomorrow
+CONFIDENCE_LOW = "low"
+CONFIDENCE_MEDIUM = "medium"
+CONFIDENCE_HIGH = "high"
+DEFAULT_ESTIMATE_MODEL = "weekday_weighted"
+
+# Events
+EVENT_THRESHOLD_CROSSED = f"{DOMAIN}_threshold_crossed"
+ATTR_THRESHOLD_ORE = "threshold_ore"
+ATTR_DIRECTION = "direction"
+ATTR_PRICE_ORE = "price_ore"
+ATTR_PREVIOUS_PRICE_ORE = "previous_price_ore"
+DIRECTION_ABOVE = "above"
+DIRECTION_BELOW = "below"
+EVENT_PRICE_ANOMALY = f"{DOMAIN}_price_anomaly"
+ATTR_ANOMALY_KIND = "kind"
+ATTR_SLOT_START = "start"
+ATTR_SLOT_END = "end"
+ATTR_PRICE_SEK = "price_sek"
+ATTR_BASELINE_MEAN_SEK = "baseline_mean_sek"
+
+# Services
+SERVICE_PLAN_LOAD = "plan_load"
+ATTR_AREA = "area"
+ATTR_ENERGY_KWH = "energy_kwh"
+ATTR_MAX_POWER_KW = "max_power_kw"
+ATTR_EARLIEST_START = "earliest_start"
+ATTR_DEADLINE = "deadline"
+ATTR_MIN_BLOCK_MINUTES = "min_block_minutes"
+SERVICE_PLAN_BATTERY = "plan_battery"
+ATTR_CAPACITY_KWH = "capacity_kwh"
+ATTR_CHARGE_POWER_KW = "charge_power_kw"
+ATTR_DISCHARGE_POWER_KW = "discharge_power_kw"
+ATTR_EFFICIENCY_PCT = "efficiency_pct"
+ATTR_SOC_PCT = "soc_pct"
+ATTR_MIN_SOC_PCT = "min_soc_pct"
+ATTR_MAX_SOC_PCT = "max_soc_pct"
+ATTR_USE_ESTIMATE = "use_estimate"
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
+ATTR_CPROFILE = "cprofile"
+ATTR_PROFILE_ACTION = "action"
+PROFILE_ACTION_START = "start"
+PROFILE_ACTION_STOP = "stop"
+PROFILE_ACTIONS = [PROFILE_ACTION_START, PROFILE_ACTION_STOP]
+SERVICE_EXPORT_PRICES = "export_prices"
+ATTR_AREAS = "areas"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_FORMAT = "format"
+ATTR_COLUMNS = "columns"
+ATTR_TARIFF_ORE = "tariff_ore"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMATS = [EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON]
+EXPORT_COLUMN_SPOT = "spot"
+EXPORT_COLUMN_SURCHARGED = "surcharged"
+EXPORT_COLUMN_TOTAL = "total"
+EXPORT_COLUMNS = [EXPORT_COLUMN_SPOT, EXPORT_COLUMN_SURCHARGED, EXPORT_COLUMN_TOTAL]
+EXPORT_MAX_DAYS = 366
 
 # Update timings
 DAILY_FETCH_HOUR = 14
@@ -30,9 +197,11 @@ NORMAL_UPDATE_INTERVAL_HOURS = 1
 ATTR_PRICE_AREA = "price_area"
 ATTR_LAST_API_UPDATE = "last_api_data_update"
 ATTR_RAW_TODAY = "raw_today"
+ATTR_ESTIMATE_CONFIDENCE = "tomorrow_estimate_confidence"
 
 # Attributes for ÖRE sensors
 ATTR_TOMORROW_PRICES_ORE = "tomorrow_hourly_prices_ore"
+ATTR_TOMORROW_ESTIMATE_ORE = "tomorrow_estimated_prices_ore"
 ATTR_MIN_PRICE_TODAY_ORE = "min_price_today_ore"
 ATTR_MAX_PRICE_TODAY_ORE = "max_price_today_ore"
 ATTR_MIN_PRICE_TOMORROW_ORE = "min_price_tomorrow_ore"
@@ -40,8 +209,12 @@ ATTR_MAX_PRICE_TOMORROW_ORE = "max_price_tomorrow_ore"
 ATTR_SPOT_PRICE_ORE_ON_SURCHARGE_SENSOR = "spot_price_ore"
 ATTR_SURCHARGE_APPLIED_ORE_ON_SURCHARGE_SENSOR = "surcharge_applied_ore"
 
+# Attributes for EUR sensors
+ATTR_TOMORROW_PRICES_EUR = "tomorrow_hourly_prices_eur"
+
 # Attributes for SEK sensors
 ATTR_TOMORROW_PRICES_SEK = "tomorrow_hourly_prices_sek"
+ATTR_TOMORROW_ESTIMATE_SEK = "tomorrow_estimated_prices_sek"
 ATTR_MIN_PRICE_TODAY_SEK = "min_price_today_sek"
 ATTR_MAX_PRICE_TODAY_SEK = "max_price_today_sek"
 ATTR_MIN_PRICE_TOMORROW_SEK = "min_price_tomorrow_sek"
@@ -49,6 +222,71 @@ ATTR_MAX_PRICE_TOMORROW_SEK = "max_price_tomorrow_sek"
 ATTR_SPOT_PRICE_SEK_ON_SURCHARGE_SENSOR = "spot_price_sek"
 ATTR_SURCHARGE_APPLIED_SEK_ON_SURCHARGE_SENSOR = "surcharge_applied_sek"
 
+# Attributes for the hourly aggregate sensor
+ATTR_HOUR_MIN_SEK = "hour_min_sek"
+ATTR_HOUR_MAX_SEK = "hour_max_sek"
+ATTR_HOURLY_TODAY = "hourly_today"
+ATTR_HOURLY_TOMORROW = "hourly_tomorrow"
+
+# Attributes for rank/percentile sensors
+ATTR_PRICE_COUNT = "price_count"
+ATTR_PERCENTILE = "percentile"
+ATTR_LEVEL_THRESHOLDS = "level_thresholds_pct"
+ATTR_WINDOW_DAYS = "window_days"
+ATTR_Z_SCORE = "z_score"
+
+# Attributes for the cache diagnostic sensor
+ATTR_DAYS_IN_MEMORY = "days_in_memory"
+ATTR_DAYS_ON_DISK = "days_on_disk"
+ATTR_MEMORY_BUDGET_KB = "memory_budget_kb"
+ATTR_RETENTION_DAYS = "retention_days"
+ATTR_DATA_QUALITY = "data_quality"
+
+# Attributes for energy cost sensors
+ATTR_SOURCE_ENTITY = "source_entity"
+ATTR_UNPRICED_ENERGY_KWH = "unpriced_energy_kwh"
+ATTR_LAST_READING_VALUE = "last_reading_value"
+ATTR_LAST_READING_UNIT = "last_reading_unit"
+ATTR_LAST_READING_TIME = "last_reading_time"
+
+# Attributes for power peak sensors
+ATTR_PEAKS = "peaks"
+ATTR_PEAK_COUNT = "peak_count"
+ATTR_HIGH_LOAD_ONLY = "high_load_only"
+ATTR_CURRENT_HOUR_START = "current_hour_start"
+ATTR_CURRENT_HOUR_KWH = "current_hour_kwh"
+ATTR_PROJECTED_PEAK_KW = "projected_peak_kw"
+ATTR_FEE_SEK_PER_KW = "fee_sek_per_kw"
+
+# Attributes for the price anomaly binary sensor
+ATTR_UPCOMING_ANOMALIES = "upcoming"
+ATTR_BASELINE_DAYS = "baseline_days"
+ATTR_SIGMA = "sigma"
+
+# Attributes for the battery plan sensor
+ATTR_PLANNED_POWER_KW = "planned_power_kw"
+ATTR_TARGET_SOC_PCT = "target_soc_pct"
+ATTR_EXPECTED_SAVINGS_SEK = "expected_savings_sek"
+ATTR_SCHEDULE = "schedule"
+
+# Attributes for cross-area sensors
+ATTR_COMPARE_AREA = "compare_area"
+ATTR_AREA_PRICES_SEK = "area_prices_sek"
+ATTR_SPREAD_TODAY = "spread_today"
+ATTR_SPREAD_TOMORROW = "spread_tomorrow"
+
 # Icons
 ICON_CURRENCY_SEK = "mdi:currency-sek"
+ICON_CURRENCY_EUR = "mdi:currency-eur"
+ICON_EXCHANGE_RATE = "mdi:swap-horizontal"
 ICON_SURCHARGE_DISPLAY = "mdi:cash-plus"
+ICON_ENERGY_COST = "mdi:cash-clock"
+ICON_PRICE_RANK = "mdi:podium"
+ICON_PRICE_LEVEL = "mdi:gauge"
+ICON_PRICE_CACHE = "mdi:database"
+ICON_BATTERY_PLAN = "mdi:home-battery"
+ICON_AREA_SPREAD = "mdi:compare-horizontal"
+ICON_CHEAPEST_AREA = "mdi:map-marker-down"
+ICON_POWER_PEAK = "mdi:transmission-tower"
+ICON_PEAK_FEE = "mdi:cash-multiple"
+ICON_PRICE_ANOMALY = "mdi:chart-bell-curve"
@@ -0,0 +1,291 @@
+# Version: 2025-12-19-rev18
+"""Realized energy cost accumulation for Elpris Kvart."""
+
+import logging
+from collections.abc import Callable
+from datetime import datetime as DateTimeObject
+from datetime import timedelta
+
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+)
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PERIOD_TODAY = "today"
+PERIOD_MONTH = "month"
+PERIOD_TOTAL = "total"
+COST_PERIODS = (PERIOD_TODAY, PERIOD_MONTH, PERIOD_TOTAL)
+
+# Factors converting a reading into kWh (energy) or kW (power)
+ENERGY_UNIT_FACTORS = {"Wh": 0.001, "kWh": 1.0, "MWh": 1000.0}
+POWER_UNIT_FACTORS = {"W": 0.001, "kW": 1.0}
+
+
+class EnergyCostTracker:
+    """Accumulate consumed energy times the quarter-hour price in effect.
+
+    Each state change of the source sensor is handled in constant time: the
+    energy since the previous reading is spread linearly over the time between
+    the two readings and priced per quarter it overlaps. Only a restart gap
+    can span more than one or two quarters. A timer at each local midnight
+    starts the new day (and month) even when the source is silent.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: ElprisDataUpdateCoordinator,
+        source_entity_id: str,
+    ):
+        """Initialize the tracker."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.source_entity_id = source_entity_id
+
+        self.costs: dict[str, float] = dict.fromkeys(COST_PERIODS, 0.0)
+        self.period_starts: dict[str, DateTimeObject | None] = dict.fromkeys(
+            COST_PERIODS
+        )
+        self.unpriced_energy_kwh = 0.0
+
+        # Last reading: (UTC timestamp, value, unit)
+        self.last_reading: tuple[float, float, str] | None = None
+        # Whether an interval has been priced since start, which makes the
+        # live readings newer than anything restored from a previous run
+        self._interval_handled = False
+
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._energy_consumers: list[Callable[[float, float, float], None]] = []
+        self._unsub_state: CALLBACK_TYPE | None = None
+        self._unsub_period_timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable:
+        """Register an entity callback and start tracking on first listener."""
+        self._listeners.append(update_callback)
+        if self._unsub_state is None:
+            self._unsub_state = async_track_state_change_event(
+                self.hass, [self.source_entity_id], self._async_handle_state_event
+            )
+            if (state := self.hass.states.get(self.source_entity_id)) is not None:
+                self._handle_reading(
+                    state.state,
+                    state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+                    state.last_updated,
+                )
+            self._schedule_period_timer()
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+            if not self._listeners and self._unsub_state is not None:
+                self._unsub_state()
+                self._unsub_state = None
+                if self._unsub_period_timer is not None:
+                    self._unsub_period_timer()
+                    self._unsub_period_timer = None
+
+        return remove_listener
+
+    @callback
+    def async_add_energy_consumer(
+        self, consumer: Callable[[float, float, float], None]
+    ) -> None:
+        """Also pass each measured energy interval (start, end, kWh) on."""
+        self._energy_consumers.append(consumer)
+
+    def get_cost(self, period: str) -> float:
+        """Return the accumulated cost for a period, zero if it has ended."""
+        if period != PERIOD_TOTAL and self.period_starts[period] != (
+            self._period_start(period, dt_util.utcnow().timestamp())
+        ):
+            return 0.0
+        return self.costs[period]
+
+    @callback
+    def async_restore_period(
+        self, period: str, value: float, period_start: DateTimeObject | None
+    ) -> None:
+        """Restore an accumulated value from a previous run."""
+        if period != PERIOD_TOTAL and period_start != self._period_start(
+            period, dt_util.utcnow().timestamp()
+        ):
+            # The restored value belongs to a period that has ended.
+            return
+        self.costs[period] = value
+        self.period_starts[period] = period_start
+
+    @callback
+    def async_restore_reading(
+        self, value: float, unit: str, reading_time: DateTimeObject
+    ) -> None:
+        """Restore the last reading processed before a restart.
+
+        The restored reading wins over the first live sample taken when
+        tracking started, which is then replayed so the energy consumed
+        while Home Assistant was down is priced. Power readings are not
+        restored: the last power value says nothing about the downtime.
+        """
+        if self._interval_handled or unit not in ENERGY_UNIT_FACTORS:
+            return
+        timestamp = reading_time.timestamp()
+        if self.last_reading is not None and self.last_reading[0] <= timestamp:
+            return
+        self.last_reading = (timestamp, value, unit)
+        if (state := self.hass.states.get(self.source_entity_id)) is not None:
+            self._handle_reading(
+                state.state,
+                state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+                state.last_updated,
+            )
+
+    @callback
+    def async_flush(self) -> None:
+        """Price a held power reading up to now.
+
+        No new state is written while a power sensor is flat, so the
+        interval since the last change is only priced at the next change.
+        Consumers closing an hour flush first; energy sensors are left alone.
+        """
+        if self.last_reading is None or self.last_reading[2] not in POWER_UNIT_FACTORS:
+            return
+        if (state := self.hass.states.get(self.source_entity_id)) is not None:
+            self._handle_reading(
+                state.state,
+                state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+                dt_util.utcnow(),
+            )
+
+    def _schedule_period_timer(self) -> None:
+        """Wake at the next local midnight, where a day and maybe a month end."""
+        self._unsub_period_timer = async_track_point_in_time(
+            self.hass,
+            self._async_period_ended,
+            dt_util.start_of_local_day(dt_util.now().date() + timedelta(days=1)),
+        )
+
+    @callback
+    def _async_period_ended(self, now: DateTimeObject) -> None:
+        """Price a held power reading, then start the new periods at zero."""
+        self._unsub_period_timer = None
+        self.async_flush()
+        self._roll_periods(now.timestamp())
+        self._schedule_period_timer()
+        self._notify()
+
+    @callback
+    def _async_handle_state_event(self, event: Event) -> None:
+        """Handle a state change of the source sensor."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        self._handle_reading(
+            new_state.state,
+            new_state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+            new_state.last_updated,
+        )
+
+    def _handle_reading(
+        self, raw_value: str, unit: str | None, reading_time: DateTimeObject
+    ) -> None:
+        """Price the energy consumed since the previous reading."""
+        if raw_value in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return
+        if unit not in ENERGY_UNIT_FACTORS and unit not in POWER_UNIT_FACTORS:
+            _LOGGER.warning(
+                f"Unsupported unit '{unit}' on {self.source_entity_id}, "
+                "expected an energy (Wh/kWh/MWh) or power (W/kW) sensor."
+            )
+            return
+        try:
+            value = float(raw_value)
+        except (TypeError, ValueError):
+            return
+
+        timestamp = reading_time.timestamp()
+        previous = self.last_reading
+        if previous is not None and timestamp <= previous[0]:
+            return
+        self.last_reading = (timestamp, value, unit)
+        if previous is None or previous[2] != unit:
+            return
+        self._interval_handled = True
+
+        prev_timestamp, prev_value, _ = previous
+        if unit in ENERGY_UNIT_FACTORS:
+            delta = value - prev_value
+            if delta < 0:
+                # Meter reset, count from zero like total_increasing does.
+                delta = value
+            energy_kwh = delta * ENERGY_UNIT_FACTORS[unit]
+        else:
+            # Left Riemann sum: the previous power held until this reading.
+            hours = (timestamp - prev_timestamp) / 3600
+            energy_kwh = prev_value * POWER_UNIT_FACTORS[unit] * hours
+
+        if energy_kwh:
+            self._distribute(prev_timestamp, timestamp, energy_kwh)
+            for consumer in self._energy_consumers:
+                consumer(prev_timestamp, timestamp, energy_kwh)
+        self._notify()
+
+    def _notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _distribute(self, start_ts: float, end_ts: float, energy_kwh: float) -> None:
+        """Split energy linearly over [start_ts, end_ts) and price each quarter."""
+        surcharge_sek = self.coordinator.get_surcharge_sek()
+        kwh_per_second = energy_kwh / (end_ts - start_ts)
+        segment_start = start_ts
+        while segment_start < end_ts:
+            timeline, slot = self.coordinator.locate_slot(segment_start)
+            segment_end = min(timeline.slot_start_ts(slot + 1), end_ts)
+            segment_kwh = kwh_per_second * (segment_end - segment_start)
+            price = self.coordinator.get_slot_price(timeline, slot)
+            if price is None:
+                self.unpriced_energy_kwh += segment_kwh
+            else:
+                self._add_cost(segment_start, segment_kwh * (price + surcharge_sek))
+            segment_start = segment_end
+
+    def _add_cost(self, timestamp: float, cost_sek: float) -> None:
+        """Add cost to every period containing timestamp.
+
+        Cost from a period that has already been closed only counts in the
+        total, so a period never decreases after its reset.
+        """
+        self._roll_periods(timestamp)
+        for period in COST_PERIODS:
+            if self.period_starts[period] == self._period_start(period, timestamp):
+                self.costs[period] += cost_sek
+
+    def _roll_periods(self, timestamp: float) -> None:
+        """Start the periods containing timestamp at zero if they are newer."""
+        for period in (PERIOD_TODAY, PERIOD_MONTH):
+            period_start = self._period_start(period, timestamp)
+            current = self.period_starts[period]
+            if current is None or current < period_start:
+                self.costs[period] = 0.0
+                self.period_starts[period] = period_start
+
+    @staticmethod
+    def _period_start(period: str, timestamp: float) -> DateTimeObject | None:
+        """Return the local start of the period containing timestamp."""
+        if period == PERIOD_TOTAL:
+            return None
+        local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+        if period == PERIOD_MONTH:
+            local = local.replace(day=1)
+        return dt_util.start_of_local_day(local.date())
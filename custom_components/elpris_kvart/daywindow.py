@@ -0,0 +1,128 @@
+# Version: 2025-12-19-rev18
+"""Sliding windows of per-day price summaries for Elpris Kvart."""
+
+from collections.abc import Callable
+from datetime import date as DateObject
+from datetime import timedelta
+from typing import Generic, TypeVar
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .normalize import normalize_day
+from .store import PriceCache
+from .timeline import SlotTimeline
+
+SummaryT = TypeVar("SummaryT")
+
+
+class DaySummaries(Generic[SummaryT]):
+    """Per-day summaries of recent days, kept with their data version.
+
+    Days already normalized in memory are summarized from their slots.
+    Other days are read from the per-day store without entering the
+    in-memory cache and are normalized and summarized in the executor; they
+    have no version. Days found on neither are remembered so the store is
+    not asked again.
+    """
+
+    def __init__(
+        self, summarize: Callable[[list[float | None], SlotTimeline], SummaryT]
+    ):
+        """Initialize with the function that summarizes a day's slots."""
+        self._summarize = summarize
+        self.days: dict[DateObject, tuple[int | None, SummaryT]] = {}
+        self._missing: set[DateObject] = set()
+
+    async def async_collect(
+        self,
+        hass: HomeAssistant,
+        cache: PriceCache,
+        slot_prices: dict[DateObject, list[float | None]],
+        day_versions: dict[DateObject, int],
+        first: DateObject,
+        last: DateObject,
+    ) -> dict[DateObject, tuple[int | None, SummaryT]]:
+        """Return summaries of the days in [first, last] that are new or changed."""
+        time_zone = dt_util.get_default_time_zone()
+        summaries: dict[DateObject, tuple[int | None, SummaryT]] = {}
+        disk_rows: dict[DateObject, list] = {}
+        day = last
+        while day >= first:
+            entry = self.days.get(day)
+            if slots := slot_prices.get(day):
+                version = day_versions.get(day)
+                if entry is None or entry[0] != version:
+                    summaries[day] = (
+                        version,
+                        self._summarize(slots, SlotTimeline(day, time_zone)),
+                    )
+            elif entry is None and day not in self._missing:
+                if rows := await cache.async_peek_day(day):
+                    disk_rows[day] = rows
+                else:
+                    self._missing.add(day)
+            day -= timedelta(days=1)
+        if disk_rows:
+            summaries.update(
+                await hass.async_add_executor_job(
+                    self._summarize_rows, disk_rows, time_zone
+                )
+            )
+        return summaries
+
+    def _summarize_rows(
+        self, rows_by_day: dict[DateObject, list], time_zone
+    ) -> dict[DateObject, tuple[None, SummaryT]]:
+        """Normalize and summarize days read from disk; runs in the executor."""
+        summaries = {}
+        for day, rows in rows_by_day.items():
+            timeline = SlotTimeline(day, time_zone)
+            summaries[day] = (
+                None,
+                self._summarize(normalize_day(rows, timeline)[0], timeline),
+            )
+        return summaries
+
+    def apply(
+        self,
+        first: DateObject,
+        last: DateObject,
+        summaries: dict[DateObject, tuple[int | None, SummaryT]],
+    ) -> None:
+        """Store new day summaries and forget days outside [first, last]."""
+        self.days.update(summaries)
+        for day in [day for day in self.days if not first <= day <= last]:
+            del self.days[day]
+        self._missing = {day for day in self._missing if first <= day <= last}
+
+
+class DayWindow(Generic[SummaryT]):
+    """An aggregate over a range of days, moved one day at a time.
+
+    The window remembers the summary it merged for each member day. When
+    the range moves, or a member's summary is replaced, only those days are
+    subtracted from or added to the aggregate through merge(summary, sign).
+    """
+
+    def __init__(self, merge: Callable[[SummaryT, int], None]):
+        """Initialize an empty window around the aggregate's merge function."""
+        self._merge = merge
+        self.members: dict[DateObject, SummaryT] = {}
+
+    def move(
+        self,
+        first: DateObject,
+        last: DateObject,
+        summaries: dict[DateObject, tuple[int | None, SummaryT]],
+    ) -> None:
+        """Make the window cover the summarized days in [first, last]."""
+        for day, summary in list(self.members.items()):
+            entry = summaries.get(day)
+            if not first <= day <= last or entry is None or entry[1] is not summary:
+                self._merge(summary, -1)
+                del self.members[day]
+        for day, (_, summary) in summaries.items():
+            if first <= day <= last and day not in self.members:
+                self._merge(summary, 1)
+                self.members[day] = summary
@@ -0,0 +1,57 @@
+# Version: 2025-12-19-rev18
+"""Diagnostics support for Elpris Kvart."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import ElprisDataUpdateCoordinator
+from .const import CONF_API_TOKEN, DOMAIN
+from .profiler import DATA_PROFILER
+
+TO_REDACT = {CONF_API_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: ElprisDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    cache = coordinator.cache
+    profiler = hass.data.get(DATA_PROFILER)
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "coordinator": {
+            "price_area": coordinator.price_area,
+            "last_update_success": coordinator.last_update_success,
+            "last_api_call": (
+                coordinator.last_api_call_timestamp.isoformat()
+                if coordinator.last_api_call_timestamp
+                else None
+            ),
+            "data_version": coordinator.data_version,
+            "day_versions": {
+                day.isoformat(): version
+                for day, version in sorted(coordinator.day_versions.items())
+            },
+            "days_with_prices": [day.isoformat() for day in sorted(coordinator.data)]
+            if coordinator.data
+            else [],
+            "data_quality": {
+                day.isoformat(): quality.as_dict()
+                for day, quality in sorted(coordinator.data_quality.items())
+            },
+        },
+        "cache": {
+            "days_in_memory": [day.isoformat() for day in sorted(cache.memory)],
+            "days_on_disk": cache.days_on_disk,
+            "memory_usage_bytes": cache.memory_usage_bytes,
+            "memory_budget_bytes": cache.memory_budget_bytes,
+        },
+        "profiler": profiler.summary() if profiler is not None else None,
+    }
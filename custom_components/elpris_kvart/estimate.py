@@ -0,0 +1,176 @@
+# Version: 2025-12-19-rev18
+"""Estimated prices for tomorrow, from cached price history."""
+
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date as DateObject
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONFIDENCE_HIGH,
+    CONFIDENCE_LOW,
+    CONFIDENCE_MEDIUM,
+    DEFAULT_ESTIMATE_MODEL,
+)
+from .normalize import normalize_day
+from .store import PriceCache
+from .timeline import SLOT_SECONDS, SlotTimeline
+
+_LOGGER = logging.getLogger(__name__)
+
+ESTIMATE_HISTORY_DAYS = 28
+
+
+@dataclass(frozen=True, eq=False)
+class PriceEstimate:
+    """Estimated quarter prices (SEK/kWh) for one day."""
+
+    date: DateObject
+    slots: list[float | None]
+    model: str
+    confidence: str
+    days_used: int
+
+    def rows(self, timeline: SlotTimeline) -> list[dict]:
+        """Return the estimate as price rows shaped like the API's."""
+        rows = []
+        for slot, price in enumerate(self.slots):
+            if price is None:
+                continue
+            start = dt_util.utc_from_timestamp(timeline.slot_start_ts(slot))
+            rows.append(
+                {
+                    "SEK_per_kWh": round(price, 5),
+                    "time_start": start.astimezone(timeline.time_zone).isoformat(),
+                    "time_end": (start + timedelta(seconds=SLOT_SECONDS))
+                    .astimezone(timeline.time_zone)
+                    .isoformat(),
+                }
+            )
+        return rows
+
+
+class EstimateModel(ABC):
+    """A model that estimates a day's quarter prices from past days.
+
+    History is given as ``{date: {"HH:MM": SEK/kWh}}`` keyed on the local
+    slot label, so days with a DST change line up with normal days.
+    """
+
+    name: str
+
+    @abstractmethod
+    def estimate(
+        self, history: dict[DateObject, dict[str, float]], target: DateObject
+    ) -> dict[str, float]:
+        """Return estimated prices per local slot label of the target day."""
+
+
+class WeekdayWeightedModel(EstimateModel):
+    """Weighted mean per slot, favouring recent days and the same weekday.
+
+    A past day's weight is ``decay ** age`` and is multiplied by
+    ``weekday_weight`` when it falls on the target's weekday, so last
+    week's same day and the last few days dominate. The sums are
+    accumulated slot by slot in plain Python; the model runs in the
+    executor.
+    """
+
+    name = "weekday_weighted"
+
+    def __init__(self, weekday_weight: float = 3.0, decay: float = 0.9):
+        """Initialize the model weights."""
+        self.weekday_weight = weekday_weight
+        self.decay = decay
+
+    def estimate(
+        self, history: dict[DateObject, dict[str, float]], target: DateObject
+    ) -> dict[str, float]:
+        """Return the weighted mean price per slot label."""
+        sums: dict[str, float] = {}
+        weights: dict[str, float] = {}
+        for day, prices in history.items():
+            weight = self.decay ** (target - day).days
+            if day.weekday() == target.weekday():
+                weight *= self.weekday_weight
+            for label, price in prices.items():
+                sums[label] = sums.get(label, 0.0) + weight * price
+                weights[label] = weights.get(label, 0.0) + weight
+        return {label: sums[label] / weights[label] for label in sums}
+
+
+MODELS: dict[str, type[EstimateModel]] = {
+    WeekdayWeightedModel.name: WeekdayWeightedModel,
+}
+
+
+def _confidence(history: dict[DateObject, dict[str, float]], target: DateObject) -> str:
+    same_weekday = sum(day.weekday() == target.weekday() for day in history)
+    if len(history) >= 14 and same_weekday >= 2:
+        return CONFIDENCE_HIGH
+    if len(history) >= 5 and same_weekday >= 1:
+        return CONFIDENCE_MEDIUM
+    return CONFIDENCE_LOW
+
+
+def build_estimate(
+    model: EstimateModel,
+    rows_by_day: dict[DateObject, list],
+    target_timeline: SlotTimeline,
+) -> PriceEstimate | None:
+    """Normalize the history and run the model; runs in the executor."""
+    history: dict[DateObject, dict[str, float]] = {}
+    for day, rows in rows_by_day.items():
+        timeline = SlotTimeline(day, target_timeline.time_zone)
+        slots, _ = normalize_day(rows, timeline)
+        prices: dict[str, float] = {}
+        for slot, price in enumerate(slots):
+            if price is not None:
+                prices.setdefault(timeline.label(slot), price)
+        if prices:
+            history[day] = prices
+    if not history:
+        return None
+    by_label = model.estimate(history, target_timeline.date)
+    return PriceEstimate(
+        date=target_timeline.date,
+        slots=[by_label.get(label) for label in target_timeline.labels],
+        model=model.name,
+        confidence=_confidence(history, target_timeline.date),
+        days_used=len(history),
+    )
+
+
+async def async_estimate_day(
+    hass: HomeAssistant,
+    cache: PriceCache,
+    target: DateObject,
+    model: EstimateModel | None = None,
+) -> PriceEstimate | None:
+    """Estimate a day's prices from the cached days before it.
+
+    Days are read from memory or the per-day store without being added to
+    the in-memory cache; normalizing them and running the model happens in
+    the executor.
+    """
+    rows_by_day = {}
+    for offset in range(1, ESTIMATE_HISTORY_DAYS + 1):
+        day = target - timedelta(days=offset)
+        if prices := await cache.async_peek_day(day):
+            rows_by_day[day] = prices
+    estimate = await hass.async_add_executor_job(
+        build_estimate,
+        model or MODELS[DEFAULT_ESTIMATE_MODEL](),
+        rows_by_day,
+        SlotTimeline(target, dt_util.get_default_time_zone()),
+    )
+    if estimate is not None:
+        _LOGGER.debug(
+            f"Estimated prices for {cache.price_area} {target} from "
+            f"{estimate.days_used} days ({estimate.confidence} confidence)"
+        )
+    return estimate
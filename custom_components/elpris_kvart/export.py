@@ -0,0 +1,184 @@
+# Version: 2025-12-19-rev18
+"""Streaming export of cached price history to CSV or NDJSON."""
+
+import csv
+import io
+import json
+import logging
+from datetime import date as DateObject
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator
+from .const import (
+    DOMAIN,
+    EXPORT_COLUMN_SPOT,
+    EXPORT_COLUMN_SURCHARGED,
+    EXPORT_COLUMN_TOTAL,
+    EXPORT_FORMAT_CSV,
+)
+from .normalize import normalize_day
+from .timeline import SLOT_SECONDS, SlotTimeline
+
+_LOGGER = logging.getLogger(__name__)
+
+# Days read before a chunk is handed to the executor for formatting and writing.
+EXPORT_CHUNK_DAYS = 7
+EXPORT_DECIMALS = 5
+
+
+def _day_records(
+    price_area: str,
+    surcharge_sek: float,
+    timeline: SlotTimeline,
+    prices: list,
+    columns: list[str],
+    tariff_sek: float,
+) -> list[dict]:
+    """Return one record per priced quarter of a day."""
+    slots, _ = normalize_day(prices, timeline)
+    records = []
+    for slot, spot_sek in enumerate(slots):
+        if spot_sek is None:
+            continue
+        start_ts = timeline.slot_start_ts(slot)
+        values = {
+            EXPORT_COLUMN_SPOT: spot_sek,
+            EXPORT_COLUMN_SURCHARGED: spot_sek + surcharge_sek,
+            EXPORT_COLUMN_TOTAL: spot_sek + surcharge_sek + tariff_sek,
+        }
+        record = {
+            "area": price_area,
+            "start": dt_util.utc_from_timestamp(start_ts)
+            .astimezone(timeline.time_zone)
+            .isoformat(),
+            "end": dt_util.utc_from_timestamp(start_ts + SLOT_SECONDS)
+            .astimezone(timeline.time_zone)
+            .isoformat(),
+        }
+        for column in columns:
+            record[f"{column}_sek_per_kwh"] = round(values[column], EXPORT_DECIMALS)
+        records.append(record)
+    return records
+
+
+def _open_export_file(base_path: str, export_format: str):
+    """Create a new export file, never overwriting an earlier export.
+
+    Exports started in the same second get a numeric suffix.
+    """
+    path = f"{base_path}.{export_format}"
+    suffix = 1
+    while True:
+        try:
+            return open(path, "x", encoding="utf-8", newline=""), path
+        except FileExistsError:
+            suffix += 1
+            path = f"{base_path}_{suffix}.{export_format}"
+
+
+def _write_chunk(
+    handle,
+    days: list[tuple[str, float, DateObject, list]],
+    time_zone,
+    export_format: str,
+    columns: list[str],
+    tariff_sek: float,
+) -> int:
+    """Normalize, format and write a chunk of days; runs in the executor.
+
+    Returns the number of rows written.
+    """
+    records = []
+    for price_area, surcharge_sek, day, prices in days:
+        records.extend(
+            _day_records(
+                price_area,
+                surcharge_sek,
+                SlotTimeline(day, time_zone),
+                prices,
+                columns,
+                tariff_sek,
+            )
+        )
+    if export_format == EXPORT_FORMAT_CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows(record.values() for record in records)
+        handle.write(buffer.getvalue())
+    else:
+        handle.write("".join(json.dumps(record) + "\n" for record in records))
+    return len(records)
+
+
+async def async_export_prices(
+    hass: HomeAssistant,
+    coordinators: list[ElprisDataUpdateCoordinator],
+    start_date: DateObject,
+    end_date: DateObject,
+    export_format: str,
+    columns: list[str],
+    tariff_sek: float,
+) -> dict:
+    """Write cached quarter prices for a date range to the config directory.
+
+    Days are read one at a time from memory or disk (days only on disk are
+    not added to the in-memory cache) and handed to the executor in chunks
+    of EXPORT_CHUNK_DAYS days, where they are normalized onto their slot
+    grid, formatted and written. A year of history is thus never held in
+    memory at once, and the event loop only reads the cache. Days without cached
+    prices are skipped and counted.
+    """
+    time_zone = dt_util.get_default_time_zone()
+    base_path = hass.config.path(
+        f"{DOMAIN}_export_{dt_util.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    header = ["area", "start", "end"] + [f"{column}_sek_per_kwh" for column in columns]
+    handle, path = await hass.async_add_executor_job(
+        _open_export_file, base_path, export_format
+    )
+    rows = 0
+    days_missing = 0
+    try:
+        if export_format == EXPORT_FORMAT_CSV:
+            await hass.async_add_executor_job(handle.write, ",".join(header) + "\n")
+        chunk: list[tuple[str, float, DateObject, list]] = []
+        day = start_date
+        while day <= end_date:
+            for coordinator in coordinators:
+                prices = await coordinator.cache.async_peek_day(day)
+                if not prices:
+                    days_missing += 1
+                    continue
+                chunk.append(
+                    (
+                        coordinator.price_area,
+                        coordinator.get_surcharge_sek(),
+                        day,
+                        prices,
+                    )
+                )
+            day += timedelta(days=1)
+            chunk_done = (day - start_date).days % EXPORT_CHUNK_DAYS == 0
+            if chunk and (chunk_done or day > end_date):
+                rows += await hass.async_add_executor_job(
+                    _write_chunk,
+                    handle,
+                    chunk,
+                    time_zone,
+                    export_format,
+                    columns,
+                    tariff_sek,
+                )
+                chunk = []
+    finally:
+        await hass.async_add_executor_job(handle.close)
+
+    _LOGGER.info(f"Exported {rows} price rows to {path}")
+    return {
+        "path": path,
+        "rows": rows,
+        "days_missing": days_missing,
+    }
@@ -0,0 +1,119 @@
+# Version: 2025-12-19-rev18
+"""HTTP view serving cached prices to other instances in the API's URL layout."""
+
+import hashlib
+import json
+import logging
+from datetime import date as DateObject
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from . import get_coordinator_for_area
+from .const import (
+    CONF_HUB_ENABLED,
+    DOMAIN,
+    EXTRA_PRICE_COLUMNS,
+    HUB_URL_PREFIX,
+    PRICE_COLUMN_SEK,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HUB_VIEW = f"{DOMAIN}_hub_view"
+
+# Serialized days kept per (area, date, day version)
+MAX_CACHED_BODIES = 16
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return True if an If-None-Match header matches the entity tag.
+
+    The header is a comma-separated list of entity tags or "*". As
+    If-None-Match uses weak comparison, a W/ prefix is ignored.
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def api_rows(prices: list) -> list[dict]:
+    """Return cached rows with the public API's column order."""
+    return [
+        {
+            column: item[column]
+            for column in (PRICE_COLUMN_SEK, *EXTRA_PRICE_COLUMNS)
+            if column in item
+        }
+        | {
+            key: value
+            for key, value in item.items()
+            if key not in (PRICE_COLUMN_SEK, *EXTRA_PRICE_COLUMNS)
+        }
+        for item in prices
+    ]
+
+
+class ElprisHubView(HomeAssistantView):
+    """Serve one day of cached prices for an area, like the public API.
+
+    Requests need a Home Assistant access token, like the REST API; client
+    instances send a long-lived token of this instance. Only areas whose
+    entry has the hub option enabled are served. A day
+    is answered from the coordinator's in-memory cache or the per-day
+    store, never by fetching from the public API, so clients get a 404
+    for days the hub does not have yet, exactly as from the public API.
+    Responses carry a strong ETag and a matching If-None-Match gets a 304.
+    """
+
+    url = HUB_URL_PREFIX + r"/{year:\d{4}}/{month_day:\d{2}-\d{2}}_{area:SE\d}.json"
+    name = f"api:{DOMAIN}:prices"
+
+    def __init__(self):
+        """Initialize the view with an empty body cache."""
+        self._bodies: dict[tuple[str, DateObject, int], tuple[bytes, str]] = {}
+
+    async def get(
+        self, request: web.Request, year: str, month_day: str, area: str
+    ) -> web.Response:
+        """Return the day's rows as JSON, or 304/404."""
+        hass: HomeAssistant = request.app["hass"]
+        coordinator = get_coordinator_for_area(hass, area)
+        if coordinator is None or not coordinator.applied_options.get(CONF_HUB_ENABLED):
+            return web.Response(status=404)
+        try:
+            day = DateObject.fromisoformat(f"{year}-{month_day}")
+        except ValueError:
+            return web.Response(status=404)
+
+        version = coordinator.day_versions.get(day)
+        cached = self._bodies.get((area, day, version)) if version else None
+        if cached is None:
+            prices = await coordinator.cache.async_peek_day(day)
+            if not prices:
+                return web.Response(status=404)
+            body = json.dumps(api_rows(prices), separators=(",", ":")).encode()
+            cached = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            if version:
+                if len(self._bodies) >= MAX_CACHED_BODIES:
+                    del self._bodies[next(iter(self._bodies))]
+                self._bodies[(area, day, version)] = cached
+
+        body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("If-None-Match", ""), etag):
+            return web.Response(status=304, headers=headers)
+        _LOGGER.debug(f"Serving cached prices for {area} {day} to {request.remote}")
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+
+@callback
+def async_register_hub_view(hass: HomeAssistant) -> None:
+    """Register the hub view once, when the first entry enables it."""
+    if hass.data.get(DATA_HUB_VIEW) or hass.http is None:
+        return
+    hass.http.register_view(ElprisHubView())
+    hass.data[DATA_HUB_VIEW] = True
@@ -0,0 +1,146 @@
+# Version: 2025-12-19-rev18
+"""Normalization of API price rows onto the quarter-hour slot grid."""
+
+from dataclasses import asdict, dataclass, field
+
+from homeassistant.util import dt as dt_util
+
+from .const import PRICE_COLUMN_SEK
+from .timeline import SLOT_SECONDS, SlotTimeline
+
+RESOLUTION_MIXED = "mixed"
+
+
+@dataclass
+class DataQuality:
+    """Counters describing how one day's rows mapped onto its slot grid."""
+
+    resolution: str | None = None
+    rows: int = 0
+    invalid_rows: int = 0
+    out_of_day_rows: int = 0
+    duplicate_rows: int = 0
+    conflicting_rows: int = 0
+    expanded_rows: int = 0
+    aggregated_rows: int = 0
+    missing_slots: int = 0
+    gaps: list[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """Return True if every slot of the day has a price."""
+        return self.missing_slots == 0
+
+    def as_dict(self) -> dict:
+        """Return the counters as a plain dict for attributes and diagnostics."""
+        return asdict(self)
+
+
+def _resolution_name(durations: set[int]) -> str | None:
+    """Return an ISO 8601 duration for one row length, or 'mixed'."""
+    if not durations:
+        return None
+    if len(durations) > 1:
+        return RESOLUTION_MIXED
+    minutes = next(iter(durations)) // 60
+    return f"PT{minutes}M"
+
+
+def normalize_day(
+    rows: list[dict], timeline: SlotTimeline, column: str = PRICE_COLUMN_SEK
+) -> tuple[list[float | None], DataQuality]:
+    """Map one column of a day's price rows onto its fixed quarter-hour slots.
+
+    The source resolution is read from each row's time_start/time_end (a row
+    without time_end is taken to be one slot long). Rows longer than a slot
+    are expanded onto every slot they cover and rows shorter than a slot are
+    averaged, weighted by their length, into the slot they fall in. When
+    rows of different lengths cover the same slot the finer one wins, so a
+    slot with sub-quarter rows takes their average over any quarter or
+    longer row; rows of the same length covering an already filled slot
+    are counted as duplicates (same price) or conflicts (different price,
+    last row wins). Slots nothing covers stay None and are reported as gaps.
+    """
+    quality = DataQuality(rows=len(rows))
+    slot_count = len(timeline)
+    spans = []
+    fine_sums: dict[int, float] = {}
+    fine_seconds: dict[int, float] = {}
+    durations = set()
+
+    for item in rows:
+        try:
+            price = float(item[column])
+            start_dt = dt_util.parse_datetime(item["time_start"])
+            end_dt = (
+                dt_util.parse_datetime(item["time_end"])
+                if item.get("time_end")
+                else None
+            )
+        except (KeyError, TypeError, ValueError):
+            quality.invalid_rows += 1
+            continue
+        if start_dt is None:
+            quality.invalid_rows += 1
+            continue
+        start_ts = start_dt.timestamp()
+        end_ts = end_dt.timestamp() if end_dt else start_ts + SLOT_SECONDS
+        if end_ts <= start_ts:
+            quality.invalid_rows += 1
+            continue
+        duration = int(end_ts - start_ts)
+        durations.add(duration)
+
+        clipped_start = max(start_ts, timeline.start_ts)
+        clipped_end = min(end_ts, timeline.end_ts)
+        if clipped_start >= clipped_end:
+            quality.out_of_day_rows += 1
+            continue
+
+        if duration < SLOT_SECONDS:
+            slot = timeline.slot_at(clipped_start)
+            fine_sums[slot] = fine_sums.get(slot, 0.0) + price * duration
+            fine_seconds[slot] = fine_seconds.get(slot, 0.0) + duration
+            quality.aggregated_rows += 1
+            continue
+
+        first_slot = int(clipped_start - timeline.start_ts) // SLOT_SECONDS
+        last_slot = -(-int(clipped_end - timeline.start_ts) // SLOT_SECONDS)
+        if duration > SLOT_SECONDS:
+            quality.expanded_rows += 1
+        spans.append((duration, first_slot, min(last_slot, slot_count), price))
+
+    slots: list[float | None] = [None] * slot_count
+    slot_width: list[int | None] = [None] * slot_count
+    # Coarse rows first so that finer rows overwrite them; the sort is stable,
+    # so among rows of the same length the later one wins.
+    spans.sort(key=lambda span: -span[0])
+    for duration, first_slot, last_slot, price in spans:
+        duplicate = conflict = False
+        for slot in range(first_slot, last_slot):
+            if slot_width[slot] == duration:
+                if slots[slot] == price:
+                    duplicate = True
+                else:
+                    conflict = True
+            slots[slot] = price
+            slot_width[slot] = duration
+        quality.conflicting_rows += conflict
+        quality.duplicate_rows += duplicate and not conflict
+
+    for slot, seconds in fine_seconds.items():
+        slots[slot] = fine_sums[slot] / seconds
+
+    quality.resolution = _resolution_name(durations)
+    gap_start = None
+    for slot in range(slot_count + 1):
+        missing = slot < slot_count and slots[slot] is None
+        if missing:
+            quality.missing_slots += 1
+            if gap_start is None:
+                gap_start = slot
+        elif gap_start is not None:
+            end_label = timeline.label(slot) if slot < slot_count else "24:00"
+            quality.gaps.append(f"{timeline.label(gap_start)}-{end_label}")
+            gap_start = None
+    return slots, quality
@@ -0,0 +1,207 @@
+# Version: 2025-12-19-rev18
+"""Price-based planning algorithms for Elpris Kvart."""
+
+import math
+from dataclasses import dataclass
+
+SLOT_HOURS = 0.25
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class LoadPlan:
+    """Cost-optimal set of slots for a flexible load."""
+
+    slots: tuple[int, ...]
+    energy_per_slot_kwh: tuple[float, ...]
+    spot_cost_sek: float
+
+
+def _slots_needed(energy_kwh: float, max_power_kw: float) -> int:
+    return max(1, math.ceil(energy_kwh / (max_power_kw * SLOT_HOURS) - _EPSILON))
+
+
+def _build_plan(
+    prices: list[float | None], chosen: list[int], energy_kwh: float, full_kwh: float
+) -> LoadPlan:
+    """Run full power in every chosen slot except the most expensive one,
+    which only takes the remainder."""
+    chosen = sorted(chosen)
+    remainder_kwh = energy_kwh - full_kwh * (len(chosen) - 1)
+    partial_slot = max(chosen, key=lambda slot: (prices[slot], slot))
+    energies = tuple(
+        remainder_kwh if slot == partial_slot else full_kwh for slot in chosen
+    )
+    cost = sum(
+        prices[slot] * energy for slot, energy in zip(chosen, energies, strict=True)
+    )
+    return LoadPlan(tuple(chosen), energies, cost)
+
+
+def plan_load(
+    prices: list[float | None],
+    energy_kwh: float,
+    max_power_kw: float,
+    min_block_slots: int = 1,
+) -> LoadPlan | None:
+    """Pick the cheapest slots to deliver energy_kwh at up to max_power_kw.
+
+    ``prices`` covers the allowed window; ``None`` marks slots that cannot
+    be used. Without a block constraint this is a greedy pick of the
+    cheapest slots. With ``min_block_slots`` > 1 every run of consecutive
+    slots must be at least that long, solved with a dynamic program over
+    (slots used, current run length) in O(N * n * L).
+    Returns None if the load cannot fit in the window.
+    """
+    if energy_kwh <= 0 or max_power_kw <= 0:
+        return None
+    full_kwh = max_power_kw * SLOT_HOURS
+    needed = _slots_needed(energy_kwh, max_power_kw)
+    available = [slot for slot, price in enumerate(prices) if price is not None]
+    if len(available) < needed:
+        return None
+
+    if min_block_slots <= 1:
+        chosen = sorted(available, key=lambda slot: (prices[slot], slot))[:needed]
+        return _build_plan(prices, chosen, energy_kwh, full_kwh)
+
+    # A load shorter than the minimum block simply runs as one block.
+    block = min(min_block_slots, needed)
+    inf = math.inf
+    # cost[k][r]: cheapest cost with k slots used and a current run of r
+    # (r == 0 means off, runs are capped at block length).
+    cost = [[inf] * (block + 1) for _ in range(needed + 1)]
+    cost[0][0] = 0.0
+    parents: list[list[list[tuple[int, int] | None]]] = []
+
+    for price in prices:
+        new_cost = [[inf] * (block + 1) for _ in range(needed + 1)]
+        parent: list[list[tuple[int, int] | None]] = [
+            [None] * (block + 1) for _ in range(needed + 1)
+        ]
+        for used in range(needed + 1):
+            row = cost[used]
+            for run in range(block + 1):
+                current = row[run]
+                if current == inf:
+                    continue
+                # Stay off: only allowed when not inside a too-short run.
+                if (run == 0 or run == block) and current < new_cost[used][0]:
+                    new_cost[used][0] = current
+                    parent[used][0] = (used, run)
+                # Run this slot.
+                if price is not None and used < needed:
+                    next_run = min(run + 1, block)
+                    candidate = current + price
+                    if candidate < new_cost[used + 1][next_run]:
+                        new_cost[used + 1][next_run] = candidate
+                        parent[used + 1][next_run] = (used, run)
+        parents.append(parent)
+        cost = new_cost
+
+    end_run = 0 if cost[needed][0] <= cost[needed][block] else block
+    if cost[needed][end_run] == inf:
+        return None
+
+    chosen = []
+    used, run = needed, end_run
+    for slot in range(len(prices) - 1, -1, -1):
+        previous = parents[slot][used][run]
+        if previous[0] != used:
+            chosen.append(slot)
+        used, run = previous
+    return _build_plan(prices, chosen, energy_kwh, full_kwh)
+
+
+@dataclass(frozen=True)
+class BatteryPlan:
+    """Charge/discharge schedule for a home battery.
+
+    ``power_kw`` is the grid-side power per slot (positive when charging,
+    negative when discharging) and ``soc_kwh`` the stored energy at the end
+    of each slot.
+    """
+
+    power_kw: tuple[float, ...]
+    soc_kwh: tuple[float, ...]
+    savings_sek: float
+
+
+def plan_battery(
+    prices: list[float | None],
+    capacity_kwh: float,
+    charge_power_kw: float,
+    discharge_power_kw: float,
+    efficiency: float,
+    soc_kwh: float,
+    min_soc_kwh: float,
+    max_soc_kwh: float,
+    soc_steps: int = 100,
+) -> BatteryPlan:
+    """Plan battery dispatch that minimizes the cost of grid energy.
+
+    The state of charge is discretized into ``soc_steps`` levels and a
+    backward dynamic program picks, for every slot and level, the best
+    change in stored energy within the power limits. ``efficiency`` is the
+    round-trip efficiency, split evenly between charging and discharging.
+    Energy left in the battery at the end of the horizon is valued at the
+    mean known price after discharge losses, so the plan neither dumps nor
+    hoards energy just because the price data ends. Slots without a price
+    are idle. Runs in O(N * levels * power steps); call it from the
+    executor for long horizons.
+    """
+    step_kwh = capacity_kwh / soc_steps
+    one_way = math.sqrt(efficiency)
+    initial = min(max(round(soc_kwh / step_kwh), 0), soc_steps)
+    low = min(math.ceil(min_soc_kwh / step_kwh - _EPSILON), initial)
+    high = max(math.floor(max_soc_kwh / step_kwh + _EPSILON), initial)
+    max_up = int(charge_power_kw * SLOT_HOURS * one_way / step_kwh + _EPSILON)
+    max_down = int(discharge_power_kw * SLOT_HOURS / one_way / step_kwh + _EPSILON)
+    # Grid energy per stored step, buying and selling.
+    buy_kwh = step_kwh / one_way
+    sell_kwh = step_kwh * one_way
+
+    known = [price for price in prices if price is not None]
+    terminal_price = sum(known) / len(known) if known else 0.0
+    # value[level]: cheapest cost from this slot onward (relative to idle).
+    value = [
+        -(level - initial) * sell_kwh * terminal_price for level in range(high + 1)
+    ]
+    choices: list[list[int]] = []
+    for price in reversed(prices):
+        if price is None:
+            choices.append([0] * (high + 1))
+            continue
+        buy_cost = price * buy_kwh
+        sell_gain = price * sell_kwh
+        new_value = [math.inf] * (high + 1)
+        choice = [0] * (high + 1)
+        for level in range(low, high + 1):
+            best_delta = 0
+            best = value[level]
+            for delta in range(1, min(max_up, high - level) + 1):
+                candidate = delta * buy_cost + value[level + delta]
+                if candidate < best:
+                    best, best_delta = candidate, delta
+            for delta in range(1, min(max_down, level - low) + 1):
+                candidate = value[level - delta] - delta * sell_gain
+                if candidate < best:
+                    best, best_delta = candidate, -delta
+            new_value[level] = best
+            choice[level] = best_delta
+        value = new_value
+        choices.append(choice)
+    choices.reverse()
+
+    power = []
+    levels = []
+    level = initial
+    for choice in choices:
+        delta = choice[level]
+        if delta > 0:
+            power.append(delta * buy_kwh / SLOT_HOURS)
+        else:
+            power.append(delta * sell_kwh / SLOT_HOURS)
+        level += delta
+        levels.append(level * step_kwh)
+    return BatteryPlan(tuple(power), tuple(levels), -value[initial])
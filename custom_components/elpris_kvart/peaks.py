@@ -0,0 +1,248 @@
+# Version: 2025-12-19-rev18
+"""Monthly power peak tracking for capacity-based grid tariffs."""
+
+import heapq
+from collections.abc import Callable
+from datetime import datetime as DateTimeObject
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import PEAK_HIGH_LOAD_END_HOUR, PEAK_HIGH_LOAD_START_HOUR
+
+HOUR_SECONDS = 3600
+
+
+def is_high_load_hour(hour_start_ts: float) -> bool:
+    """Return whether a clock hour falls in the weekday high-load window."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(hour_start_ts))
+    return (
+        local.weekday() < 5
+        and PEAK_HIGH_LOAD_START_HOUR <= local.hour < PEAK_HIGH_LOAD_END_HOUR
+    )
+
+
+def _month_of(timestamp: float) -> tuple[int, int]:
+    local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+    return local.year, local.month
+
+
+class PeakTracker:
+    """Keep the month's top N hourly average power values.
+
+    Energy is fed in as it is measured and added to the running clock
+    hour, whose energy in kWh equals its average power in kW. When an hour
+    ends it is offered to a min-heap bounded to N entries: the smallest
+    kept peak is at the root, so deciding whether an hour is a new peak and
+    replacing the smallest is O(log N). The sum of the kept peaks is
+    maintained alongside, so the billing peak is read in constant time.
+
+    Energy measured late for the hour closed last (a meter reading after
+    the hour ended) is added to that hour and its peak entry is updated.
+    flush is called before an ended hour is closed, so a source that holds
+    a value without writing new states can report up to the hour end. While
+    there are listeners, a single timer rolls the hour over on each hour
+    boundary and notifies them once.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        peak_count: int,
+        high_load_only: bool = False,
+        flush: Callable[[], None] | None = None,
+    ):
+        """Initialize an empty tracker."""
+        self.hass = hass
+        self.peak_count = peak_count
+        self.high_load_only = high_load_only
+        self.month: tuple[int, int] | None = None
+        # Min-heap of (average kW, hour start epoch).
+        self.peaks: list[tuple[float, int]] = []
+        self._peak_sum = 0.0
+        self.hour_start: int | None = None
+        self.hour_kwh = 0.0
+        # (hour start epoch, kWh) of the hour closed last
+        self._last_closed: tuple[int, float] | None = None
+        self._flush = flush
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_hour_timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable:
+        """Register an entity callback and start the hour timer on the first."""
+        self._listeners.append(update_callback)
+        if self._unsub_hour_timer is None:
+            self._schedule_hour_timer()
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+            if not self._listeners and self._unsub_hour_timer is not None:
+                self._unsub_hour_timer()
+                self._unsub_hour_timer = None
+
+        return remove_listener
+
+    def _schedule_hour_timer(self) -> None:
+        next_hour_ts = (
+            int(dt_util.utcnow().timestamp()) // HOUR_SECONDS + 1
+        ) * HOUR_SECONDS
+        self._unsub_hour_timer = async_track_point_in_utc_time(
+            self.hass, self._async_hour_ended, dt_util.utc_from_timestamp(next_hour_ts)
+        )
+
+    @callback
+    def _async_hour_ended(self, now: DateTimeObject) -> None:
+        self._schedule_hour_timer()
+        self.async_roll_over()
+        self._notify()
+
+    def _notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_restore(
+        self,
+        peaks: list[tuple[float, int]],
+        hour_start: int | None,
+        hour_kwh: float,
+    ) -> None:
+        """Merge peaks and the running hour saved earlier in this month."""
+        month = _month_of(dt_util.utcnow().timestamp())
+        if self.month is None:
+            self.month = month
+        for kw, start in peaks:
+            if _month_of(start) == month == self.month:
+                self._offer(kw, start)
+        if hour_start is None or _month_of(hour_start) != month:
+            return
+        if self.hour_start is None:
+            self.hour_start = hour_start
+        if hour_start == self.hour_start:
+            self.hour_kwh += hour_kwh
+
+    @callback
+    def async_add_energy(
+        self, start_ts: float, end_ts: float, energy_kwh: float
+    ) -> None:
+        """Spread energy linearly over [start_ts, end_ts) into clock hours."""
+        kwh_per_second = energy_kwh / (end_ts - start_ts)
+        segment_start = start_ts
+        while segment_start < end_ts:
+            hour_start = int(segment_start) // HOUR_SECONDS * HOUR_SECONDS
+            segment_end = min(hour_start + HOUR_SECONDS, end_ts)
+            segment_kwh = kwh_per_second * (segment_end - segment_start)
+            if self._last_closed is not None and hour_start == self._last_closed[0]:
+                self._amend_last_closed(segment_kwh)
+            else:
+                if hour_start != self.hour_start:
+                    self._close_hour()
+                    self.hour_start = hour_start
+                self.hour_kwh += segment_kwh
+            segment_start = segment_end
+        self._notify()
+
+    @callback
+    def async_roll_over(self) -> None:
+        """Close the running hour once it has ended without new readings."""
+        if self.hour_start is not None and not self._hour_ended():
+            return
+        if self._flush is not None:
+            self._flush()
+        if self._hour_ended():
+            self._close_hour()
+
+    def _hour_ended(self) -> bool:
+        return self.hour_start is not None and self.hour_start + HOUR_SECONDS <= (
+            dt_util.utcnow().timestamp()
+        )
+
+    def _close_hour(self) -> None:
+        """Offer the finished hour to the peaks of its month."""
+        if self.hour_start is not None:
+            if self._counts(self.hour_start):
+                self._offer(self.hour_kwh, self.hour_start)
+            self._last_closed = (self.hour_start, self.hour_kwh)
+        self.hour_start = None
+        self.hour_kwh = 0.0
+
+    def _amend_last_closed(self, energy_kwh: float) -> None:
+        """Add late energy to the hour closed last and update its peak."""
+        hour_start, old_kwh = self._last_closed
+        self._last_closed = (hour_start, old_kwh + energy_kwh)
+        if not self._counts(hour_start) or _month_of(hour_start) != self.month:
+            return
+        if (old_kwh, hour_start) in self.peaks:
+            self.peaks.remove((old_kwh, hour_start))
+            heapq.heapify(self.peaks)
+            self._peak_sum -= old_kwh
+        self._offer(old_kwh + energy_kwh, hour_start)
+
+    def _counts(self, hour_start: float) -> bool:
+        return not self.high_load_only or is_high_load_hour(hour_start)
+
+    def _offer(self, kw: float, hour_start: int) -> None:
+        month = _month_of(hour_start)
+        if month != self.month:
+            self.month = month
+            self.peaks = []
+            self._peak_sum = 0.0
+        if len(self.peaks) < self.peak_count:
+            heapq.heappush(self.peaks, (kw, hour_start))
+            self._peak_sum += kw
+        elif kw > self.peaks[0][0]:
+            smallest, _ = heapq.heapreplace(self.peaks, (kw, hour_start))
+            self._peak_sum += kw - smallest
+
+    def _current_month_peaks(self) -> bool:
+        return self.month == _month_of(dt_util.utcnow().timestamp())
+
+    @property
+    def billing_peak_kw(self) -> float:
+        """Return the mean of the month's kept peaks (0 before any)."""
+        if not self.peaks or not self._current_month_peaks():
+            return 0.0
+        return self._peak_sum / len(self.peaks)
+
+    def current_hour_kw(self) -> float:
+        """Return the running hour's energy so far, i.e. its average kW."""
+        if self.hour_start is None or self.hour_start + HOUR_SECONDS <= (
+            dt_util.utcnow().timestamp()
+        ):
+            return 0.0
+        return self.hour_kwh
+
+    def headroom_kw(self) -> float | None:
+        """Return how much more the running hour may use before it becomes
+        one of the month's peaks, or None when the hour does not count."""
+        now_ts = dt_util.utcnow().timestamp()
+        if not self._counts(now_ts):
+            return None
+        if len(self.peaks) < self.peak_count or not self._current_month_peaks():
+            return 0.0
+        return max(self.peaks[0][0] - self.current_hour_kw(), 0.0)
+
+    def projected_peak_kw(self) -> float:
+        """Return the billing peak if the running hour ended now."""
+        if not self._current_month_peaks():
+            count, total, smallest = 0, 0.0, 0.0
+        else:
+            count, total = len(self.peaks), self._peak_sum
+            smallest = self.peaks[0][0] if self.peaks else 0.0
+        current = self.current_hour_kw()
+        if not current or not self._counts(dt_util.utcnow().timestamp()):
+            return total / count if count else 0.0
+        if count < self.peak_count:
+            return (total + current) / (count + 1)
+        if current > smallest:
+            return (total - smallest + current) / count
+        return total / count
+
+    def sorted_peaks(self) -> list[tuple[float, int]]:
+        """Return the month's peaks, highest first."""
+        if not self._current_month_peaks():
+            return []
+        return sorted(self.peaks, reverse=True)
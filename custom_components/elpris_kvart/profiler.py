@@ -0,0 +1,200 @@
+# Version: 2025-12-19-rev18
+"""On-demand profiling of the integration's hot paths."""
+
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import pstats
+import time
+from collections.abc import Callable
+from datetime import datetime as DateTimeObject
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PROFILER = f"{DOMAIN}_profiler"
+PSTATS_LIMIT = 40
+
+
+def _profile_targets() -> list[tuple[type, str]]:
+    """Return the (class, method) pairs that are timed while profiling."""
+    from . import ElprisDataUpdateCoordinator
+    from .sensor import BaseElprisSensor
+
+    return [
+        (ElprisDataUpdateCoordinator, "_async_update_data"),
+        (ElprisDataUpdateCoordinator, "_parse_and_validate_prices"),
+        (ElprisDataUpdateCoordinator, "_rebuild_slot_prices"),
+        (ElprisDataUpdateCoordinator, "_async_update_entities"),
+        (BaseElprisSensor, "_update_internal_data"),
+    ]
+
+
+class IntegrationProfiler:
+    """Time selected methods for a bounded period.
+
+    While inactive nothing is wrapped, so the hot paths run their original
+    code. Starting a session replaces the target methods on their classes
+    with timing wrappers; stopping restores the originals and writes a
+    report to the config directory. Wall time is recorded for every call,
+    CPU time (of the event loop thread) only for synchronous methods, as a
+    coroutine's CPU time would include whatever else ran while it awaited.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the profiler."""
+        self.hass = hass
+        self.stats: dict[str, dict[str, float]] = {}
+        self.started: DateTimeObject | None = None
+        self.ended: DateTimeObject | None = None
+        self.report_path: str | None = None
+        self._originals: list[tuple[type, str, Callable]] = []
+        self._cprofile: cProfile.Profile | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @property
+    def active(self) -> bool:
+        """Return True while a profiling session is running."""
+        return self.started is not None and self.ended is None
+
+    @callback
+    def async_start(self, duration: float, use_cprofile: bool) -> None:
+        """Start a session that stops by itself after duration seconds."""
+        self.stats = {}
+        self.started = dt_util.utcnow()
+        self.ended = None
+        self.report_path = None
+        for owner, name in _profile_targets():
+            original = owner.__dict__[name]
+            self._originals.append((owner, name, original))
+            setattr(owner, name, self._wrap(f"{owner.__name__}.{name}", original))
+        if use_cprofile:
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError as e:
+                # Only one profiler can be active per thread.
+                _LOGGER.warning(f"cProfile capture not available: {e}")
+                self._cprofile = None
+        self._unsub_stop = async_call_later(self.hass, duration, self._async_timeout)
+        _LOGGER.info(f"Profiling {DOMAIN} for {duration} seconds")
+
+    async def _async_timeout(self, now: DateTimeObject) -> None:
+        self._unsub_stop = None
+        await self.async_stop()
+
+    async def async_stop(self) -> str | None:
+        """Stop the session, restore the methods and write the report."""
+        if not self.active:
+            return self.report_path
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        for owner, name, original in self._originals:
+            setattr(owner, name, original)
+        self._originals = []
+        cprofile_text = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._cprofile, stream=stream).sort_stats(
+                pstats.SortKey.CUMULATIVE
+            ).print_stats(PSTATS_LIMIT)
+            cprofile_text = stream.getvalue()
+            self._cprofile = None
+        self.ended = dt_util.utcnow()
+        path = self.hass.config.path(
+            f"{DOMAIN}_profile_{self.started.strftime('%Y%m%d_%H%M%S')}.txt"
+        )
+        await self.hass.async_add_executor_job(self._write_report, path, cprofile_text)
+        self.report_path = path
+        _LOGGER.info(f"Wrote {DOMAIN} profile to {path}")
+        return path
+
+    def summary(self) -> dict:
+        """Return the last session's timings, rounded for display."""
+        return {
+            "active": self.active,
+            "started": self.started.isoformat() if self.started else None,
+            "ended": self.ended.isoformat() if self.ended else None,
+            "report_path": self.report_path,
+            "methods": {
+                name: {key: round(value, 6) for key, value in stats.items()}
+                for name, stats in self.stats.items()
+            },
+        }
+
+    def _record(self, name: str, wall: float, cpu: float | None) -> None:
+        stats = self.stats.setdefault(
+            name, {"calls": 0, "wall_total_s": 0.0, "wall_max_s": 0.0}
+        )
+        stats["calls"] += 1
+        stats["wall_total_s"] += wall
+        stats["wall_max_s"] = max(stats["wall_max_s"], wall)
+        if cpu is not None:
+            stats["cpu_total_s"] = stats.get("cpu_total_s", 0.0) + cpu
+
+    def _wrap(self, name: str, original: Callable) -> Callable:
+        if inspect.iscoroutinefunction(original):
+
+            @functools.wraps(original)
+            async def async_timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    self._record(name, time.perf_counter() - start, None)
+
+            return async_timed
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            start_cpu = time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._record(
+                    name,
+                    time.perf_counter() - start,
+                    time.thread_time() - start_cpu,
+                )
+
+        return timed
+
+    def _write_report(self, path: str, cprofile_text: str | None) -> None:
+        lines = [
+            f"{DOMAIN} profile {self.started.isoformat()} - {self.ended.isoformat()}",
+            "",
+            (
+                f"{'method':<60} {'calls':>7} {'wall total':>12} "
+                f"{'wall max':>10} {'cpu total':>10}"
+            ),
+        ]
+        for name, stats in sorted(
+            self.stats.items(), key=lambda item: -item[1]["wall_total_s"]
+        ):
+            cpu = stats.get("cpu_total_s")
+            lines.append(
+                f"{name:<60} {stats['calls']:>7} {stats['wall_total_s']:>12.6f} "
+                f"{stats['wall_max_s']:>10.6f} "
+                f"{'-' if cpu is None else f'{cpu:.6f}':>10}"
+            )
+        if cprofile_text:
+            lines.extend(["", "cProfile (event loop thread):", cprofile_text])
+        with open(path, "w", encoding="utf-8") as report:
+            report.write("\n".join(lines) + "\n")
+
+
+def get_profiler(hass: HomeAssistant) -> IntegrationProfiler:
+    """Return the shared profiler, creating it on first use."""
+    if (profiler := hass.data.get(DATA_PROFILER)) is None:
+        profiler = hass.data[DATA_PROFILER] = IntegrationProfiler(hass)
+    return profiler
@@ -0,0 +1,180 @@
+# Version: 2025-12-19-rev18
+"""Rolling multi-day price distributions for Elpris Kvart."""
+
+import math
+from datetime import date as DateObject
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+from .daywindow import DaySummaries, DayWindow
+from .store import PriceCache
+from .timeline import SlotTimeline
+
+# Width of a histogram bin; quantiles are exact to within one bin.
+SKETCH_BIN_SEK = 0.01
+
+
+class PriceSketch:
+    """Mergeable summary of a set of prices.
+
+    Keeps the count, sum and sum of squares for mean and standard deviation,
+    plus a fixed-width histogram for quantiles. Two sketches add (and
+    subtract) bin by bin, so a rolling window is kept up to date by merging
+    in the day that enters and removing the day that leaves.
+    """
+
+    __slots__ = ("bins", "count", "total", "total_sq")
+
+    def __init__(self):
+        """Initialize an empty sketch."""
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.bins: dict[int, int] = {}
+
+    @classmethod
+    def from_prices(cls, prices: list[float | None]) -> "PriceSketch":
+        """Return a sketch of the known prices in a list."""
+        sketch = cls()
+        for price in prices:
+            if price is None:
+                continue
+            sketch.count += 1
+            sketch.total += price
+            sketch.total_sq += price * price
+            index = math.floor(price / SKETCH_BIN_SEK)
+            sketch.bins[index] = sketch.bins.get(index, 0) + 1
+        return sketch
+
+    def merge(self, other: "PriceSketch", sign: int = 1) -> None:
+        """Add another sketch to this one, or remove it with sign=-1."""
+        self.count += sign * other.count
+        self.total += sign * other.total
+        self.total_sq += sign * other.total_sq
+        for index, count in other.bins.items():
+            remaining = self.bins.get(index, 0) + sign * count
+            if remaining:
+                self.bins[index] = remaining
+            else:
+                self.bins.pop(index, None)
+        if not self.count:
+            self.total = self.total_sq = 0.0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean price."""
+        return self.total / self.count if self.count else None
+
+    @property
+    def stddev(self) -> float | None:
+        """Return the population standard deviation of the prices."""
+        if not self.count:
+            return None
+        mean = self.total / self.count
+        return math.sqrt(max(self.total_sq / self.count - mean * mean, 0.0))
+
+    def quantile(self, q: float) -> float | None:
+        """Return the q-quantile (0-1), interpolated within its bin."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index in sorted(self.bins):
+            count = self.bins[index]
+            if seen + count >= target:
+                return (index + (target - seen) / count) * SKETCH_BIN_SEK
+            seen += count
+        return (max(self.bins) + 1) * SKETCH_BIN_SEK
+
+    def percentile_of(self, price: float) -> float | None:
+        """Return the share (0-100) of prices below a price."""
+        if not self.count:
+            return None
+        price_index = math.floor(price / SKETCH_BIN_SEK)
+        below = 0.0
+        for index, count in self.bins.items():
+            if index < price_index:
+                below += count
+            elif index == price_index:
+                below += count * (price / SKETCH_BIN_SEK - index)
+        return min(100.0 * below / self.count, 100.0)
+
+
+class RollingPriceStats:
+    """Price distributions over the last N days up to today, per window.
+
+    Each day is sketched once. When the window moves, or a day's prices
+    change, only the affected days are merged in or out of each window's
+    sketch instead of recomputing it from all days.
+    """
+
+    def __init__(self, windows: tuple[int, ...]):
+        """Initialize one empty sketch per window length in days."""
+        self.windows: dict[int, PriceSketch] = {days: PriceSketch() for days in windows}
+        self._windows: dict[int, DayWindow[PriceSketch]] = {
+            days: DayWindow(sketch.merge) for days, sketch in self.windows.items()
+        }
+        self._days: DaySummaries[PriceSketch] = DaySummaries(_sketch)
+        self.end: DateObject | None = None
+
+    @property
+    def longest(self) -> int:
+        """Return the longest window in days."""
+        return max(self.windows)
+
+    @property
+    def window_days(self) -> dict[int, set[DateObject]]:
+        """Return the days in each window."""
+        return {days: set(window.members) for days, window in self._windows.items()}
+
+    def apply(
+        self,
+        end: DateObject,
+        sketches: dict[DateObject, tuple[int | None, PriceSketch]],
+    ) -> None:
+        """Store new day sketches and move every window to end at end."""
+        self._days.apply(end - timedelta(days=self.longest - 1), end, sketches)
+        for days, window in self._windows.items():
+            window.move(end - timedelta(days=days - 1), end, self._days.days)
+        self.end = end
+
+    async def async_update(
+        self,
+        hass: HomeAssistant,
+        cache: PriceCache,
+        slot_prices: dict[DateObject, list[float | None]],
+        day_versions: dict[DateObject, int],
+        end: DateObject,
+    ) -> None:
+        """Sketch new or changed days and move the windows to end at end."""
+        sketches = await self._days.async_collect(
+            hass,
+            cache,
+            slot_prices,
+            day_versions,
+            end - timedelta(days=self.longest - 1),
+            end,
+        )
+        self.apply(end, sketches)
+
+    def summary(self, days: int) -> dict:
+        """Return mean, standard deviation and quantiles of a window in SEK."""
+        sketch = self.windows[days]
+        return {
+            "days": len(self.window_days[days]),
+            "count": sketch.count,
+            "mean_sek": _rounded(sketch.mean),
+            "stddev_sek": _rounded(sketch.stddev),
+            "p10_sek": _rounded(sketch.quantile(0.1)),
+            "p50_sek": _rounded(sketch.quantile(0.5)),
+            "p90_sek": _rounded(sketch.quantile(0.9)),
+        }
+
+
+def _sketch(slots: list[float | None], timeline: SlotTimeline) -> PriceSketch:
+    return PriceSketch.from_prices(slots)
+
+
+def _rounded(value: float | None) -> float | None:
+    return None if value is None else round(value, 4)
@@ -2,58 +2,141 @@
 """Sensor platform for Elpris Kvart."""
 
 import logging
-from datetime import datetime as DateTime
 from datetime import timedelta
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from . import ElprisDataUpdateCoordinator
+from . import ElprisDataUpdateCoordinator, device_info
+from .areas import AreaPriceStore, get_area_store
+from .battery import BatteryDispatcher, BatterySettings, action_for_power
 from .const import (
+    ATTR_AREA_PRICES_SEK,
+    ATTR_COMPARE_AREA,
+    ATTR_CURRENT_HOUR_KWH,
+    ATTR_CURRENT_HOUR_START,
+    ATTR_DATA_QUALITY,
+    ATTR_DAYS_IN_MEMORY,
+    ATTR_DAYS_ON_DISK,
+    ATTR_ESTIMATE_CONFIDENCE,
+    ATTR_EXPECTED_SAVINGS_SEK,
+    ATTR_FEE_SEK_PER_KW,
+    ATTR_HIGH_LOAD_ONLY,
+    ATTR_HOUR_MAX_SEK,
+    ATTR_HOUR_MIN_SEK,
+    ATTR_HOURLY_TODAY,
+    ATTR_HOURLY_TOMORROW,
     ATTR_LAST_API_UPDATE,
+    ATTR_LAST_READING_TIME,
+    ATTR_LAST_READING_UNIT,
+    ATTR_LAST_READING_VALUE,
+    ATTR_LEVEL_THRESHOLDS,
     ATTR_MAX_PRICE_TODAY_ORE,
     ATTR_MAX_PRICE_TODAY_SEK,
     ATTR_MAX_PRICE_TOMORROW_ORE,
     ATTR_MAX_PRICE_TOMORROW_SEK,
+    ATTR_MEMORY_BUDGET_KB,
     ATTR_MIN_PRICE_TODAY_ORE,
     ATTR_MIN_PRICE_TODAY_SEK,
     ATTR_MIN_PRICE_TOMORROW_ORE,
     ATTR_MIN_PRICE_TOMORROW_SEK,
+    ATTR_PEAK_COUNT,
+    ATTR_PEAKS,
+    ATTR_PERCENTILE,
+    ATTR_PLANNED_POWER_KW,
     ATTR_PRICE_AREA,
+    ATTR_PRICE_COUNT,
+    ATTR_PROJECTED_PEAK_KW,
     ATTR_RAW_TODAY,
+    ATTR_RETENTION_DAYS,
+    ATTR_SCHEDULE,
+    ATTR_SOURCE_ENTITY,
     ATTR_SPOT_PRICE_ORE_ON_SURCHARGE_SENSOR,
     ATTR_SPOT_PRICE_SEK_ON_SURCHARGE_SENSOR,
+    ATTR_SPREAD_TODAY,
+    ATTR_SPREAD_TOMORROW,
     ATTR_SURCHARGE_APPLIED_ORE_ON_SURCHARGE_SENSOR,
     ATTR_SURCHARGE_APPLIED_SEK_ON_SURCHARGE_SENSOR,
+    ATTR_TARGET_SOC_PCT,
+    ATTR_TOMORROW_ESTIMATE_ORE,
+    ATTR_TOMORROW_ESTIMATE_SEK,
+    ATTR_TOMORROW_PRICES_EUR,
     ATTR_TOMORROW_PRICES_ORE,
     ATTR_TOMORROW_PRICES_SEK,
+    ATTR_UNPRICED_ENERGY_KWH,
+    ATTR_WINDOW_DAYS,
+    ATTR_Z_SCORE,
+    BATTERY_ACTIONS,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_COMPARE_AREAS,
+    CONF_ENERGY_SENSOR,
+    CONF_LEVEL_CHEAP_PCT,
+    CONF_LEVEL_EXPENSIVE_PCT,
+    CONF_LEVEL_VERY_CHEAP_PCT,
+    CONF_LEVEL_VERY_EXPENSIVE_PCT,
+    CONF_PEAK_COUNT,
+    CONF_PEAK_FEE_SEK_PER_KW,
+    CONF_PEAK_HIGH_LOAD_ONLY,
     CONF_PRICE_AREA,
     CONF_SURCHARGE_ORE,
+    DEFAULT_LEVEL_THRESHOLDS_PCT,
+    DEFAULT_PEAK_COUNT,
+    DEFAULT_PEAK_FEE_SEK_PER_KW,
     DEFAULT_PRICE_AREA,
     DEFAULT_SURCHARGE_ORE,
     DOMAIN,
+    ICON_AREA_SPREAD,
+    ICON_BATTERY_PLAN,
+    ICON_CHEAPEST_AREA,
+    ICON_CURRENCY_EUR,
     ICON_CURRENCY_SEK,
+    ICON_ENERGY_COST,
+    ICON_EXCHANGE_RATE,
+    ICON_PEAK_FEE,
+    ICON_POWER_PEAK,
+    ICON_PRICE_CACHE,
+    ICON_PRICE_LEVEL,
+    ICON_PRICE_RANK,
     ICON_SURCHARGE_DISPLAY,
     INTEGRATION_NAME,
-    MANUFACTURER,
-    MODEL,
+    PRICE_COLUMN_EUR,
+    PRICE_LEVEL_CHEAP,
+    PRICE_LEVEL_EXPENSIVE,
+    PRICE_LEVEL_NORMAL,
+    PRICE_LEVEL_VERY_CHEAP,
+    PRICE_LEVEL_VERY_EXPENSIVE,
+    PRICE_LEVELS,
+    ROLLING_WINDOWS_DAYS,
 )
+from .cost import (
+    PERIOD_MONTH,
+    PERIOD_TODAY,
+    PERIOD_TOTAL,
+    EnergyCostTracker,
+)
+from .peaks import PeakTracker
 
 _LOGGER = logging.getLogger(__name__)
 
 SEK_ROUNDING_DECIMALS = 4
 ORE_ROUNDING_DECIMALS = 2
 
+COST_SENSOR_NAMES = {
+    PERIOD_TODAY: "Elkostnad idag",
+    PERIOD_MONTH: "Elkostnad denna månad",
+    PERIOD_TOTAL: "Elkostnad totalt",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -69,9 +152,67 @@ async def async_setup_entry(
         ElprisInklusivePaslagSensorOre(coordinator, entry, price_area),
         ElprisSpotSensorSEK(coordinator, entry, price_area),
         ElprisInklusivePaslagSensorSEK(coordinator, entry, price_area),
-        SurchargeOreSensor(entry, price_area),
-        SurchargeSEKSensor(entry, price_area),
+        ElprisHourlyPriceSensorSEK(coordinator, entry, price_area),
+        ElprisSpotSensorEUR(coordinator, entry, price_area),
+        ElprisExchangeRateSensor(coordinator, entry, price_area),
+        ElprisPriceRankSensor(coordinator, entry, price_area),
+        ElprisPricePercentileSensor(coordinator, entry, price_area, False),
+        ElprisPricePercentileSensor(coordinator, entry, price_area, True),
+        ElprisPriceLevelSensor(coordinator, entry, price_area),
+        *(
+            ElprisPriceLevelSensor(coordinator, entry, price_area, window_days)
+            for window_days in ROLLING_WINDOWS_DAYS
+        ),
+        ElprisPriceCacheSensor(coordinator, entry, price_area),
+        SurchargeOreSensor(coordinator, entry, price_area),
+        SurchargeSEKSensor(coordinator, entry, price_area),
     ]
+
+    energy_sensor = entry.options.get(CONF_ENERGY_SENSOR)
+    if energy_sensor:
+        tracker = EnergyCostTracker(hass, coordinator, energy_sensor)
+        sensors_to_add.extend(
+            ElprisEnergyCostSensor(tracker, entry, price_area, period)
+            for period in (PERIOD_TODAY, PERIOD_MONTH, PERIOD_TOTAL)
+        )
+        if peak_count := int(entry.options.get(CONF_PEAK_COUNT, DEFAULT_PEAK_COUNT)):
+            peaks = PeakTracker(
+                hass,
+                peak_count,
+                entry.options.get(CONF_PEAK_HIGH_LOAD_ONLY, False),
+                tracker.async_flush,
+            )
+            tracker.async_add_energy_consumer(peaks.async_add_energy)
+            sensors_to_add.extend(
+                [
+                    ElprisPowerPeakSensor(peaks, coordinator, entry, price_area),
+                    ElprisPeakHeadroomSensor(peaks, coordinator, entry, price_area),
+                    ElprisPeakFeeSensor(peaks, coordinator, entry, price_area),
+                ]
+            )
+
+    battery_settings = BatterySettings.from_options(entry.options)
+    soc_sensor = entry.options.get(CONF_BATTERY_SOC_SENSOR)
+    if battery_settings is not None and soc_sensor:
+        dispatcher = BatteryDispatcher(
+            hass, entry, coordinator, battery_settings, soc_sensor
+        )
+        sensors_to_add.append(ElprisBatteryPlanSensor(dispatcher, entry, price_area))
+
+    if compare_areas := [
+        area for area in entry.options.get(CONF_COMPARE_AREAS, []) if area != price_area
+    ]:
+        store = get_area_store(hass)
+        sensors_to_add.extend(
+            ElprisAreaSpreadSensor(store, entry, price_area, other_area)
+            for other_area in compare_areas
+        )
+        sensors_to_add.append(
+            ElprisCheapestAreaSensor(
+                store, entry, price_area, [price_area, *compare_areas]
+            )
+        )
+
     async_add_entities(sensors_to_add)
     _LOGGER.debug(f"Added {len(sensors_to_add)} {INTEGRATION_NAME} sensor entities.")
 
@@ -91,106 +232,72 @@ class BaseElprisSensor(CoordinatorEntity[ElprisDataUpdateCoordinator], SensorEnt
         super().__init__(coordinator)
         self._entry = entry
         self._price_area = price_area
-        self._unsub_timer = None
         self._raw_current_spot_price_sek: float | None = None
+        self._price_lists_key: tuple | None = None
+        self._price_lists: dict = {}
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": f"{INTEGRATION_NAME} ({price_area})",
-            "manufacturer": MANUFACTURER,
-            "model": f"{MODEL} ({price_area})",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        self._attr_device_info = device_info(entry, price_area)
+
+    @property
+    def available(self) -> bool:
+        """Unavailable until cached or fetched prices exist."""
+        return super().available and bool(self.coordinator.data)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         _LOGGER.debug(f"Sensor {self.entity_id} added to HASS.")
-        self._update_internal_data(write_state=True)
-        self._schedule_next_price_update()
         self.async_on_remove(
-            self.coordinator.async_add_listener(
-                self._handle_coordinator_data_update_for_base
-            )
+            self.coordinator.async_add_entity_listener(self._handle_batched_update)
         )
-        if self.coordinator.last_update_success and self.coordinator.data:
-            self._update_internal_data(write_state=True)
+        self._update_internal_data(write_state=True)
 
-    async def async_will_remove_from_hass(self) -> None:
-        if self._unsub_timer:
-            self._unsub_timer()
-        await super().async_will_remove_from_hass()
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """State is written by the coordinator's batched entity update."""
 
     @callback
-    def _handle_coordinator_data_update_for_base(self) -> None:
-        if self.coordinator.last_update_success:
-            self._update_internal_data(write_state=True)
-        else:
-            self._raw_current_spot_price_sek = None
-            self._update_sensor_specific_data()
-            if self.hass:
-                self.async_write_ha_state()
+    def _handle_batched_update(self) -> None:
+        self._update_internal_data(write_state=True)
 
     def _update_internal_data(self, write_state: bool = False) -> None:
-        self._calculate_raw_current_spot_price_sek()
+        self._raw_current_spot_price_sek = self.coordinator.current_price_sek
         self._update_sensor_specific_data()
         if write_state and self.hass:
             self.async_write_ha_state()
 
-    def _calculate_raw_current_spot_price_sek(self) -> None:
-        raw_price = None
-        if self.coordinator.data:
-            prices_for_today_list = self.coordinator.data.get(dt_util.now().date(), [])
-            if prices_for_today_list:
-                # Calculate current quarter start (00, 15, 30, 45)
-                now = dt_util.now()
-                quarter_minute = (now.minute // 15) * 15
-                current_quarter_start_local = now.replace(
-                    minute=quarter_minute, second=0, microsecond=0
-                )
-
-                for price_info in prices_for_today_list:
-                    try:
-                        time_start_dt_local = dt_util.parse_datetime(
-                            price_info["time_start"]
-                        )
-                        # Compare strict equality including timezone info
-                        if time_start_dt_local == current_quarter_start_local:
-                            raw_price = float(price_info["SEK_per_kWh"])
-                            break
-                    except (TypeError, ValueError, KeyError):
-                        continue
-        self._raw_current_spot_price_sek = raw_price
-
     def _update_sensor_specific_data(self) -> None:
         raise NotImplementedError()
 
-    def _schedule_next_price_update(self) -> None:
-        """Schedule update for the next 15-minute mark."""
-        if self._unsub_timer:
-            self._unsub_timer()
-
-        now = dt_util.now()
-        # Calculate the start of the current 15-minute period
-        quarter_minute = (now.minute // 15) * 15
-        current_quarter_start = now.replace(
-            minute=quarter_minute, second=0, microsecond=0
-        )
-
-        # Next update is 15 minutes after the current period start
-        next_update_time = current_quarter_start + timedelta(minutes=15)
-
-        # Safety check: if calculation puts us in the past (milliseconds delay),
-        # add another 15 min
-        if next_update_time <= now:
-            next_update_time += timedelta(minutes=15)
-
-        self._unsub_timer = async_track_point_in_time(
-            self.hass, self._async_price_update_callback, next_update_time
+    def _cached_price_list_attributes(self) -> dict:
+        """Return the attributes built from today's and tomorrow's rows.
+
+        They are rebuilt only when the local date, the options, the version
+        of either day or tomorrow's estimate changes, not at every price
+        change during the day.
+        """
+        snapshot = self.coordinator.data
+        if not snapshot:
+            return {}
+        today = dt_util.now().date()
+        tomorrow = today + timedelta(days=1)
+        key = (
+            today,
+            self.coordinator.options_version,
+            snapshot.day_versions.get(today),
+            snapshot.day_versions.get(tomorrow),
+            self.coordinator.get_tomorrow_estimate(),
         )
+        if key != self._price_lists_key:
+            self._price_lists_key = key
+            self._price_lists = self._build_price_list_attributes(
+                snapshot.get(today, []), snapshot.get(tomorrow, [])
+            )
+        return self._price_lists
 
-    async def _async_price_update_callback(self, now_triggered: DateTime) -> None:
-        self._update_internal_data(write_state=True)
-        self._schedule_next_price_update()
+    def _build_price_list_attributes(
+        self, today_prices_raw: list, tomorrow_prices_raw: list
+    ) -> dict:
+        return {}
 
     def _format_raw_price_list_sek(self, raw_price_data_list: list) -> list:
         if not raw_price_data_list:
@@ -317,35 +424,39 @@ class ElprisSpotSensorOre(BaseElprisSensor):
             attrs[ATTR_LAST_API_UPDATE] = dt_util.as_local(
                 self.coordinator.last_api_call_timestamp
             ).isoformat()
-        if self.coordinator.data:
-            today_prices_raw = self.coordinator.data.get(dt_util.now().date(), [])
-            attrs[ATTR_RAW_TODAY] = self._format_raw_price_list_ore(today_prices_raw)
-            if attrs[ATTR_RAW_TODAY]:
-                ore_values = [
-                    p["ore_per_kWh"]
-                    for p in attrs[ATTR_RAW_TODAY]
-                    if "ore_per_kWh" in p
-                ]
-                if ore_values:
-                    attrs[ATTR_MIN_PRICE_TODAY_ORE] = min(ore_values)
-                    attrs[ATTR_MAX_PRICE_TODAY_ORE] = max(ore_values)
+        attrs.update(self._cached_price_list_attributes())
+        self._attr_extra_state_attributes = attrs
 
-            tomorrow_prices_raw = self.coordinator.data.get(
-                dt_util.now().date() + timedelta(days=1), []
-            )
-            attrs[ATTR_TOMORROW_PRICES_ORE] = self._format_raw_price_list_ore(
-                tomorrow_prices_raw
+    def _build_price_list_attributes(
+        self, today_prices_raw: list, tomorrow_prices_raw: list
+    ) -> dict:
+        attrs = {ATTR_RAW_TODAY: self._format_raw_price_list_ore(today_prices_raw)}
+        if attrs[ATTR_RAW_TODAY]:
+            ore_values = [
+                p["ore_per_kWh"] for p in attrs[ATTR_RAW_TODAY] if "ore_per_kWh" in p
+            ]
+            if ore_values:
+                attrs[ATTR_MIN_PRICE_TODAY_ORE] = min(ore_values)
+                attrs[ATTR_MAX_PRICE_TODAY_ORE] = max(ore_values)
+
+        attrs[ATTR_TOMORROW_PRICES_ORE] = self._format_raw_price_list_ore(
+            tomorrow_prices_raw
+        )
+        if attrs[ATTR_TOMORROW_PRICES_ORE]:
+            ore_values = [
+                p["ore_per_kWh"]
+                for p in attrs[ATTR_TOMORROW_PRICES_ORE]
+                if "ore_per_kWh" in p
+            ]
+            if ore_values:
+                attrs[ATTR_MIN_PRICE_TOMORROW_ORE] = min(ore_values)
+                attrs[ATTR_MAX_PRICE_TOMORROW_ORE] = max(ore_values)
+        elif (estimate := self.coordinator.get_tomorrow_estimate()) is not None:
+            attrs[ATTR_TOMORROW_ESTIMATE_ORE] = self._format_raw_price_list_ore(
+                estimate.rows(self.coordinator.get_timeline(estimate.date))
             )
-            if attrs[ATTR_TOMORROW_PRICES_ORE]:
-                ore_values = [
-                    p["ore_per_kWh"]
-                    for p in attrs[ATTR_TOMORROW_PRICES_ORE]
-                    if "ore_per_kWh" in p
-                ]
-                if ore_values:
-                    attrs[ATTR_MIN_PRICE_TOMORROW_ORE] = min(ore_values)
-                    attrs[ATTR_MAX_PRICE_TOMORROW_ORE] = max(ore_values)
-        self._attr_extra_state_attributes = attrs
+            attrs[ATTR_ESTIMATE_CONFIDENCE] = estimate.confidence
+        return attrs
 
 
 class ElprisInklusivePaslagSensorOre(BaseElprisSensor):
@@ -392,14 +503,18 @@ class ElprisInklusivePaslagSensorOre(BaseElprisSensor):
                 self.coordinator.last_api_call_timestamp
             ).isoformat()
 
-        if self.coordinator.data:
-            today_prices_raw = self.coordinator.data.get(dt_util.now().date(), [])
-            attrs[ATTR_RAW_TODAY] = self._format_raw_price_list_with_surcharge_ore(
-                today_prices_raw, surcharge_ore
-            )
-
+        attrs.update(self._cached_price_list_attributes())
         self._attr_extra_state_attributes = attrs
 
+    def _build_price_list_attributes(
+        self, today_prices_raw: list, tomorrow_prices_raw: list
+    ) -> dict:
+        return {
+            ATTR_RAW_TODAY: self._format_raw_price_list_with_surcharge_ore(
+                today_prices_raw, self._get_surcharge_ore_from_config()
+            )
+        }
+
 
 class ElprisSpotSensorSEK(BaseElprisSensor):
     def __init__(
@@ -435,35 +550,39 @@ class ElprisSpotSensorSEK(BaseElprisSensor):
             attrs[ATTR_LAST_API_UPDATE] = dt_util.as_local(
                 self.coordinator.last_api_call_timestamp
             ).isoformat()
-        if self.coordinator.data:
-            today_prices_raw = self.coordinator.data.get(dt_util.now().date(), [])
-            attrs[ATTR_RAW_TODAY] = self._format_raw_price_list_sek(today_prices_raw)
-            if attrs[ATTR_RAW_TODAY]:
-                sek_values = [
-                    p["SEK_per_kWh"]
-                    for p in attrs[ATTR_RAW_TODAY]
-                    if "SEK_per_kWh" in p
-                ]
-                if sek_values:
-                    attrs[ATTR_MIN_PRICE_TODAY_SEK] = min(sek_values)
-                    attrs[ATTR_MAX_PRICE_TODAY_SEK] = max(sek_values)
+        attrs.update(self._cached_price_list_attributes())
+        self._attr_extra_state_attributes = attrs
 
-            tomorrow_prices_raw = self.coordinator.data.get(
-                dt_util.now().date() + timedelta(days=1), []
-            )
-            attrs[ATTR_TOMORROW_PRICES_SEK] = self._format_raw_price_list_sek(
-                tomorrow_prices_raw
+    def _build_price_list_attributes(
+        self, today_prices_raw: list, tomorrow_prices_raw: list
+    ) -> dict:
+        attrs = {ATTR_RAW_TODAY: self._format_raw_price_list_sek(today_prices_raw)}
+        if attrs[ATTR_RAW_TODAY]:
+            sek_values = [
+                p["SEK_per_kWh"] for p in attrs[ATTR_RAW_TODAY] if "SEK_per_kWh" in p
+            ]
+            if sek_values:
+                attrs[ATTR_MIN_PRICE_TODAY_SEK] = min(sek_values)
+                attrs[ATTR_MAX_PRICE_TODAY_SEK] = max(sek_values)
+
+        attrs[ATTR_TOMORROW_PRICES_SEK] = self._format_raw_price_list_sek(
+            tomorrow_prices_raw
+        )
+        if attrs[ATTR_TOMORROW_PRICES_SEK]:
+            sek_values = [
+                p["SEK_per_kWh"]
+                for p in attrs[ATTR_TOMORROW_PRICES_SEK]
+                if "SEK_per_kWh" in p
+            ]
+            if sek_values:
+                attrs[ATTR_MIN_PRICE_TOMORROW_SEK] = min(sek_values)
+                attrs[ATTR_MAX_PRICE_TOMORROW_SEK] = max(sek_values)
+        elif (estimate := self.coordinator.get_tomorrow_estimate()) is not None:
+            attrs[ATTR_TOMORROW_ESTIMATE_SEK] = self._format_raw_price_list_sek(
+                estimate.rows(self.coordinator.get_timeline(estimate.date))
             )
-            if attrs[ATTR_TOMORROW_PRICES_SEK]:
-                sek_values = [
-                    p["SEK_per_kWh"]
-                    for p in attrs[ATTR_TOMORROW_PRICES_SEK]
-                    if "SEK_per_kWh" in p
-                ]
-                if sek_values:
-                    attrs[ATTR_MIN_PRICE_TOMORROW_SEK] = min(sek_values)
-                    attrs[ATTR_MAX_PRICE_TOMORROW_SEK] = max(sek_values)
-        self._attr_extra_state_attributes = attrs
+            attrs[ATTR_ESTIMATE_CONFIDENCE] = estimate.confidence
+        return attrs
 
 
 class ElprisInklusivePaslagSensorSEK(BaseElprisSensor):
@@ -515,15 +634,343 @@ class ElprisInklusivePaslagSensorSEK(BaseElprisSensor):
                 self.coordinator.last_api_call_timestamp
             ).isoformat()
 
-        if self.coordinator.data:
-            today_prices_raw = self.coordinator.data.get(dt_util.now().date(), [])
-            attrs[ATTR_RAW_TODAY] = self._format_raw_price_list_with_surcharge_sek(
-                today_prices_raw, surcharge_sek
+        attrs.update(self._cached_price_list_attributes())
+        self._attr_extra_state_attributes = attrs
+
+    def _build_price_list_attributes(
+        self, today_prices_raw: list, tomorrow_prices_raw: list
+    ) -> dict:
+        return {
+            ATTR_RAW_TODAY: self._format_raw_price_list_with_surcharge_sek(
+                today_prices_raw, self._get_surcharge_sek_from_config()
+            )
+        }
+
+
+class ElprisHourlyPriceSensorSEK(BaseElprisSensor):
+    """Mean spot price of the current hour, derived from the quarter prices."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._attr_name = "Timpris medel i SEK/kWh"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_sek_hourly_mean"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_native_unit_of_measurement = "SEK/kWh"
+        self._attr_suggested_display_precision = SEK_ROUNDING_DECIMALS
+        self._attr_icon = ICON_CURRENCY_SEK
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_device_class = SensorDeviceClass.MONETARY
+
+    @staticmethod
+    def _format_hourly_list_sek(hourly: list) -> list:
+        return [
+            {
+                "time_start": hour["time_start"],
+                "time_end": hour["time_end"],
+                "mean": round(hour["mean"], SEK_ROUNDING_DECIMALS),
+                "min": round(hour["min"], SEK_ROUNDING_DECIMALS),
+                "max": round(hour["max"], SEK_ROUNDING_DECIMALS),
+            }
+            for hour in hourly
+        ]
+
+    def _update_sensor_specific_data(self) -> None:
+        current_hour = self.coordinator.current_hour
+        attrs = {ATTR_PRICE_AREA: self._price_area}
+        if current_hour is not None:
+            self._attr_native_value = round(current_hour["mean"], SEK_ROUNDING_DECIMALS)
+            attrs[ATTR_HOUR_MIN_SEK] = round(current_hour["min"], SEK_ROUNDING_DECIMALS)
+            attrs[ATTR_HOUR_MAX_SEK] = round(current_hour["max"], SEK_ROUNDING_DECIMALS)
+        else:
+            self._attr_native_value = None
+
+        today = dt_util.now().date()
+        attrs[ATTR_HOURLY_TODAY] = self._format_hourly_list_sek(
+            self.coordinator.hourly_prices.get(today, [])
+        )
+        attrs[ATTR_HOURLY_TOMORROW] = self._format_hourly_list_sek(
+            self.coordinator.hourly_prices.get(today + timedelta(days=1), [])
+        )
+        self._attr_extra_state_attributes = attrs
+
+
+class ElprisSpotSensorEUR(BaseElprisSensor):
+    """Spot price in EUR/kWh, from the same API rows as the SEK price."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._attr_name = "Spotpris i EUR/kWh"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_eur_spot"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_native_unit_of_measurement = "EUR/kWh"
+        self._attr_suggested_display_precision = SEK_ROUNDING_DECIMALS
+        self._attr_icon = ICON_CURRENCY_EUR
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_device_class = SensorDeviceClass.MONETARY
+
+    @staticmethod
+    def _format_raw_price_list_eur(raw_price_data_list: list) -> list:
+        return [
+            {
+                PRICE_COLUMN_EUR: round(item[PRICE_COLUMN_EUR], SEK_ROUNDING_DECIMALS),
+                "time_start": item["time_start"],
+                **({"time_end": item["time_end"]} if item.get("time_end") else {}),
+            }
+            for item in raw_price_data_list
+            if isinstance(item.get(PRICE_COLUMN_EUR), float)
+        ]
+
+    def _update_sensor_specific_data(self) -> None:
+        price_eur = self.coordinator.current_price_eur
+        self._attr_native_value = (
+            round(price_eur, SEK_ROUNDING_DECIMALS) if price_eur is not None else None
+        )
+        attrs = {ATTR_PRICE_AREA: self._price_area}
+        attrs.update(self._cached_price_list_attributes())
+        self._attr_extra_state_attributes = attrs
+
+    def _build_price_list_attributes(
+        self, today_prices_raw: list, tomorrow_prices_raw: list
+    ) -> dict:
+        return {
+            ATTR_RAW_TODAY: self._format_raw_price_list_eur(today_prices_raw),
+            ATTR_TOMORROW_PRICES_EUR: self._format_raw_price_list_eur(
+                tomorrow_prices_raw
+            ),
+        }
+
+
+class ElprisExchangeRateSensor(BaseElprisSensor):
+    """EUR to SEK exchange rate the API used for the current quarter."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._attr_name = "Växelkurs EUR/SEK"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_exchange_rate"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_native_unit_of_measurement = "SEK/EUR"
+        self._attr_suggested_display_precision = SEK_ROUNDING_DECIMALS
+        self._attr_icon = ICON_EXCHANGE_RATE
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    def _update_sensor_specific_data(self) -> None:
+        rate = self.coordinator.current_exchange_rate
+        self._attr_native_value = round(rate, 5) if rate is not None else None
+        self._attr_extra_state_attributes = {ATTR_PRICE_AREA: self._price_area}
+
+
+# --- Rank, Percentile and Level Sensors ---
+def price_level_for_percentile(percentile: float, thresholds: dict) -> str:
+    """Map a percentile (0-100) to a price level category."""
+    if percentile <= thresholds[CONF_LEVEL_VERY_CHEAP_PCT]:
+        return PRICE_LEVEL_VERY_CHEAP
+    if percentile <= thresholds[CONF_LEVEL_CHEAP_PCT]:
+        return PRICE_LEVEL_CHEAP
+    if percentile >= thresholds[CONF_LEVEL_VERY_EXPENSIVE_PCT]:
+        return PRICE_LEVEL_VERY_EXPENSIVE
+    if percentile >= thresholds[CONF_LEVEL_EXPENSIVE_PCT]:
+        return PRICE_LEVEL_EXPENSIVE
+    return PRICE_LEVEL_NORMAL
+
+
+class ElprisPriceRankSensor(BaseElprisSensor):
+    """Rank of the current quarter among today's quarters (1 = cheapest)."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._attr_name = "Prisrank idag"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_rank_today"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+        self._attr_icon = ICON_PRICE_RANK
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    def _update_sensor_specific_data(self) -> None:
+        rank = self.coordinator.get_current_price_rank((dt_util.now().date(),))
+        attrs = {ATTR_PRICE_AREA: self._price_area}
+        if rank is not None:
+            self._attr_native_value = rank[0]
+            attrs[ATTR_PRICE_COUNT] = rank[1]
+            attrs[ATTR_PERCENTILE] = round(rank[2], 1)
+        else:
+            self._attr_native_value = None
+        self._attr_extra_state_attributes = attrs
+
+
+class ElprisPricePercentileSensor(BaseElprisSensor):
+    """Percentile of the current quarter among today's (and tomorrow's) prices."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+        include_tomorrow: bool,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._include_tomorrow = include_tomorrow
+        if include_tomorrow:
+            self._attr_name = "Prispercentil idag och imorgon"
+            object_id_part = f"elpris_kvart_{price_area.lower()}_percentile_2d"
+        else:
+            self._attr_name = "Prispercentil idag"
+            object_id_part = f"elpris_kvart_{price_area.lower()}_percentile_today"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+        self._attr_native_unit_of_measurement = "%"
+        self._attr_suggested_display_precision = 1
+        self._attr_icon = ICON_PRICE_RANK
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    def _update_sensor_specific_data(self) -> None:
+        today = dt_util.now().date()
+        days = (
+            (today, today + timedelta(days=1)) if self._include_tomorrow else (today,)
+        )
+        rank = self.coordinator.get_current_price_rank(days)
+        attrs = {ATTR_PRICE_AREA: self._price_area}
+        if rank is not None:
+            self._attr_native_value = round(rank[2], 1)
+            attrs[ATTR_PRICE_COUNT] = rank[1]
+        else:
+            self._attr_native_value = None
+        self._attr_extra_state_attributes = attrs
+
+
+class ElprisPriceLevelSensor(BaseElprisSensor):
+    """Price level category of the current quarter relative to today, or to
+    the rolling distribution of the last window_days days."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+        window_days: int | None = None,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._window_days = window_days
+        if window_days is None:
+            self._attr_name = "Prisnivå"
+            object_id_part = f"elpris_kvart_{price_area.lower()}_price_level"
+        else:
+            self._attr_name = f"Prisnivå {window_days} dygn"
+            object_id_part = (
+                f"elpris_kvart_{price_area.lower()}_price_level_{window_days}d"
             )
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+        self._attr_icon = ICON_PRICE_LEVEL
+        self._attr_device_class = SensorDeviceClass.ENUM
+        self._attr_options = PRICE_LEVELS
+
+    def _get_level_thresholds(self) -> dict:
+        thresholds = {}
+        for key, default in DEFAULT_LEVEL_THRESHOLDS_PCT.items():
+            try:
+                thresholds[key] = float(self._entry.options.get(key, default))
+            except (ValueError, TypeError):
+                thresholds[key] = default
+        return thresholds
 
+    def _update_sensor_specific_data(self) -> None:
+        thresholds = self._get_level_thresholds()
+        if self._window_days is not None:
+            self._update_rolling_level(thresholds)
+            return
+        rank = self.coordinator.get_current_price_rank((dt_util.now().date(),))
+        attrs = {
+            ATTR_PRICE_AREA: self._price_area,
+            ATTR_LEVEL_THRESHOLDS: thresholds,
+        }
+        if rank is not None:
+            self._attr_native_value = price_level_for_percentile(rank[2], thresholds)
+            attrs[ATTR_PERCENTILE] = round(rank[2], 1)
+        else:
+            self._attr_native_value = None
+        self._attr_extra_state_attributes = attrs
+
+    def _update_rolling_level(self, thresholds: dict) -> None:
+        rolling = self.coordinator.rolling
+        sketch = rolling.windows[self._window_days]
+        price = self.coordinator.current_price_sek
+        attrs = {
+            ATTR_PRICE_AREA: self._price_area,
+            ATTR_LEVEL_THRESHOLDS: thresholds,
+            ATTR_WINDOW_DAYS: self._window_days,
+            **rolling.summary(self._window_days),
+        }
+        percentile = None if price is None else sketch.percentile_of(price)
+        if percentile is not None:
+            self._attr_native_value = price_level_for_percentile(percentile, thresholds)
+            attrs[ATTR_PERCENTILE] = round(percentile, 1)
+            if sketch.stddev:
+                attrs[ATTR_Z_SCORE] = round((price - sketch.mean) / sketch.stddev, 2)
+        else:
+            self._attr_native_value = None
         self._attr_extra_state_attributes = attrs
 
 
+class ElprisPriceCacheSensor(BaseElprisSensor):
+    """Diagnostic sensor reporting memory held by cached price days."""
+
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(coordinator, entry, price_area)
+        self._attr_name = "Prisdata i minnet"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_cache_memory"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+        self._attr_native_unit_of_measurement = "kB"
+        self._attr_suggested_display_precision = 1
+        self._attr_icon = ICON_PRICE_CACHE
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def available(self) -> bool:
+        """Always available, also before any prices exist."""
+        return True
+
+    def _update_sensor_specific_data(self) -> None:
+        cache = self.coordinator.cache
+        self._attr_native_value = round(cache.memory_usage_bytes / 1024, 1)
+        self._attr_extra_state_attributes = {
+            ATTR_PRICE_AREA: self._price_area,
+            ATTR_DAYS_IN_MEMORY: [day.isoformat() for day in sorted(cache.memory)],
+            ATTR_DAYS_ON_DISK: cache.days_on_disk,
+            ATTR_MEMORY_BUDGET_KB: round(cache.memory_budget_bytes / 1024, 1),
+            ATTR_RETENTION_DAYS: self.coordinator.retention_days,
+            ATTR_DATA_QUALITY: {
+                day.isoformat(): quality.as_dict()
+                for day, quality in sorted(self.coordinator.data_quality.items())
+            },
+        }
+
+
 # --- New Surcharge Display Sensors ---
 class SurchargeDisplaySensorBase(SensorEntity):
     """Base class for surcharge display sensors."""
@@ -534,28 +981,34 @@ class SurchargeDisplaySensorBase(SensorEntity):
     _attr_icon = ICON_SURCHARGE_DISPLAY
     _attr_has_entity_name = True
 
-    def __init__(self, entry: ConfigEntry, price_area: str):
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        self._coordinator = coordinator
         self._entry = entry
         self._price_area = price_area
         self._update_surcharge_value()
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": f"{INTEGRATION_NAME} ({price_area})",
-            "manufacturer": MANUFACTURER,
-            "model": f"{MODEL} ({price_area})",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        self._attr_device_info = device_info(entry, price_area)
 
-    def _get_surcharge_ore_from_config(self) -> float:
-        """Helper to get surcharge in öre from config entry."""
-        return float(
-            self._entry.options.get(
-                CONF_SURCHARGE_ORE,
-                self._entry.data.get(CONF_SURCHARGE_ORE, DEFAULT_SURCHARGE_ORE),
-            )
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.async_add_entity_listener(self._handle_batched_update)
         )
 
+    @callback
+    def _handle_batched_update(self) -> None:
+        self._update_surcharge_value()
+        self.async_write_ha_state()
+
+    def _get_surcharge_ore_from_config(self) -> float:
+        """Helper to get surcharge in öre from the coordinator."""
+        return self._coordinator.get_surcharge_sek() * 100.0
+
     def _update_surcharge_value(self) -> None:
         """Update the sensor's native value based on the config."""
         raise NotImplementedError()
@@ -564,14 +1017,19 @@ class SurchargeDisplaySensorBase(SensorEntity):
 class SurchargeOreSensor(SurchargeDisplaySensorBase):
     """Sensor to display the configured surcharge in öre/kWh."""
 
-    def __init__(self, entry: ConfigEntry, price_area: str):
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
         self._attr_name = "Spotpris påslag Öre/kWh"
         self._attr_unique_id = (
             f"{entry.entry_id}_elpris_paslag_ore_{price_area.lower()}"
         )
         self._attr_native_unit_of_measurement = "öre/kWh"
         self._attr_suggested_display_precision = ORE_ROUNDING_DECIMALS
-        super().__init__(entry, price_area)
+        super().__init__(coordinator, entry, price_area)
 
     def _update_surcharge_value(self) -> None:
         """Update the sensor's native value to the surcharge in öre."""
@@ -583,16 +1041,469 @@ class SurchargeOreSensor(SurchargeDisplaySensorBase):
 class SurchargeSEKSensor(SurchargeDisplaySensorBase):
     """Sensor to display the configured surcharge in SEK/kWh."""
 
-    def __init__(self, entry: ConfigEntry, price_area: str):
+    def __init__(
+        self,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
         self._attr_name = "Spotpris påslag SEK/kWh"
         self._attr_unique_id = (
             f"{entry.entry_id}_elpris_paslag_sek_{price_area.lower()}"
         )
         self._attr_native_unit_of_measurement = "SEK/kWh"
         self._attr_suggested_display_precision = SEK_ROUNDING_DECIMALS
-        super().__init__(entry, price_area)
+        super().__init__(coordinator, entry, price_area)
 
     def _update_surcharge_value(self) -> None:
         """Update the sensor's native value to the surcharge in SEK."""
         surcharge_ore = self._get_surcharge_ore_from_config()
         self._attr_native_value = round(surcharge_ore / 100.0, SEK_ROUNDING_DECIMALS)
+
+
+# --- Energy Cost Sensors ---
+class ElprisEnergyCostSensor(RestoreSensor):
+    """Sensor accumulating the realized cost of a consumption sensor."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = "SEK"
+    _attr_suggested_display_precision = 2
+    _attr_icon = ICON_ENERGY_COST
+
+    def __init__(
+        self,
+        tracker: EnergyCostTracker,
+        entry: ConfigEntry,
+        price_area: str,
+        period: str,
+    ):
+        self._tracker = tracker
+        self._period = period
+        self._attr_name = COST_SENSOR_NAMES[period]
+        object_id_part = f"elpris_kvart_{price_area.lower()}_cost_{period}"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_device_info = device_info(entry, price_area)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        last_sensor_data = await self.async_get_last_sensor_data()
+        last_state = await self.async_get_last_state()
+        if last_sensor_data is not None and last_state is not None:
+            try:
+                restored_value = float(last_sensor_data.native_value)
+            except (TypeError, ValueError):
+                restored_value = None
+            if restored_value is not None:
+                last_reset = last_state.attributes.get("last_reset")
+                self._tracker.async_restore_period(
+                    self._period,
+                    restored_value,
+                    dt_util.parse_datetime(last_reset) if last_reset else None,
+                )
+            if self._period == PERIOD_TOTAL:
+                self._restore_last_reading(last_state.attributes)
+
+        self.async_on_remove(
+            self._tracker.async_add_listener(self._handle_tracker_update)
+        )
+        self._update_from_tracker()
+
+    def _restore_last_reading(self, attributes) -> None:
+        reading_time = attributes.get(ATTR_LAST_READING_TIME)
+        reading_value = attributes.get(ATTR_LAST_READING_VALUE)
+        reading_unit = attributes.get(ATTR_LAST_READING_UNIT)
+        if reading_time is None or reading_value is None or reading_unit is None:
+            return
+        reading_dt = dt_util.parse_datetime(reading_time)
+        if reading_dt is None:
+            return
+        try:
+            self._tracker.async_restore_reading(
+                float(reading_value), reading_unit, reading_dt
+            )
+        except (TypeError, ValueError):
+            return
+
+    @callback
+    def _handle_tracker_update(self) -> None:
+        self._update_from_tracker()
+        self.async_write_ha_state()
+
+    def _update_from_tracker(self) -> None:
+        self._attr_native_value = round(self._tracker.get_cost(self._period), 4)
+        if self._period != PERIOD_TOTAL:
+            self._attr_last_reset = self._tracker.period_starts[self._period]
+
+        attrs = {ATTR_SOURCE_ENTITY: self._tracker.source_entity_id}
+        if self._period == PERIOD_TOTAL:
+            attrs[ATTR_UNPRICED_ENERGY_KWH] = round(
+                self._tracker.unpriced_energy_kwh, 4
+            )
+            if self._tracker.last_reading is not None:
+                reading_ts, reading_value, reading_unit = self._tracker.last_reading
+                attrs[ATTR_LAST_READING_TIME] = dt_util.utc_from_timestamp(
+                    reading_ts
+                ).isoformat()
+                attrs[ATTR_LAST_READING_VALUE] = reading_value
+                attrs[ATTR_LAST_READING_UNIT] = reading_unit
+        self._attr_extra_state_attributes = attrs
+
+
+# --- Power Peak Sensors ---
+class PeakTrackerSensorBase(SensorEntity):
+    """Base class for sensors reading the monthly power peak tracker."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        peaks: PeakTracker,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+        name: str,
+        key: str,
+    ):
+        self._peaks = peaks
+        self._coordinator = coordinator
+        self._entry = entry
+        self._attr_name = name
+        object_id_part = f"elpris_kvart_{price_area.lower()}_{key}"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_device_info = device_info(entry, price_area)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._peaks.async_add_listener(self._handle_peak_update))
+        # Entity updates apply a changed fee; the tracker closes ended hours
+        # on its own hourly timer.
+        self.async_on_remove(
+            self._coordinator.async_add_entity_listener(self._handle_peak_update)
+        )
+        self._update_from_peaks()
+
+    @callback
+    def _handle_peak_update(self) -> None:
+        self._update_from_peaks()
+        self.async_write_ha_state()
+
+    def _update_from_peaks(self) -> None:
+        raise NotImplementedError
+
+
+class ElprisPowerPeakSensor(PeakTrackerSensorBase, RestoreSensor):
+    """Mean of the month's highest hourly average powers, as billed."""
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "kW"
+    _attr_suggested_display_precision = 2
+    _attr_icon = ICON_POWER_PEAK
+
+    def __init__(
+        self,
+        peaks: PeakTracker,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(
+            peaks,
+            coordinator,
+            entry,
+            price_area,
+            "Effekttopp denna månad",
+            "power_peak",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        if (last_state := await self.async_get_last_state()) is not None:
+            self._restore_peaks(last_state.attributes)
+        await super().async_added_to_hass()
+
+    def _restore_peaks(self, attributes) -> None:
+        peaks = []
+        for peak in attributes.get(ATTR_PEAKS) or []:
+            try:
+                start = dt_util.parse_datetime(peak["start"])
+                kw = float(peak["kw"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if start is not None:
+                peaks.append((kw, int(start.timestamp())))
+        hour_start = attributes.get(ATTR_CURRENT_HOUR_START)
+        hour_dt = dt_util.parse_datetime(hour_start) if hour_start else None
+        try:
+            hour_kwh = float(attributes.get(ATTR_CURRENT_HOUR_KWH) or 0.0)
+        except (TypeError, ValueError):
+            hour_kwh = 0.0
+        self._peaks.async_restore(
+            peaks, int(hour_dt.timestamp()) if hour_dt else None, hour_kwh
+        )
+
+    def _update_from_peaks(self) -> None:
+        self._attr_native_value = round(self._peaks.billing_peak_kw, 3)
+        attrs = {
+            ATTR_PEAK_COUNT: self._peaks.peak_count,
+            ATTR_HIGH_LOAD_ONLY: self._peaks.high_load_only,
+            ATTR_PEAKS: [
+                {
+                    "start": dt_util.utc_from_timestamp(start).isoformat(),
+                    "kw": round(kw, 4),
+                }
+                for kw, start in self._peaks.sorted_peaks()
+            ],
+        }
+        if self._peaks.hour_start is not None:
+            attrs[ATTR_CURRENT_HOUR_START] = dt_util.utc_from_timestamp(
+                self._peaks.hour_start
+            ).isoformat()
+            attrs[ATTR_CURRENT_HOUR_KWH] = round(self._peaks.hour_kwh, 4)
+        self._attr_extra_state_attributes = attrs
+
+
+class ElprisPeakHeadroomSensor(PeakTrackerSensorBase):
+    """Average power the running hour may still add before it sets a peak."""
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "kW"
+    _attr_suggested_display_precision = 2
+    _attr_icon = ICON_POWER_PEAK
+
+    def __init__(
+        self,
+        peaks: PeakTracker,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(
+            peaks, coordinator, entry, price_area, "Effektmarginal", "peak_headroom"
+        )
+
+    def _update_from_peaks(self) -> None:
+        headroom = self._peaks.headroom_kw()
+        self._attr_native_value = None if headroom is None else round(headroom, 3)
+
+
+class ElprisPeakFeeSensor(PeakTrackerSensorBase):
+    """Capacity fee for the month if the running hour ended now."""
+
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement = "SEK"
+    _attr_suggested_display_precision = 2
+    _attr_icon = ICON_PEAK_FEE
+
+    def __init__(
+        self,
+        peaks: PeakTracker,
+        coordinator: ElprisDataUpdateCoordinator,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        super().__init__(
+            peaks, coordinator, entry, price_area, "Beräknad effektavgift", "peak_fee"
+        )
+
+    def _update_from_peaks(self) -> None:
+        try:
+            fee = float(
+                self._entry.options.get(
+                    CONF_PEAK_FEE_SEK_PER_KW, DEFAULT_PEAK_FEE_SEK_PER_KW
+                )
+            )
+        except (TypeError, ValueError):
+            fee = DEFAULT_PEAK_FEE_SEK_PER_KW
+        projected_kw = self._peaks.projected_peak_kw()
+        self._attr_native_value = round(projected_kw * fee, 2)
+        self._attr_extra_state_attributes = {
+            ATTR_PROJECTED_PEAK_KW: round(projected_kw, 3),
+            ATTR_FEE_SEK_PER_KW: fee,
+        }
+
+
+# --- Battery Plan Sensor ---
+class ElprisBatteryPlanSensor(SensorEntity):
+    """Battery action planned for the current quarter."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = BATTERY_ACTIONS
+    _attr_icon = ICON_BATTERY_PLAN
+
+    def __init__(
+        self,
+        dispatcher: BatteryDispatcher,
+        entry: ConfigEntry,
+        price_area: str,
+    ):
+        self._dispatcher = dispatcher
+        self._attr_name = "Batteriplan"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_battery_plan"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+        self._attr_device_info = device_info(entry, price_area)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._dispatcher.async_add_listener(self._handle_plan_update)
+        )
+        self._update_from_dispatcher()
+
+    @callback
+    def _handle_plan_update(self) -> None:
+        self._update_from_dispatcher()
+        self.async_write_ha_state()
+
+    def _update_from_dispatcher(self) -> None:
+        attrs = {ATTR_SOURCE_ENTITY: self._dispatcher.soc_entity_id}
+        schedule = self._dispatcher.schedule
+        index = self._dispatcher.current_index()
+        if schedule is None or index is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = attrs
+            return
+        power_kw = schedule.plan.power_kw[index]
+        self._attr_native_value = action_for_power(power_kw)
+        attrs[ATTR_PLANNED_POWER_KW] = round(power_kw, 3)
+        attrs[ATTR_TARGET_SOC_PCT] = round(schedule.soc_pct(index), 1)
+        attrs[ATTR_EXPECTED_SAVINGS_SEK] = round(schedule.plan.savings_sek, 4)
+        attrs[ATTR_SCHEDULE] = schedule.blocks(index)
+        self._attr_extra_state_attributes = attrs
+
+
+# --- Cross-area Sensors ---
+class AreaStoreSensorBase(SensorEntity):
+    """Base class for sensors comparing price areas through the area store."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+
+    def __init__(self, store: AreaPriceStore, entry: ConfigEntry, price_area: str):
+        self._store = store
+        self._price_area = price_area
+        self._attr_device_info = device_info(entry, price_area)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._store.async_add_listener(self._handle_store_update))
+        self._update_from_store()
+
+    @callback
+    def _handle_store_update(self) -> None:
+        self._update_from_store()
+        self.async_write_ha_state()
+
+    def _update_from_store(self) -> None:
+        raise NotImplementedError()
+
+
+class ElprisAreaSpreadSensor(AreaStoreSensorBase):
+    """Current spot price of this area minus that of another area."""
+
+    _attr_native_unit_of_measurement = "SEK/kWh"
+    _attr_suggested_display_precision = SEK_ROUNDING_DECIMALS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = ICON_AREA_SPREAD
+
+    def __init__(
+        self,
+        store: AreaPriceStore,
+        entry: ConfigEntry,
+        price_area: str,
+        other_area: str,
+    ):
+        super().__init__(store, entry, price_area)
+        self._other_area = other_area
+        self._attr_name = f"Prisskillnad mot {other_area}"
+        object_id_part = (
+            f"elpris_kvart_{price_area.lower()}_spread_{other_area.lower()}"
+        )
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+        self._series_key: tuple | None = None
+        self._series_attrs: dict = {}
+
+    def _spread_rows(self, day) -> list:
+        series = self._store.spread_series(self._price_area, self._other_area, day)
+        if not series:
+            return []
+        timeline = self._store.coordinators[self._price_area].get_timeline(day)
+        return [
+            {
+                "SEK_per_kWh": round(spread, SEK_ROUNDING_DECIMALS),
+                "time_start": dt_util.as_local(timeline.slot_start(slot)).isoformat(),
+            }
+            for slot, spread in enumerate(series)
+            if spread is not None
+        ]
+
+    def _update_from_store(self) -> None:
+        own = self._store.current_prices.get(self._price_area)
+        other = self._store.current_prices.get(self._other_area)
+        self._attr_native_value = (
+            None
+            if own is None or other is None
+            else round(own - other, SEK_ROUNDING_DECIMALS)
+        )
+
+        today = dt_util.now().date()
+        key = (
+            today,
+            *(
+                coordinator.data_version if coordinator else None
+                for coordinator in (
+                    self._store.coordinators.get(self._price_area),
+                    self._store.coordinators.get(self._other_area),
+                )
+            ),
+        )
+        if key != self._series_key:
+            self._series_key = key
+            self._series_attrs = {
+                ATTR_SPREAD_TODAY: self._spread_rows(today),
+                ATTR_SPREAD_TOMORROW: self._spread_rows(today + timedelta(days=1)),
+            }
+        self._attr_extra_state_attributes = {
+            ATTR_PRICE_AREA: self._price_area,
+            ATTR_COMPARE_AREA: self._other_area,
+            **self._series_attrs,
+        }
+
+
+class ElprisCheapestAreaSensor(AreaStoreSensorBase):
+    """The price area with the lowest spot price right now."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_icon = ICON_CHEAPEST_AREA
+
+    def __init__(
+        self,
+        store: AreaPriceStore,
+        entry: ConfigEntry,
+        price_area: str,
+        areas: list[str],
+    ):
+        super().__init__(store, entry, price_area)
+        self._areas = areas
+        self._attr_options = sorted(areas)
+        self._attr_name = "Billigaste elområde nu"
+        object_id_part = f"elpris_kvart_{price_area.lower()}_cheapest_area"
+        self._attr_unique_id = f"{entry.entry_id}_{object_id_part}"
+
+    def _update_from_store(self) -> None:
+        self._attr_native_value = self._store.cheapest_area(self._areas)
+        self._attr_extra_state_attributes = {
+            ATTR_AREA_PRICES_SEK: {
+                area: self._store.current_prices.get(area)
+                for area in self._attr_options
+            },
+        }
@@ -0,0 +1,383 @@
+# Version: 2025-12-19-rev18
+"""Services for the Elpris Kvart integration."""
+
+import logging
+from datetime import datetime as DateTimeObject
+from datetime import timedelta
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator, get_coordinator_for_area
+from .battery import BatterySettings, action_for_power, async_plan_horizon
+from .const import (
+    ATTR_AREA,
+    ATTR_AREAS,
+    ATTR_CAPACITY_KWH,
+    ATTR_CHARGE_POWER_KW,
+    ATTR_COLUMNS,
+    ATTR_CPROFILE,
+    ATTR_DEADLINE,
+    ATTR_DISCHARGE_POWER_KW,
+    ATTR_DURATION,
+    ATTR_EARLIEST_START,
+    ATTR_EFFICIENCY_PCT,
+    ATTR_END_DATE,
+    ATTR_ENERGY_KWH,
+    ATTR_ESTIMATE_CONFIDENCE,
+    ATTR_EXPECTED_SAVINGS_SEK,
+    ATTR_FORMAT,
+    ATTR_MAX_POWER_KW,
+    ATTR_MAX_SOC_PCT,
+    ATTR_MIN_BLOCK_MINUTES,
+    ATTR_MIN_SOC_PCT,
+    ATTR_PROFILE_ACTION,
+    ATTR_SOC_PCT,
+    ATTR_START_DATE,
+    ATTR_TARIFF_ORE,
+    ATTR_USE_ESTIMATE,
+    BATTERY_ACTION_IDLE,
+    DEFAULT_BATTERY_EFFICIENCY_PCT,
+    DEFAULT_BATTERY_MAX_SOC_PCT,
+    DEFAULT_BATTERY_MIN_SOC_PCT,
+    DOMAIN,
+    EXPORT_COLUMN_SPOT,
+    EXPORT_COLUMNS,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    EXPORT_MAX_DAYS,
+    PRICE_AREAS,
+    PROFILE_ACTION_START,
+    PROFILE_ACTION_STOP,
+    PROFILE_ACTIONS,
+    SERVICE_EXPORT_PRICES,
+    SERVICE_PLAN_BATTERY,
+    SERVICE_PLAN_LOAD,
+    SERVICE_PROFILE,
+)
+from .export import async_export_prices
+from .optimizer import plan_load
+from .profiler import get_profiler
+from .timeline import SLOT_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+PLAN_CACHE_SIZE = 64
+
+_POSITIVE_FLOAT = vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+_PERCENT = vol.All(vol.Coerce(float), vol.Range(min=0, max=100))
+
+PLAN_LOAD_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_AREA): vol.In(PRICE_AREAS),
+        vol.Required(ATTR_ENERGY_KWH): _POSITIVE_FLOAT,
+        vol.Required(ATTR_MAX_POWER_KW): _POSITIVE_FLOAT,
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_MIN_BLOCK_MINUTES, default=15): vol.All(
+            vol.Coerce(int), vol.Range(min=15, max=1440)
+        ),
+        vol.Optional(ATTR_USE_ESTIMATE, default=False): cv.boolean,
+    }
+)
+
+PLAN_BATTERY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_AREA): vol.In(PRICE_AREAS),
+        vol.Required(ATTR_CAPACITY_KWH): _POSITIVE_FLOAT,
+        vol.Required(ATTR_CHARGE_POWER_KW): _POSITIVE_FLOAT,
+        vol.Optional(ATTR_DISCHARGE_POWER_KW): _POSITIVE_FLOAT,
+        vol.Optional(
+            ATTR_EFFICIENCY_PCT, default=DEFAULT_BATTERY_EFFICIENCY_PCT
+        ): vol.All(vol.Coerce(float), vol.Range(min=1, max=100)),
+        vol.Required(ATTR_SOC_PCT): _PERCENT,
+        vol.Optional(ATTR_MIN_SOC_PCT, default=DEFAULT_BATTERY_MIN_SOC_PCT): _PERCENT,
+        vol.Optional(ATTR_MAX_SOC_PCT, default=DEFAULT_BATTERY_MAX_SOC_PCT): _PERCENT,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PROFILE_ACTION, default=PROFILE_ACTION_START): vol.In(
+            PROFILE_ACTIONS
+        ),
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_CPROFILE, default=False): cv.boolean,
+    }
+)
+
+EXPORT_PRICES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_AREAS): vol.All(
+            cv.ensure_list, vol.Length(min=1), [vol.In(PRICE_AREAS)]
+        ),
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_COLUMNS, default=[EXPORT_COLUMN_SPOT]): vol.All(
+            cv.ensure_list, vol.Length(min=1), [vol.In(EXPORT_COLUMNS)]
+        ),
+        vol.Optional(ATTR_TARIFF_ORE, default=0.0): vol.Coerce(float),
+    }
+)
+
+
+def _as_aware(value: DateTimeObject) -> DateTimeObject:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.get_default_time_zone())
+    return value
+
+
+def _get_coordinator(hass: HomeAssistant, area: str) -> ElprisDataUpdateCoordinator:
+    coordinator = get_coordinator_for_area(hass, area)
+    if coordinator is None:
+        raise ServiceValidationError(f"No {DOMAIN} entry configured for {area}")
+    return coordinator
+
+
+def _local_iso(timestamp: float) -> str:
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).isoformat()
+
+
+async def _async_build_plan_response(
+    hass: HomeAssistant,
+    coordinator: ElprisDataUpdateCoordinator,
+    call_data: dict,
+) -> dict:
+    """Compute the cheapest slots for a flexible load.
+
+    The horizon is read on the event loop and planned in the executor,
+    since the minimum-block search grows with horizon, load and block size.
+    """
+    now = dt_util.utcnow()
+    earliest = _as_aware(call_data.get(ATTR_EARLIEST_START) or now)
+    deadline = _as_aware(call_data.get(ATTR_DEADLINE) or now + timedelta(days=2))
+    energy_kwh = call_data[ATTR_ENERGY_KWH]
+    max_power_kw = call_data[ATTR_MAX_POWER_KW]
+    min_block_slots = -(-call_data[ATTR_MIN_BLOCK_MINUTES] * 60 // SLOT_SECONDS)
+
+    estimate = (
+        coordinator.get_tomorrow_estimate() if call_data[ATTR_USE_ESTIMATE] else None
+    )
+    slot_starts, prices = coordinator.get_horizon(
+        max(earliest, now), deadline, include_estimate=estimate is not None
+    )
+    data_version = coordinator.data_version
+    surcharge_sek = coordinator.get_surcharge_sek()
+    tomorrow_start_ts = (
+        coordinator.get_timeline(estimate.date).start_ts
+        if estimate is not None
+        else None
+    )
+    plan = await hass.async_add_executor_job(
+        plan_load, prices, energy_kwh, max_power_kw, min_block_slots
+    )
+    if plan is None:
+        raise ServiceValidationError(
+            f"Cannot fit {energy_kwh} kWh at {max_power_kw} kW between "
+            f"{earliest.isoformat()} and {deadline.isoformat()} with known prices"
+        )
+
+    quarters = []
+    blocks: list[dict] = []
+    previous_slot = None
+    for slot, slot_energy in zip(plan.slots, plan.energy_per_slot_kwh, strict=True):
+        start_ts = slot_starts[slot]
+        end_ts = start_ts + SLOT_SECONDS
+        quarters.append(
+            {
+                "start": _local_iso(start_ts),
+                "end": _local_iso(end_ts),
+                "energy_kwh": round(slot_energy, 4),
+                "price_sek": round(prices[slot], 4),
+            }
+        )
+        if previous_slot is not None and slot == previous_slot + 1:
+            blocks[-1]["end"] = _local_iso(end_ts)
+        else:
+            blocks.append({"start": _local_iso(start_ts), "end": _local_iso(end_ts)})
+        previous_slot = slot
+
+    response = {
+        ATTR_AREA: coordinator.price_area,
+        ATTR_ENERGY_KWH: energy_kwh,
+        "expected_spot_cost_sek": round(plan.spot_cost_sek, 4),
+        "expected_cost_sek": round(plan.spot_cost_sek + energy_kwh * surcharge_sek, 4),
+        "average_price_sek": round(plan.spot_cost_sek / energy_kwh, 4),
+        "quarters": quarters,
+        "blocks": blocks,
+        "data_version": data_version,
+    }
+    if estimate is not None and any(
+        slot_starts[slot] >= tomorrow_start_ts for slot in plan.slots
+    ):
+        response[ATTR_ESTIMATE_CONFIDENCE] = estimate.confidence
+    return response
+
+
+async def _async_build_battery_response(
+    hass: HomeAssistant,
+    coordinator: ElprisDataUpdateCoordinator,
+    call_data: dict,
+) -> dict:
+    """Plan battery dispatch over the known price horizon."""
+    settings = BatterySettings(
+        call_data[ATTR_CAPACITY_KWH],
+        call_data[ATTR_CHARGE_POWER_KW],
+        call_data.get(ATTR_DISCHARGE_POWER_KW, call_data[ATTR_CHARGE_POWER_KW]),
+        call_data[ATTR_EFFICIENCY_PCT],
+        call_data[ATTR_MIN_SOC_PCT],
+        call_data[ATTR_MAX_SOC_PCT],
+    )
+    if (error := settings.validation_error()) is not None:
+        raise ServiceValidationError(error)
+    schedule = await async_plan_horizon(
+        hass, coordinator, settings, call_data[ATTR_SOC_PCT]
+    )
+    if schedule is None:
+        raise ServiceValidationError(
+            f"No known prices for {coordinator.price_area} to plan against"
+        )
+
+    quarters = []
+    for index, start_ts in enumerate(schedule.slot_starts):
+        power_kw = schedule.plan.power_kw[index]
+        action = action_for_power(power_kw)
+        if action == BATTERY_ACTION_IDLE:
+            continue
+        quarters.append(
+            {
+                "start": _local_iso(start_ts),
+                "end": _local_iso(start_ts + SLOT_SECONDS),
+                "action": action,
+                "power_kw": round(power_kw, 3),
+                "soc_pct": round(schedule.soc_pct(index), 1),
+                "price_sek": round(schedule.prices[index], 4),
+            }
+        )
+    return {
+        ATTR_AREA: coordinator.price_area,
+        ATTR_SOC_PCT: call_data[ATTR_SOC_PCT],
+        ATTR_EXPECTED_SAVINGS_SEK: round(schedule.plan.savings_sek, 4),
+        "final_soc_pct": round(schedule.soc_pct(len(schedule.slot_starts) - 1), 1),
+        "quarters": quarters,
+        "blocks": schedule.blocks(),
+        "data_version": schedule.data_version,
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+    plan_cache: dict[tuple, dict] = {}
+
+    async def async_handle_plan_load(call: ServiceCall) -> ServiceResponse:
+        """Return the cost-optimal quarters for a flexible load."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_AREA])
+        # Plans only depend on the price data, the surcharge and the request,
+        # so they are reused until the coordinator publishes a new data or
+        # options version. The running slot is part of the key since past
+        # slots are excluded.
+        current_slot_ts = int(dt_util.utcnow().timestamp()) // SLOT_SECONDS
+        cache_key = (
+            coordinator.price_area,
+            coordinator.data_version,
+            coordinator.options_version,
+            coordinator.get_tomorrow_estimate(),
+            current_slot_ts,
+            tuple(sorted((key, str(value)) for key, value in call.data.items())),
+        )
+        if (response := plan_cache.get(cache_key)) is None:
+            response = await _async_build_plan_response(hass, coordinator, call.data)
+            if len(plan_cache) >= PLAN_CACHE_SIZE:
+                plan_cache.clear()
+            plan_cache[cache_key] = response
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        async_handle_plan_load,
+        schema=PLAN_LOAD_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_handle_plan_battery(call: ServiceCall) -> ServiceResponse:
+        """Return a charge/discharge schedule for a home battery."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_AREA])
+        return await _async_build_battery_response(hass, coordinator, call.data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_BATTERY,
+        async_handle_plan_battery,
+        schema=PLAN_BATTERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_handle_profile(call: ServiceCall) -> None:
+        """Start a bounded profiling session, or stop the running one."""
+        profiler = get_profiler(hass)
+        if call.data[ATTR_PROFILE_ACTION] == PROFILE_ACTION_STOP:
+            if not profiler.active:
+                raise ServiceValidationError("No profiling session is running")
+            await profiler.async_stop()
+            return
+        if profiler.active:
+            raise ServiceValidationError(
+                "A profiling session is already running since "
+                f"{profiler.started.isoformat()}; stop it first"
+            )
+        profiler.async_start(call.data[ATTR_DURATION], call.data[ATTR_CPROFILE])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA
+    )
+
+    async def async_handle_export_prices(call: ServiceCall) -> ServiceResponse:
+        """Export cached quarter prices for a date range to a file."""
+        start_date = call.data[ATTR_START_DATE]
+        end_date = call.data[ATTR_END_DATE]
+        if end_date < start_date:
+            raise ServiceValidationError(
+                f"{ATTR_END_DATE} must not be before {ATTR_START_DATE}"
+            )
+        if (end_date - start_date).days >= EXPORT_MAX_DAYS:
+            raise ServiceValidationError(
+                f"At most {EXPORT_MAX_DAYS} days can be exported per call"
+            )
+        coordinators = [
+            _get_coordinator(hass, area)
+            for area in dict.fromkeys(call.data[ATTR_AREAS])
+        ]
+        columns = [
+            column for column in EXPORT_COLUMNS if column in call.data[ATTR_COLUMNS]
+        ]
+        return await async_export_prices(
+            hass,
+            coordinators,
+            start_date,
+            end_date,
+            call.data[ATTR_FORMAT],
+            columns,
+            call.data[ATTR_TARIFF_ORE] / 100.0,
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_PRICES,
+        async_handle_export_prices,
+        schema=EXPORT_PRICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,59 @@
+# Version: 2025-12-19-rev18
+"""Immutable, versioned coordinator data for Elpris Kvart."""
+
+from collections.abc import Iterator, Mapping
+from datetime import date as DateObject
+from types import MappingProxyType
+
+
+def rows_digest(prices: list) -> int:
+    """Return a content hash of one day's parsed price rows, all columns."""
+    return hash(tuple(tuple(sorted(item.items())) for item in prices))
+
+
+class PriceSnapshot(Mapping[DateObject, list]):
+    """Read-only view of the cached price rows at one data version.
+
+    Behaves like the ``{date: rows}`` dict the coordinator used to publish,
+    but is never mutated after creation. Two snapshots compare equal when
+    they have the same version, so the coordinator can hand out the same
+    snapshot again after a refresh that changed nothing and listeners are
+    not called. ``day_versions`` lets consumers cache per-day work.
+    """
+
+    __slots__ = ("_days", "day_versions", "version")
+
+    def __init__(
+        self,
+        version: int,
+        days: Mapping[DateObject, list],
+        day_versions: Mapping[DateObject, int],
+    ):
+        """Freeze copies of the day mapping and the per-day versions."""
+        self.version = version
+        self._days = MappingProxyType(dict(days))
+        self.day_versions = MappingProxyType(dict(day_versions))
+
+    def __getitem__(self, day: DateObject) -> list:
+        """Return the rows of a day."""
+        return self._days[day]
+
+    def __iter__(self) -> Iterator[DateObject]:
+        """Iterate over the days with prices."""
+        return iter(self._days)
+
+    def __len__(self) -> int:
+        """Return the number of days with prices."""
+        return len(self._days)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare snapshots by version."""
+        if isinstance(other, PriceSnapshot):
+            return self.version == other.version
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Return the version and days of the snapshot."""
+        return f"PriceSnapshot(version={self.version}, days={sorted(self._days)})"
@@ -0,0 +1,153 @@
+# Version: 2025-12-19-rev18
+"""Persistent price cache for Elpris Kvart."""
+
+import logging
+import os
+import sys
+from collections import OrderedDict
+from datetime import date as DateObject
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DOMAIN, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def estimate_day_size(prices: list) -> int:
+    """Roughly estimate the memory held by one day of parsed price rows."""
+    size = sys.getsizeof(prices)
+    for item in prices:
+        size += sys.getsizeof(item)
+        for key, value in item.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class PriceCache:
+    """Per-day price cache stored under .storage/elpris_kvart/.
+
+    Each (price area, date) is its own small file, so a day can be loaded
+    or written without touching the rest of the history. Days are also
+    kept in memory in LRU order: pinned days (yesterday to tomorrow and the
+    days of open subscriptions) are never evicted, while cold days are
+    dropped once the memory budget is exceeded and reloaded from disk on
+    the next access.
+    """
+
+    def __init__(self, hass: HomeAssistant, price_area: str):
+        """Initialize the cache for a price area."""
+        self.hass = hass
+        self.price_area = price_area
+        self.memory: OrderedDict[DateObject, list] = OrderedDict()
+        self.memory_budget_bytes = 0
+        self.pinned: set[DateObject] = set()
+        self.days_on_disk: int | None = None
+        self._sizes: dict[DateObject, int] = {}
+
+    @property
+    def memory_usage_bytes(self) -> int:
+        """Return the estimated memory held by cached days."""
+        return sum(self._sizes.values())
+
+    def _store(self, day: DateObject) -> Store:
+        return Store(
+            self.hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}/{self.price_area.lower()}_{day.isoformat()}",
+        )
+
+    def get(self, day: DateObject) -> list | None:
+        """Return a day from memory, marking it as recently used."""
+        prices = self.memory.get(day)
+        if prices is not None:
+            self.memory.move_to_end(day)
+        return prices
+
+    def put(self, day: DateObject, prices: list) -> None:
+        """Keep a day in memory without writing it to disk."""
+        self.memory[day] = prices
+        self.memory.move_to_end(day)
+        self._sizes[day] = estimate_day_size(prices)
+
+    async def async_load_day(self, day: DateObject) -> list | None:
+        """Load cached prices for a date, or None if not cached."""
+        try:
+            data = await self._store(day).async_load()
+        except HomeAssistantError as e:
+            _LOGGER.warning(f"Could not read cached prices for {day}: {e}")
+            return None
+        if not data or not isinstance(data.get("prices"), list):
+            return None
+        return data["prices"]
+
+    async def async_get_day(self, day: DateObject) -> list | None:
+        """Return a day from memory, transparently reloading it from disk."""
+        if (prices := self.get(day)) is not None:
+            return prices
+        prices = await self.async_load_day(day)
+        if prices:
+            self.put(day, prices)
+        return prices
+
+    async def async_peek_day(self, day: DateObject) -> list | None:
+        """Return a day from memory or disk without adding it to memory."""
+        prices = self.memory.get(day)
+        if prices is None:
+            prices = await self.async_load_day(day)
+        return prices
+
+    async def async_save_day(self, day: DateObject, prices: list) -> None:
+        """Persist parsed prices for a date and keep them in memory."""
+        self.put(day, prices)
+        await self._store(day).async_save({"prices": prices})
+
+    def evict(self) -> list[DateObject]:
+        """Drop least recently used unpinned days until within budget."""
+        evicted = []
+        for day in list(self.memory):
+            if self.memory_usage_bytes <= self.memory_budget_bytes:
+                break
+            if day in self.pinned:
+                continue
+            del self.memory[day]
+            del self._sizes[day]
+            evicted.append(day)
+        return evicted
+
+    def _prune_files(self, prefix: str, cutoff: DateObject) -> tuple[list, int]:
+        """Delete day files older than cutoff; runs in the executor."""
+        directory = self.hass.config.path(STORAGE_DIR, DOMAIN)
+        try:
+            filenames = os.listdir(directory)
+        except FileNotFoundError:
+            return [], 0
+        removed, kept = [], 0
+        for filename in filenames:
+            if not filename.startswith(prefix):
+                continue
+            try:
+                day = DateObject.fromisoformat(filename[len(prefix) :])
+            except ValueError:
+                continue
+            if day < cutoff:
+                os.remove(os.path.join(directory, filename))
+                removed.append(day)
+            else:
+                kept += 1
+        return removed, kept
+
+    async def async_prune(self, today: DateObject, retention_days: int) -> None:
+        """Remove days older than the retention window from disk and memory."""
+        cutoff = today - timedelta(days=retention_days)
+        for day in [day for day in self.memory if day < cutoff]:
+            del self.memory[day]
+            del self._sizes[day]
+        removed, self.days_on_disk = await self.hass.async_add_executor_job(
+            self._prune_files, f"{self.price_area.lower()}_", cutoff
+        )
+        if removed:
+            _LOGGER.debug(f"Removed cached prices older than {cutoff}: {removed}")
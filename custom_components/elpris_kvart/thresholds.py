@@ -0,0 +1,170 @@
+# Version: 2025-12-19-rev18
+"""Precomputed price threshold crossing events for Elpris Kvart."""
+
+import logging
+from collections.abc import Callable
+from datetime import datetime as DateTimeObject
+from datetime import timedelta
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator
+from .const import (
+    ATTR_DIRECTION,
+    ATTR_PREVIOUS_PRICE_ORE,
+    ATTR_PRICE_AREA,
+    ATTR_PRICE_ORE,
+    ATTR_THRESHOLD_ORE,
+    DIRECTION_ABOVE,
+    DIRECTION_BELOW,
+    EVENT_THRESHOLD_CROSSED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+CROSSING_HORIZON = timedelta(days=2)
+
+
+class Crossing(NamedTuple):
+    """A threshold crossing at the start of a slot."""
+
+    timestamp: int
+    threshold_ore: float
+    direction: str
+    price_ore: float
+    previous_price_ore: float
+
+
+def find_crossings(
+    slot_starts: list[int],
+    prices_sek: list[float | None],
+    thresholds_ore: list[float],
+) -> list[Crossing]:
+    """Return every crossing of a threshold between consecutive known slots.
+
+    A price crosses upwards when it goes from below a threshold to at or
+    above it, and downwards in the opposite case. Gaps without a price
+    reset the comparison.
+    """
+    crossings = []
+    previous = None
+    for slot_start, price_sek in zip(slot_starts, prices_sek, strict=True):
+        if price_sek is None:
+            previous = None
+            continue
+        price_ore = price_sek * 100.0
+        if previous is not None and price_ore != previous:
+            for threshold in thresholds_ore:
+                if previous < threshold <= price_ore:
+                    direction = DIRECTION_ABOVE
+                elif price_ore < threshold <= previous:
+                    direction = DIRECTION_BELOW
+                else:
+                    continue
+                crossings.append(
+                    Crossing(slot_start, threshold, direction, price_ore, previous)
+                )
+        previous = price_ore
+    return crossings
+
+
+class ThresholdEventScheduler:
+    """Fire elpris_kvart_threshold_crossed at the exact crossing instants.
+
+    Crossings are recomputed once per data refresh. Only the next instant
+    has a timer; when it fires, the events for that instant are sent and
+    the timer moves on to the following crossing.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: ElprisDataUpdateCoordinator,
+        thresholds_ore: list[float],
+    ):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.thresholds_ore = sorted(thresholds_ore)
+        self.crossings: list[Crossing] = []
+        self._next_index = 0
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._data_version: int | None = None
+
+    @callback
+    def async_start(self) -> Callable:
+        """Start following coordinator updates; returns a stop callback."""
+        unsub_coordinator = self.coordinator.async_add_listener(
+            self._async_handle_coordinator_update
+        )
+        self._async_handle_coordinator_update()
+
+        @callback
+        def stop() -> None:
+            unsub_coordinator()
+            self._cancel_timer()
+
+        return stop
+
+    def _cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_handle_coordinator_update(self) -> None:
+        if self.coordinator.data_version == self._data_version:
+            return
+        self._data_version = self.coordinator.data_version
+        now = dt_util.utcnow()
+        slot_starts, prices = self.coordinator.get_horizon(now, now + CROSSING_HORIZON)
+        self.crossings = find_crossings(slot_starts, prices, self.thresholds_ore)
+        now_ts = now.timestamp()
+        self._next_index = next(
+            (
+                index
+                for index, crossing in enumerate(self.crossings)
+                if crossing.timestamp > now_ts
+            ),
+            len(self.crossings),
+        )
+        _LOGGER.debug(
+            f"{len(self.crossings) - self._next_index} upcoming threshold "
+            f"crossings for {self.coordinator.price_area}"
+        )
+        self._schedule_next()
+
+    def _schedule_next(self) -> None:
+        self._cancel_timer()
+        if self._next_index >= len(self.crossings):
+            return
+        self._unsub_timer = async_track_point_in_utc_time(
+            self.hass,
+            self._async_fire_due,
+            dt_util.utc_from_timestamp(self.crossings[self._next_index].timestamp),
+        )
+
+    @callback
+    def _async_fire_due(self, now: DateTimeObject) -> None:
+        self._unsub_timer = None
+        now_ts = now.timestamp()
+        while (
+            self._next_index < len(self.crossings)
+            and self.crossings[self._next_index].timestamp <= now_ts
+        ):
+            crossing = self.crossings[self._next_index]
+            self._next_index += 1
+            self.hass.bus.async_fire(
+                EVENT_THRESHOLD_CROSSED,
+                {
+                    ATTR_PRICE_AREA: self.coordinator.price_area,
+                    ATTR_THRESHOLD_ORE: crossing.threshold_ore,
+                    ATTR_DIRECTION: crossing.direction,
+                    ATTR_PRICE_ORE: round(crossing.price_ore, 2),
+                    ATTR_PREVIOUS_PRICE_ORE: round(crossing.previous_price_ore, 2),
+                },
+            )
+        self._schedule_next()
@@ -0,0 +1,66 @@
+# Version: 2025-12-19-rev18
+"""Per-day quarter-hour slot timeline for Elpris Kvart."""
+
+from datetime import date as DateObject
+from datetime import datetime as DateTimeObject
+from datetime import time as TimeObject
+from datetime import timedelta, tzinfo
+
+from homeassistant.util import dt as dt_util
+
+SLOT_SECONDS = 900
+
+
+class SlotTimeline:
+    """Quarter-hour slots of one local day, precomputed from UTC epochs.
+
+    Slot ``i`` starts at ``start_ts + i * SLOT_SECONDS``. A normal day has 96
+    slots, the spring DST day 92 and the autumn DST day 100, so all lookups
+    are integer arithmetic on epochs instead of wall-clock datetime math.
+    """
+
+    __slots__ = ("date", "end_ts", "labels", "slot_count", "start_ts", "time_zone")
+
+    def __init__(self, day: DateObject, time_zone: tzinfo):
+        """Build the timeline for a local date in the given time zone."""
+        self.date = day
+        self.time_zone = time_zone
+        start = DateTimeObject.combine(day, TimeObject.min, tzinfo=time_zone)
+        end = DateTimeObject.combine(
+            day + timedelta(days=1), TimeObject.min, tzinfo=time_zone
+        )
+        self.start_ts = int(start.timestamp())
+        self.end_ts = int(end.timestamp())
+        self.slot_count = (self.end_ts - self.start_ts) // SLOT_SECONDS
+        self.labels = [
+            dt_util.utc_from_timestamp(self.slot_start_ts(slot))
+            .astimezone(time_zone)
+            .strftime("%H:%M")
+            for slot in range(self.slot_count)
+        ]
+
+    def __len__(self) -> int:
+        """Return the number of slots in the day."""
+        return self.slot_count
+
+    def contains(self, timestamp: float) -> bool:
+        """Return True if the UTC timestamp falls within this day."""
+        return self.start_ts <= timestamp < self.end_ts
+
+    def slot_at(self, timestamp: float) -> int | None:
+        """Return the slot index for a UTC timestamp, or None if outside."""
+        if not self.start_ts <= timestamp < self.end_ts:
+            return None
+        return int(timestamp - self.start_ts) // SLOT_SECONDS
+
+    def slot_start_ts(self, slot: int) -> int:
+        """Return the UTC epoch second at which a slot starts."""
+        return self.start_ts + slot * SLOT_SECONDS
+
+    def slot_start(self, slot: int) -> DateTimeObject:
+        """Return the start of a slot as a UTC datetime."""
+        return dt_util.utc_from_timestamp(self.slot_start_ts(slot))
+
+    def label(self, slot: int) -> str:
+        """Return the local wall-clock label (HH:MM) of a slot."""
+        return self.labels[slot]
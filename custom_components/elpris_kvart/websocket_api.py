@@ -0,0 +1,176 @@
+# Version: 2025-12-19-rev18
+"""Websocket API for Elpris Kvart price series."""
+
+import logging
+from datetime import date as DateObject
+from datetime import timedelta
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from . import ElprisDataUpdateCoordinator, get_coordinator_for_area
+from .const import DOMAIN, PRICE_AREAS
+
+_LOGGER = logging.getLogger(__name__)
+
+UNIT_SEK = "sek"
+UNIT_ORE = "ore"
+RESOLUTION_QUARTER = "quarter"
+RESOLUTION_HOUR = "hour"
+
+MAX_RANGE_DAYS = 31
+
+PRICES_SCHEMA = {
+    vol.Required("area"): vol.In(PRICE_AREAS),
+    vol.Optional("start_date"): cv.date,
+    vol.Optional("end_date"): cv.date,
+    vol.Optional("unit", default=UNIT_SEK): vol.In([UNIT_SEK, UNIT_ORE]),
+    vol.Optional("resolution", default=RESOLUTION_QUARTER): vol.In(
+        [RESOLUTION_QUARTER, RESOLUTION_HOUR]
+    ),
+}
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_get_prices)
+    websocket_api.async_register_command(hass, websocket_subscribe_prices)
+
+
+def _date_range(msg: dict[str, Any]) -> list[DateObject]:
+    start_date = msg.get("start_date") or dt_util.now().date()
+    end_date = msg.get("end_date") or start_date + timedelta(days=1)
+    days = (end_date - start_date).days + 1
+    return [start_date + timedelta(days=offset) for offset in range(max(days, 0))]
+
+
+def build_price_series(
+    coordinator: ElprisDataUpdateCoordinator, msg: dict[str, Any]
+) -> dict[str, Any]:
+    """Build a compact columnar price series from the coordinator's cache."""
+    factor, decimals, unit = (
+        (100.0, 2, "öre/kWh") if msg["unit"] == UNIT_ORE else (1.0, 4, "SEK/kWh")
+    )
+    series: dict[str, Any] = {
+        "area": coordinator.price_area,
+        "unit": unit,
+        "resolution": msg["resolution"],
+        "start": [],
+        "value": [],
+    }
+    if msg["resolution"] == RESOLUTION_HOUR:
+        series["min"] = []
+        series["max"] = []
+
+    for day in _date_range(msg):
+        if msg["resolution"] == RESOLUTION_HOUR:
+            for hour in coordinator.hourly_prices.get(day, []):
+                series["start"].append(
+                    int(dt_util.parse_datetime(hour["time_start"]).timestamp())
+                )
+                series["value"].append(round(hour["mean"] * factor, decimals))
+                series["min"].append(round(hour["min"] * factor, decimals))
+                series["max"].append(round(hour["max"] * factor, decimals))
+            continue
+        slots = coordinator.slot_prices.get(day)
+        if not slots:
+            continue
+        timeline = coordinator.get_timeline(day)
+        for slot, price in enumerate(slots):
+            if price is None:
+                continue
+            series["start"].append(timeline.slot_start_ts(slot))
+            series["value"].append(round(price * factor, decimals))
+    return series
+
+
+def _validate_range(connection, msg: dict[str, Any]) -> bool:
+    days = _date_range(msg)
+    if not days or len(days) > MAX_RANGE_DAYS:
+        connection.send_error(
+            msg["id"],
+            websocket_api.const.ERR_INVALID_FORMAT,
+            f"Date range must cover 1-{MAX_RANGE_DAYS} days",
+        )
+        return False
+    return True
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): "elpris_kvart/prices", **PRICES_SCHEMA}
+)
+@websocket_api.async_response
+async def websocket_get_prices(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return a price series for an area and date range."""
+    if not _validate_range(connection, msg):
+        return
+    coordinator = get_coordinator_for_area(hass, msg["area"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.const.ERR_NOT_FOUND,
+            f"No {DOMAIN} entry configured for {msg['area']}",
+        )
+        return
+    await coordinator.async_ensure_days(_date_range(msg))
+    connection.send_result(msg["id"], build_price_series(coordinator, msg))
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): "elpris_kvart/subscribe_prices", **PRICES_SCHEMA}
+)
+@websocket_api.async_response
+async def websocket_subscribe_prices(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to a price series, pushed again only when it changes.
+
+    The subscribed days are pinned in memory while the subscription is
+    open, so later pushes are never built from a cache that evicted them.
+    """
+    if not _validate_range(connection, msg):
+        return
+    coordinator = get_coordinator_for_area(hass, msg["area"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.const.ERR_NOT_FOUND,
+            f"No {DOMAIN} entry configured for {msg['area']}",
+        )
+        return
+
+    days = _date_range(msg)
+    unpin_days = coordinator.async_pin_days(days)
+    await coordinator.async_ensure_days(days)
+    last_sent: dict[str, Any] = build_price_series(coordinator, msg)
+
+    @callback
+    def forward_price_update() -> None:
+        nonlocal last_sent
+        series = build_price_series(coordinator, msg)
+        if series == last_sent:
+            return
+        last_sent = series
+        connection.send_message(websocket_api.event_message(msg["id"], series))
+
+    remove_listener = coordinator.async_add_listener(forward_price_update)
+
+    @callback
+    def unsubscribe() -> None:
+        remove_listener()
+        unpin_days()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], last_sent))
@@ -0,0 +1,258 @@
+"""Simulering av Elpris Kvart på en virtuell klocka.
+
+Kör den riktiga koordinatorn och sensorerna mot syntetiska eller inspelade
+API-svar och hoppar klockan direkt till nästa schemalagda timer, nästa
+prisändring eller nästa publicering. Ett helt år tar därför några minuter
+i stället för ett år.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.elpris_kvart.const import CONF_PRICE_AREA, DOMAIN
+from custom_components.elpris_kvart.normalize import normalize_day
+from custom_components.elpris_kvart.timeline import SLOT_SECONDS, SlotTimeline
+
+TIMER_MODULES = ("homeassistant.core", "homeassistant.helpers.event")
+SPOT_ENTITY_ID = "sensor.elpris_kvart_{area}_spotpris_i_ore_kwh"
+
+
+@dataclass
+class SimulationReport:
+    """Räknare för en simuleringskörning."""
+
+    days: float = 0.0
+    fetches: int = 0
+    failed_fetches: int = 0
+    refreshes: int = 0
+    wakeups: int = 0
+    state_writes: int = 0
+    stale_minutes: float = 0.0
+    tomorrow_lag_minutes: float = 0.0
+    steps: int = 0
+    cpu_seconds: float = 0.0
+    fetched_dates: list[date] = field(default_factory=list)
+
+    def per_day(self) -> dict[str, float]:
+        """Returnera räknarna per simulerat dygn."""
+        return {
+            name: round(getattr(self, name) / self.days, 2)
+            for name in (
+                "fetches",
+                "refreshes",
+                "wakeups",
+                "state_writes",
+                "stale_minutes",
+                "tomorrow_lag_minutes",
+            )
+        }
+
+
+def synthetic_price(day: date, slot: int) -> float:
+    """Deterministiskt pris i SEK/kWh, konstant per timme."""
+    return round(0.1 + ((day.toordinal() * 24 + slot // 4) * 37 % 100) / 50, 3)
+
+
+class PriceSimulation:
+    """Spela upp prispubliceringar genom koordinatorn på en virtuell klocka.
+
+    Morgondagens priser publiceras kl. ``publish_hour`` lokal tid, plus en
+    eventuell försening per dygn i ``publication_delays``. Under avbrott i
+    ``outages`` svarar API:et som vid ett fel (None). Inspelade API-svar i
+    ``recorded`` används för sina dygn, övriga dygn får syntetiska priser.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        freezer,
+        mock_api,
+        area: str = "SE3",
+        publish_hour: int = 13,
+        publication_delays: dict[date, timedelta] | None = None,
+        outages: list[tuple[datetime, datetime]] | None = None,
+        recorded: dict[date, list[dict]] | None = None,
+    ):
+        self.hass = hass
+        self.freezer = freezer
+        self.area = area
+        self.publish_hour = publish_hour
+        self.publication_delays = publication_delays or {}
+        self.outages = outages or []
+        self.recorded = recorded or {}
+        self._truth: dict[date, tuple[SlotTimeline, list[float | None]]] = {}
+        self.report = SimulationReport()
+        self._first_day: date | None = None
+        mock_api.side_effect = self._async_get_prices
+
+    def published_at(self, day: date) -> datetime:
+        """Returnera när priserna för ett dygn publiceras."""
+        published = datetime.combine(
+            day - timedelta(days=1),
+            datetime.min.time().replace(hour=self.publish_hour),
+            tzinfo=dt_util.get_default_time_zone(),
+        )
+        return published + self.publication_delays.get(day, timedelta())
+
+    def payload(self, day: date) -> list[dict]:
+        """Bygg API-svaret för ett dygn, en rad per kvart."""
+        if day in self.recorded:
+            return self.recorded[day]
+        timeline = SlotTimeline(day, dt_util.get_default_time_zone())
+        return [
+            {
+                "SEK_per_kWh": synthetic_price(day, slot),
+                "time_start": dt_util.as_local(timeline.slot_start(slot)).isoformat(),
+                "time_end": dt_util.as_local(
+                    timeline.slot_start(slot) + timedelta(minutes=15)
+                ).isoformat(),
+            }
+            for slot in range(len(timeline))
+        ]
+
+    def price_at(self, moment: datetime) -> float | None:
+        """Returnera det verkliga priset vid en tidpunkt."""
+        day = dt_util.as_local(moment).date()
+        if day not in self._truth:
+            timeline = SlotTimeline(day, dt_util.get_default_time_zone())
+            self._truth[day] = (timeline, normalize_day(self.payload(day), timeline)[0])
+        timeline, slots = self._truth[day]
+        return slots[timeline.slot_at(moment.timestamp())]
+
+    async def _async_get_prices(self, target_date: date) -> list | None:
+        now = dt_util.utcnow()
+        self.report.fetches += 1
+        published = target_date <= self._first_day or now >= self.published_at(
+            target_date
+        )
+        if not published or any(start <= now < end for start, end in self.outages):
+            self.report.failed_fetches += 1
+            return None
+        self.report.fetched_dates.append(target_date)
+        return self.payload(target_date)
+
+    def _next_timer(self, now: datetime) -> datetime | None:
+        """Returnera den virtuella tidpunkten för nästa schemalagda timer.
+
+        Bara tidshändelser och koordinatorintervall räknas; andra timers
+        (t.ex. fördröjda lagringar) körs ändå vid nästa steg.
+        """
+        loop_now = self.hass.loop.time()
+        delays = [
+            handle.when() - loop_now
+            for handle in self.hass.loop._scheduled
+            if isinstance(handle, asyncio.TimerHandle)
+            and not handle.cancelled()
+            and getattr(handle._callback, "__module__", "").startswith(TIMER_MODULES)
+        ]
+        if not delays:
+            return None
+        return now + timedelta(seconds=max(min(delays), 0))
+
+    def _next_price_change(self, now: datetime) -> datetime:
+        """Returnera nästa kvartsgräns där det verkliga priset ändras."""
+        current = self.price_at(now)
+        boundary = datetime.fromtimestamp(
+            (int(now.timestamp()) // SLOT_SECONDS + 1) * SLOT_SECONDS, dt_util.UTC
+        )
+        for _ in range(2 * 100):
+            if self.price_at(boundary) != current:
+                break
+            boundary += timedelta(seconds=SLOT_SECONDS)
+        return boundary
+
+    def _next_publication(self, now: datetime) -> datetime:
+        day = dt_util.as_local(now).date() + timedelta(days=1)
+        while (published := self.published_at(day)) <= now:
+            day += timedelta(days=1)
+        return dt_util.as_utc(published)
+
+    def _account(self, coordinator, now: datetime, until: datetime) -> None:
+        """Räkna inaktuella minuter för intervallet [now, until)."""
+        minutes = (until - now).total_seconds() / 60
+        state = self.hass.states.get(SPOT_ENTITY_ID.format(area=self.area.lower()))
+        price = self.price_at(now)
+        try:
+            stale = state is None or float(state.state) != round(price * 100, 2)
+        except (TypeError, ValueError):
+            stale = price is not None
+        if stale:
+            self.report.stale_minutes += minutes
+        tomorrow = dt_util.as_local(now).date() + timedelta(days=1)
+        if now >= self.published_at(tomorrow) and not coordinator.slot_prices.get(
+            tomorrow
+        ):
+            self.report.tomorrow_lag_minutes += minutes
+
+    async def run(self, start: datetime, end: datetime) -> SimulationReport:
+        """Kör simuleringen från start till end och returnera räknarna."""
+        wall_start = time.process_time()
+        self._first_day = dt_util.as_local(start).date()
+        self.freezer.move_to(start)
+        report = self.report
+        original_write = Entity.async_write_ha_state
+
+        def counting_write(entity: Entity) -> None:
+            if entity.platform and entity.platform.platform_name == DOMAIN:
+                report.state_writes += 1
+            original_write(entity)
+
+        with patch.object(Entity, "async_write_ha_state", counting_write):
+            config_entry = MockConfigEntry(
+                domain=DOMAIN, data={CONF_PRICE_AREA: self.area}
+            )
+            config_entry.add_to_hass(self.hass)
+            assert await self.hass.config_entries.async_setup(config_entry.entry_id)
+            await self.hass.async_block_till_done(wait_background_tasks=True)
+            coordinator = self.hass.data[DOMAIN][config_entry.entry_id]
+
+            def count_refresh() -> None:
+                report.refreshes += 1
+
+            def count_wakeup() -> None:
+                report.wakeups += 1
+
+            unsub_refresh = coordinator.async_add_listener(count_refresh)
+            unsub_wakeup = coordinator.async_add_entity_listener(count_wakeup)
+
+            now = start
+            while now < end:
+                candidates = [
+                    self._next_price_change(now),
+                    self._next_publication(now),
+                    end,
+                ]
+                candidates.extend(
+                    outage_edge
+                    for outage in self.outages
+                    for outage_edge in outage
+                    if outage_edge > now
+                )
+                if (timer := self._next_timer(now)) is not None:
+                    candidates.append(timer)
+                target = max(min(candidates), now + timedelta(seconds=1))
+                self._account(coordinator, now, target)
+                now = target
+                self.freezer.move_to(now)
+                async_fire_time_changed(self.hass, now)
+                await self.hass.async_block_till_done()
+                report.steps += 1
+
+            unsub_refresh()
+            unsub_wakeup()
+            await self.hass.config_entries.async_unload(config_entry.entry_id)
+
+        report.days = (end - start).total_seconds() / 86400
+        report.cpu_seconds = time.process_time() - wall_start
+        return report
@@ -0,0 +1,142 @@
+"""Tester för Elpris Kvart prisavvikelser."""
+
+from datetime import date, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.elpris_kvart.anomalies import (
+    SlotOfDayBaseline,
+    find_anomalies,
+)
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    DOMAIN,
+    EVENT_PRICE_ANOMALY,
+    STORAGE_VERSION,
+)
+
+from .test_estimate import _day_rows
+from .test_sensor import MOCK_PRICES_UTC
+
+ANOMALY_ENTITY = "binary_sensor.elpris_kvart_se3_prisavvikelse"
+
+
+# Testfall 1: Baslinje per kvart och klassificering
+# Förklaring: Baslinjen för 00:00 byggs av fem dygn och uppdateras när ett
+# dygn lämnar fönstret. 1.5 SEK ligger långt över baslinjen (avvikelse),
+# -0.1 SEK är negativt och 1.2 SEK är minst dubbla grannarnas medel och
+# minst 0.5 SEK högre (spik). 0.2 SEK saknar baslinje och är normalt.
+def test_baseline_and_find_anomalies() -> None:
+    """Testa SlotOfDayBaseline och find_anomalies."""
+    baseline = SlotOfDayBaseline(days=5)
+    start = date(2023, 10, 20)
+    prices = [1.0, 1.1, 0.9, 1.0, 1.0]
+    baseline.apply(
+        start,
+        start + timedelta(days=4),
+        {
+            start + timedelta(days=offset): (offset, {"00:00": price})
+            for offset, price in enumerate(prices)
+        },
+    )
+    days, mean, stddev = baseline.stats("00:00")
+    assert days == 5
+    assert mean == pytest.approx(1.0)
+    assert stddev == pytest.approx(0.0632456, abs=1e-6)
+
+    anomalies = find_anomalies(
+        [0, 900, 1800, 2700],
+        ["00:00", "00:15", "00:30", "00:45"],
+        [1.5, -0.1, 0.2, 1.2],
+        baseline,
+        3.0,
+    )
+    assert [(a.timestamp, a.kind) for a in anomalies] == [
+        (0, "deviation"),
+        (900, "negative"),
+        (2700, "spike"),
+    ]
+    assert anomalies[0].z_score == pytest.approx(0.5 / 0.0632456, rel=1e-5)
+    # Med sigma 0 räknas inga avvikelser mot baslinjen.
+    assert [a.kind for a in find_anomalies([0], ["00:00"], [1.5], baseline, 0.0)] == []
+
+    # Fönstret flyttas en dag: det första dygnet (1.0) dras bort.
+    baseline.apply(start + timedelta(days=1), start + timedelta(days=5), {})
+    days, mean, _ = baseline.stats("00:00")
+    assert days == 4
+    assert mean == pytest.approx(1.0)
+    assert baseline.days == 4
+
+
+# Testfall 2: Händelser och binär sensor vid exakt kvart
+# Förklaring: Sex cachade dygn med 0.4 och 0.6 SEK ger baslinjen 0.5 ± 0.1.
+# Dagens kvartar 12:00-12:45 (2.00) och 13:00 (0.10) avviker mer än 3σ.
+# Avvikelserna beräknas en gång efter hämtningen; händelsen skickas och
+# sensorn slås på när kvarten börjar och av när den sista kvarten slutar.
+async def test_anomaly_events_and_binary_sensor(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa elpris_kvart_price_anomaly och binärsensorn."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 11:50:00+00:00")
+    today = date(2023, 10, 25)
+
+    async def get_prices(target_date: date) -> list | None:
+        return MOCK_PRICES_UTC if target_date == today else None
+
+    mock_elpris_api.side_effect = get_prices
+    for offset in range(1, 7):
+        day = today - timedelta(days=offset)
+        key = f"{DOMAIN}/se3_{day.isoformat()}"
+        hass_storage[key] = {
+            "version": STORAGE_VERSION,
+            "minor_version": 1,
+            "key": key,
+            "data": {"prices": _day_rows(day, 0.4 if offset % 2 else 0.6)},
+        }
+    events = async_capture_events(hass, EVENT_PRICE_ANOMALY)
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get(ANOMALY_ENTITY)
+    assert state.state == "off"
+    assert state.attributes["baseline_days"] == 6
+    upcoming = state.attributes["upcoming"]
+    assert [(a["start"][11:16], a["kind"]) for a in upcoming] == [
+        ("12:00", "deviation"),
+        ("12:15", "deviation"),
+        ("12:30", "deviation"),
+        ("12:45", "deviation"),
+        ("13:00", "deviation"),
+    ]
+    assert upcoming[0]["baseline_mean_sek"] == 0.5
+    assert upcoming[0]["z_score"] == 15.0
+    assert events == []
+
+    freezer.move_to("2023-10-25 12:00:00+00:00")
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    state = hass.states.get(ANOMALY_ENTITY)
+    assert state.state == "on"
+    assert state.attributes["kind"] == "deviation"
+    assert state.attributes["price_sek"] == 2.0
+    assert [event.data["start"] for event in events] == ["2023-10-25T12:00:00+00:00"]
+    assert events[0].data["price_area"] == "SE3"
+
+    for moment in ("12:15", "12:30", "12:45", "13:00", "13:15"):
+        freezer.move_to(f"2023-10-25 {moment}:00+00:00")
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+    assert len(events) == 5
+    assert events[-1].data["z_score"] == -4.0
+    assert hass.states.get(ANOMALY_ENTITY).state == "off"
@@ -0,0 +1,80 @@
+"""Tester för Elpris Kvart jämförelser mellan elområden."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.elpris_kvart.areas import get_area_store
+from custom_components.elpris_kvart.const import (
+    ATTR_AREA_PRICES_SEK,
+    ATTR_SPREAD_TODAY,
+    CONF_COMPARE_AREAS,
+    CONF_PRICE_AREA,
+    DOMAIN,
+)
+
+from .test_sensor import MOCK_PRICES_UTC
+
+SPREAD_ENTITY_ID = "sensor.elpris_kvart_se4_prisskillnad_mot_se3"
+CHEAPEST_ENTITY_ID = "sensor.elpris_kvart_se4_billigaste_elomrade_nu"
+
+
+# Testfall 1: Prisskillnad och billigaste elområde
+# Förklaring: SE3 och SE4 läggs upp som två poster. SE4 jämförs med SE3 via
+# det gemensamma prislagret, som läser båda koordinatorernas kvartspriser
+# utan att kopiera dem. Vid ett kvartsskifte uppdateras sensorerna en gång
+# även om båda koordinatorerna vaknar.
+async def test_area_spread_and_cheapest_area(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa sensorerna Prisskillnad mot SE3 och Billigaste elområde nu."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    se3_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    se3_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(se3_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    mock_elpris_api.return_value = [
+        {**item, "SEK_per_kWh": item["SEK_per_kWh"] * 1.5} for item in MOCK_PRICES_UTC
+    ]
+    se4_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE4"},
+        options={CONF_COMPARE_AREAS: ["SE3"]},
+    )
+    se4_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(se4_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    store = get_area_store(hass)
+    assert set(store.coordinators) == {"SE3", "SE4"}
+    assert store.current_prices == {"SE3": 2.0, "SE4": 3.0}
+
+    spread = hass.states.get(SPREAD_ENTITY_ID)
+    assert float(spread.state) == pytest.approx(1.0)
+    assert len(spread.attributes[ATTR_SPREAD_TODAY]) == 6
+    assert spread.attributes[ATTR_SPREAD_TODAY][0]["SEK_per_kWh"] == 0.25
+    cheapest = hass.states.get(CHEAPEST_ENTITY_ID)
+    assert cheapest.state == "SE3"
+    assert cheapest.attributes[ATTR_AREA_PRICES_SEK] == {"SE3": 2.0, "SE4": 3.0}
+
+    events = async_capture_events(hass, "state_changed")
+    freezer.move_to("2023-10-25 13:00:01+00:00")
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert float(hass.states.get(SPREAD_ENTITY_ID).state) == pytest.approx(0.05)
+    assert [event.data["entity_id"] for event in events].count(SPREAD_ENTITY_ID) == 1
+
+    # Utan SE3 saknas jämförelsen.
+    await hass.config_entries.async_unload(se3_entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(SPREAD_ENTITY_ID).state == "unknown"
+    assert hass.states.get(CHEAPEST_ENTITY_ID).state == "SE4"
@@ -0,0 +1,126 @@
+"""Tester för Elpris Kvart batteriplanering."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.battery import BatterySettings
+from custom_components.elpris_kvart.const import (
+    CONF_BATTERY_CAPACITY_KWH,
+    CONF_BATTERY_CHARGE_KW,
+    CONF_BATTERY_EFFICIENCY_PCT,
+    CONF_BATTERY_MIN_SOC_PCT,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_PRICE_AREA,
+    DOMAIN,
+    SERVICE_PLAN_BATTERY,
+)
+from custom_components.elpris_kvart.optimizer import plan_battery
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+# Testfall 1: Laddning vid lågt pris och urladdning vid högt pris
+# Förklaring: Med full verkningsgrad laddas batteriet i de billiga kvartarna
+# och laddas ur i de dyra, inom gränserna för laddningsnivå och effekt.
+def test_plan_battery_arbitrage() -> None:
+    """Testa den dynamiska programmeringen för batteriet."""
+    prices = [1.0, 0.1, 0.1, 3.0, 3.0, None]
+    plan = plan_battery(prices, 2.0, 4.0, 4.0, 1.0, 0.0, 0.0, 2.0, soc_steps=4)
+    assert plan.power_kw == (0.0, 4.0, 4.0, -4.0, -4.0, 0.0)
+    assert plan.soc_kwh == (0.0, 1.0, 2.0, 1.0, 0.0, 0.0)
+    assert plan.savings_sek == pytest.approx(5.8)
+
+    # Förluster gör att små prisskillnader inte lönar sig.
+    plan = plan_battery([1.0, 1.05], 2.0, 4.0, 4.0, 0.8, 0.0, 0.0, 2.0)
+    assert plan.power_kw == (0.0, 0.0)
+
+
+# Testfall 2: Sensor och tjänst för batteriplan
+# Förklaring: Sensorn visar planerad åtgärd för aktuell kvart och planerar om
+# när laddningsnivån ändras. Tjänsten returnerar samma sorts schema.
+async def test_battery_plan_sensor_and_service(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa sensorn Batteriplan och tjänsten plan_battery."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:50:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    hass.states.async_set("sensor.batteri", "100")
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3"},
+        options={
+            CONF_BATTERY_CAPACITY_KWH: 2.0,
+            CONF_BATTERY_CHARGE_KW: 4.0,
+            CONF_BATTERY_EFFICIENCY_PCT: 100.0,
+            CONF_BATTERY_MIN_SOC_PCT: 0.0,
+            CONF_BATTERY_SOC_SENSOR: "sensor.batteri",
+        },
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.elpris_kvart_se3_batteriplan")
+    assert state.state == "discharge"
+    assert state.attributes["planned_power_kw"] == -4.0
+    assert state.attributes["schedule"][0]["end"] == "2023-10-25T13:00:00+00:00"
+
+    hass.states.async_set("sensor.batteri", "0")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    state = hass.states.get("sensor.elpris_kvart_se3_batteriplan")
+    assert state.state == "idle"
+    assert state.attributes["schedule"][0]["action"] == "charge"
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_BATTERY,
+        {
+            "area": "SE3",
+            "capacity_kwh": 2.0,
+            "charge_power_kw": 4.0,
+            "efficiency_pct": 100,
+            "soc_pct": 0,
+            "min_soc_pct": 0,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["quarters"] == [
+        {
+            "start": "2023-10-25T13:00:00+00:00",
+            "end": "2023-10-25T13:15:00+00:00",
+            "action": "charge",
+            "power_kw": 4.0,
+            "soc_pct": 50.0,
+            "price_sek": 0.1,
+        }
+    ]
+
+
+# Testfall 3: Felmeddelandet pekar ut fältet som är fel
+# Förklaring: Varje ogiltig gräns ger ett meddelande som nämner just det
+# fältet, inte bara att min ska vara lägre än max.
+def test_battery_settings_validation_error() -> None:
+    """Testa BatterySettings.validation_error."""
+    valid = BatterySettings(10.0, 3.0, 3.0)
+    assert valid.validation_error() is None
+    assert valid.validated() is valid
+    cases = {
+        "capacity_kwh": BatterySettings(0.0, 3.0, 3.0),
+        "efficiency_pct": BatterySettings(10.0, 3.0, 3.0, efficiency_pct=0.0),
+        "min_soc_pct must be between": BatterySettings(
+            10.0, 3.0, 3.0, min_soc_pct=-5.0
+        ),
+        "max_soc_pct must be between": BatterySettings(
+            10.0, 3.0, 3.0, max_soc_pct=120.0
+        ),
+        "min_soc_pct must be lower than max_soc_pct": BatterySettings(
+            10.0, 3.0, 3.0, min_soc_pct=90.0, max_soc_pct=20.0
+        ),
+    }
+    for expected, settings in cases.items():
+        assert expected in settings.validation_error()
+        assert settings.validated() is None
@@ -7,7 +7,30 @@ from homeassistant import config_entries, data_entry_flow
 from homeassistant.core import HomeAssistant
 
 from custom_components.elpris_kvart.const import (
+    CONF_ANOMALY_SIGMA,
+    CONF_API_BASE_URL,
+    CONF_API_TOKEN,
+    CONF_BATTERY_CAPACITY_KWH,
+    CONF_BATTERY_CHARGE_KW,
+    CONF_BATTERY_DISCHARGE_KW,
+    CONF_BATTERY_EFFICIENCY_PCT,
+    CONF_BATTERY_MAX_SOC_PCT,
+    CONF_BATTERY_MIN_SOC_PCT,
+    CONF_BATTERY_SOC_SENSOR,
+    CONF_COMPARE_AREAS,
+    CONF_ENERGY_SENSOR,
+    CONF_HUB_ENABLED,
+    CONF_LEVEL_CHEAP_PCT,
+    CONF_LEVEL_EXPENSIVE_PCT,
+    CONF_LEVEL_VERY_CHEAP_PCT,
+    CONF_LEVEL_VERY_EXPENSIVE_PCT,
+    CONF_MEMORY_BUDGET_KB,
+    CONF_PEAK_COUNT,
+    CONF_PEAK_FEE_SEK_PER_KW,
+    CONF_PEAK_HIGH_LOAD_ONLY,
     CONF_PRICE_AREA,
+    CONF_PRICE_THRESHOLDS_ORE,
+    CONF_RETENTION_DAYS,
     CONF_SURCHARGE_ORE,
     DOMAIN,
 )
@@ -79,3 +102,115 @@ async def test_invalid_surcharge(hass: HomeAssistant) -> None:
     except data_entry_flow.InvalidData as err:
         # Kontrollera att felet ligger på rätt fält
         assert "surcharge_ore" in str(err.schema_errors)
+
+
+# Testfall 3: Alternativflödet sparar varje funktionsgrupp via menyn
+# Förklaring: Användaren väljer en grupp i menyn och fyller i dess steg, en
+# grupp per flöde. Varje steg ska bara ändra sina egna nycklar och behålla
+# resten. Felaktiga värden (nivåer i fel ordning, min/max-laddnivå, API-adress)
+# ska avvisas av rätt steg.
+async def test_options_flow(hass: HomeAssistant) -> None:
+    """Testa alternativflödet."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_PRICE_AREA: "SE3", CONF_SURCHARGE_ORE: 0.0}
+    )
+    config_entry.add_to_hass(hass)
+
+    steps = {
+        "prices": {CONF_SURCHARGE_ORE: 5.0, CONF_PRICE_THRESHOLDS_ORE: ["100", "50,5"]},
+        "levels": {
+            CONF_LEVEL_VERY_CHEAP_PCT: 20.0,
+            CONF_LEVEL_CHEAP_PCT: 40.0,
+            CONF_LEVEL_EXPENSIVE_PCT: 60.0,
+            CONF_LEVEL_VERY_EXPENSIVE_PCT: 80.0,
+        },
+        "cost": {CONF_ENERGY_SENSOR: "sensor.energi"},
+        "peaks": {
+            CONF_PEAK_COUNT: 3,
+            CONF_PEAK_FEE_SEK_PER_KW: 81.25,
+            CONF_PEAK_HIGH_LOAD_ONLY: True,
+        },
+        "battery": {
+            CONF_BATTERY_CAPACITY_KWH: 10.0,
+            CONF_BATTERY_CHARGE_KW: 5.0,
+            CONF_BATTERY_DISCHARGE_KW: 4.0,
+            CONF_BATTERY_EFFICIENCY_PCT: 90.0,
+            CONF_BATTERY_MIN_SOC_PCT: 10.0,
+            CONF_BATTERY_MAX_SOC_PCT: 95.0,
+            CONF_BATTERY_SOC_SENSOR: "sensor.batteri",
+        },
+        "areas": {CONF_COMPARE_AREAS: ["SE4"]},
+        "anomalies": {CONF_ANOMALY_SIGMA: 2.5},
+        "storage": {CONF_RETENTION_DAYS: 60, CONF_MEMORY_BUDGET_KB: 256.0},
+        "hub": {
+            CONF_API_BASE_URL: "http://hub.local:8123/api/elpris_kvart/v1/prices/",
+            CONF_API_TOKEN: " hemlig-token ",
+            CONF_HUB_ENABLED: False,
+        },
+    }
+    invalid = {
+        "levels": ({CONF_LEVEL_CHEAP_PCT: 90.0}, "invalid_level_thresholds"),
+        "battery": ({CONF_BATTERY_MIN_SOC_PCT: 95.0}, "invalid_battery_soc"),
+        "hub": ({CONF_API_BASE_URL: "hub.local"}, "invalid_api_base_url"),
+        "prices": (
+            {CONF_PRICE_THRESHOLDS_ORE: ["billigt"]},
+            "invalid_price_thresholds",
+        ),
+    }
+
+    with patch("custom_components.elpris_kvart.async_setup_entry", return_value=True):
+        for step_id, user_input in steps.items():
+            result = await hass.config_entries.options.async_init(config_entry.entry_id)
+            assert result["type"] == data_entry_flow.FlowResultType.MENU
+            assert step_id in result["menu_options"]
+
+            result = await hass.config_entries.options.async_configure(
+                result["flow_id"], {"next_step_id": step_id}
+            )
+            assert result["type"] == data_entry_flow.FlowResultType.FORM
+            assert result["step_id"] == step_id
+
+            if step_id in invalid:
+                changes, error = invalid[step_id]
+                result = await hass.config_entries.options.async_configure(
+                    result["flow_id"], user_input={**user_input, **changes}
+                )
+                assert result["type"] == data_entry_flow.FlowResultType.FORM
+                assert result["errors"] == {"base": error}
+
+            result = await hass.config_entries.options.async_configure(
+                result["flow_id"], user_input=user_input
+            )
+            await hass.async_block_till_done()
+            assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+
+    assert config_entry.options == {
+        CONF_SURCHARGE_ORE: 5.0,
+        CONF_PRICE_THRESHOLDS_ORE: [50.5, 100.0],
+        **steps["levels"],
+        **steps["cost"],
+        **steps["peaks"],
+        **steps["battery"],
+        **steps["areas"],
+        **steps["anomalies"],
+        **steps["storage"],
+        CONF_API_BASE_URL: "http://hub.local:8123/api/elpris_kvart/v1/prices",
+        CONF_API_TOKEN: "hemlig-token",
+        CONF_HUB_ENABLED: False,
+    }
+
+    # Tomma valfria fält tas bort men övriga grupper lämnas orörda
+    with patch("custom_components.elpris_kvart.async_setup_entry", return_value=True):
+        result = await hass.config_entries.options.async_init(config_entry.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], {"next_step_id": "cost"}
+        )
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input={}
+        )
+        await hass.async_block_till_done()
+
+    assert CONF_ENERGY_SENSOR not in config_entry.options
+    assert config_entry.options[CONF_BATTERY_SOC_SENSOR] == "sensor.batteri"
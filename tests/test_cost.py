@@ -0,0 +1,205 @@
+"""Tester för Elpris Kvart kostnadssensorer."""
+
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.elpris_kvart.const import (
+    CONF_ENERGY_SENSOR,
+    CONF_PRICE_AREA,
+    CONF_SURCHARGE_ORE,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+
+from .test_sensor import MOCK_PRICES_UTC
+
+ENERGY_ENTITY = "sensor.husets_energi"
+
+
+async def _setup_entry(hass: HomeAssistant, surcharge_ore: float) -> None:
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3", CONF_SURCHARGE_ORE: surcharge_ore},
+        options={
+            CONF_SURCHARGE_ORE: surcharge_ore,
+            CONF_ENERGY_SENSOR: ENERGY_ENTITY,
+        },
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+# Testfall 1: Energin fördelas över kvartsgränsen
+# Förklaring: 2 kWh förbrukas mellan 12:50 och 13:10. Hälften hamnar i kvarten
+# 12:45 (2.00 SEK/kWh) och hälften i kvarten 13:00 (0.10 SEK/kWh).
+async def test_energy_cost_split_at_quarter_boundary(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att kostnaden prissätts per kvart vid kvartsskifte."""
+    await hass.config.async_set_time_zone("UTC")
+    start = datetime(2023, 10, 25, 12, 50, 0, tzinfo=dt_util.UTC)
+    freezer.move_to(start)
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    hass.states.async_set(ENERGY_ENTITY, "10.0", {"unit_of_measurement": "kWh"})
+    await _setup_entry(hass, surcharge_ore=0.0)
+
+    freezer.move_to(start + timedelta(minutes=20))
+    hass.states.async_set(ENERGY_ENTITY, "12.0", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.elpris_kvart_se3_elkostnad_idag")
+    assert state is not None
+    assert float(state.state) == 2.1
+    total = hass.states.get("sensor.elpris_kvart_se3_elkostnad_totalt")
+    assert float(total.state) == 2.1
+    assert total.attributes["last_reading_value"] == 12.0
+
+
+# Testfall 2: Effektsensor med påslag
+# Förklaring: 3 kW under 10 minuter ger 0.5 kWh. Med priset 2.00 SEK/kWh och
+# 10 öre påslag blir kostnaden 0.5 * 2.10 = 1.05 SEK.
+async def test_power_sensor_cost_with_surcharge(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa kostnad från en effektsensor inklusive påslag."""
+    await hass.config.async_set_time_zone("UTC")
+    start = datetime(2023, 10, 25, 12, 0, 0, tzinfo=dt_util.UTC)
+    freezer.move_to(start)
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    hass.states.async_set(ENERGY_ENTITY, "3000", {"unit_of_measurement": "W"})
+    await _setup_entry(hass, surcharge_ore=10.0)
+
+    freezer.move_to(start + timedelta(minutes=10))
+    hass.states.async_set(ENERGY_ENTITY, "0", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.elpris_kvart_se3_elkostnad_denna_manad")
+    assert state is not None
+    assert float(state.state) == 1.05
+
+
+# Testfall 3: Omstart mitt i förbrukningen
+# Förklaring: Förra körningen läste mätaren 12.0 kWh kl. 12:50 och hade
+# kostat 1.00 SEK totalt. När Home Assistant startar 13:10 visar mätaren
+# 15.0 kWh. De 3 kWh som förbrukades under avbrottet fördelas 12:50-13:10:
+# 1.5 * 2.00 + 1.5 * 0.10 = 3.15 SEK, trots att dagens sensor läggs till
+# före totalsensorn och ser mätarställningen först. Dagens priser finns i
+# den lokala cachen, som läses innan sensorerna läggs till.
+async def test_restored_reading_prices_downtime(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa att energi under ett avbrott prissätts efter omstart."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to(datetime(2023, 10, 25, 13, 10, 0, tzinfo=dt_util.UTC))
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    total_entity = "sensor.elpris_kvart_se3_elkostnad_totalt"
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(
+                    total_entity,
+                    "1.0",
+                    {
+                        "last_reading_time": "2023-10-25T12:50:00+00:00",
+                        "last_reading_value": 12.0,
+                        "last_reading_unit": "kWh",
+                    },
+                ),
+                {"native_value": 1.0, "native_unit_of_measurement": "SEK"},
+            )
+        ],
+    )
+
+    key = f"{DOMAIN}/se3_2023-10-25"
+    hass_storage[key] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": key,
+        "data": {"prices": MOCK_PRICES_UTC},
+    }
+
+    hass.states.async_set(ENERGY_ENTITY, "15.0", {"unit_of_measurement": "kWh"})
+    await _setup_entry(hass, surcharge_ore=0.0)
+
+    assert float(hass.states.get(total_entity).state) == 4.15
+    today = hass.states.get("sensor.elpris_kvart_se3_elkostnad_idag")
+    assert float(today.state) == 3.15
+    assert hass.states.get(total_entity).attributes["last_reading_value"] == 15.0
+
+
+# Testfall 4: Omstart med effektsensor
+# Förklaring: Effekten 5 kW från förra körningen säger inget om avbrottet och
+# får inte räknas fram till 13:10, så totalen står kvar på 1.00 SEK.
+async def test_restored_power_reading_is_not_stretched(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att en återställd effekt inte räknas över avbrottet."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to(datetime(2023, 10, 25, 13, 10, 0, tzinfo=dt_util.UTC))
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    total_entity = "sensor.elpris_kvart_se3_elkostnad_totalt"
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(
+                    total_entity,
+                    "1.0",
+                    {
+                        "last_reading_time": "2023-10-25T12:50:00+00:00",
+                        "last_reading_value": 5000.0,
+                        "last_reading_unit": "W",
+                    },
+                ),
+                {"native_value": 1.0, "native_unit_of_measurement": "SEK"},
+            )
+        ],
+    )
+
+    hass.states.async_set(ENERGY_ENTITY, "4000", {"unit_of_measurement": "W"})
+    await _setup_entry(hass, surcharge_ore=0.0)
+
+    assert float(hass.states.get(total_entity).state) == 1.0
+
+
+# Testfall 5: Nytt dygn utan ny mätaravläsning
+# Förklaring: Mätaren står still efter 13:10. Vid midnatt nollställs ändå
+# dagens kostnad och last_reset flyttas till det nya dygnet, medan månadens
+# kostnad och dess last_reset ligger kvar.
+async def test_today_rolls_over_at_midnight(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att dagens kostnad nollställs vid midnatt utan nya värden."""
+    await hass.config.async_set_time_zone("UTC")
+    start = datetime(2023, 10, 25, 12, 50, 0, tzinfo=dt_util.UTC)
+    freezer.move_to(start)
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    hass.states.async_set(ENERGY_ENTITY, "10.0", {"unit_of_measurement": "kWh"})
+    await _setup_entry(hass, surcharge_ore=0.0)
+    freezer.move_to(start + timedelta(minutes=20))
+    hass.states.async_set(ENERGY_ENTITY, "12.0", {"unit_of_measurement": "kWh"})
+    await hass.async_block_till_done()
+
+    midnight = datetime(2023, 10, 26, 0, 0, 0, tzinfo=dt_util.UTC)
+    freezer.move_to(midnight)
+    async_fire_time_changed(hass, midnight)
+    await hass.async_block_till_done()
+
+    today = hass.states.get("sensor.elpris_kvart_se3_elkostnad_idag")
+    assert float(today.state) == 0.0
+    assert today.attributes["last_reset"] == "2023-10-26T00:00:00+00:00"
+    month = hass.states.get("sensor.elpris_kvart_se3_elkostnad_denna_manad")
+    assert float(month.state) == 2.1
+    assert month.attributes["last_reset"] == "2023-10-01T00:00:00+00:00"
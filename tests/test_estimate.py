@@ -0,0 +1,203 @@
+"""Tester för Elpris Kvart uppskattning av morgondagens priser."""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import (
+    ATTR_ESTIMATE_CONFIDENCE,
+    ATTR_TOMORROW_ESTIMATE_SEK,
+    ATTR_TOMORROW_PRICES_SEK,
+    CONF_PRICE_AREA,
+    CONFIDENCE_HIGH,
+    CONFIDENCE_LOW,
+    DOMAIN,
+    SERVICE_PLAN_LOAD,
+    STORAGE_VERSION,
+)
+from custom_components.elpris_kvart.estimate import (
+    WeekdayWeightedModel,
+    build_estimate,
+)
+from custom_components.elpris_kvart.timeline import SlotTimeline
+
+from .test_sensor import MOCK_PRICES_UTC
+
+SPOT_SEK_ENTITY_ID = "sensor.elpris_kvart_se3_spotpris_i_sek_kwh"
+
+
+def _day_rows(day: date, price: float) -> list[dict]:
+    """Ett pris per timme för ett helt dygn i UTC."""
+    start = dt_util.as_utc(dt_util.start_of_local_day(day))
+    return [
+        {
+            "SEK_per_kWh": price,
+            "time_start": (start + timedelta(hours=hour)).isoformat(),
+            "time_end": (start + timedelta(hours=hour + 1)).isoformat(),
+        }
+        for hour in range(24)
+    ]
+
+
+# Testfall 1: Viktat medelvärde per kvart
+# Förklaring: Samma veckodag väger tyngre och äldre dygn väger mindre. Med
+# två veckors historik och två dygn på samma veckodag blir konfidensen hög.
+async def test_weekday_weighted_model(hass: HomeAssistant) -> None:
+    """Testa modellen och build_estimate."""
+    await hass.config.async_set_time_zone("UTC")
+    target = date(2023, 10, 26)
+    history = {
+        target - timedelta(days=1): {"00:00": 1.0},
+        target - timedelta(days=7): {"00:00": 2.0},
+    }
+    model = WeekdayWeightedModel(weekday_weight=3.0, decay=0.5)
+    weights = (0.5, 3 * 0.5**7)
+    assert model.estimate(history, target)["00:00"] == pytest.approx(
+        (weights[0] * 1.0 + weights[1] * 2.0) / sum(weights)
+    )
+
+    rows_by_day = {
+        target - timedelta(days=offset): _day_rows(
+            target - timedelta(days=offset), float(offset)
+        )
+        for offset in range(1, 15)
+    }
+    estimate = build_estimate(
+        model, rows_by_day, SlotTimeline(target, dt_util.get_default_time_zone())
+    )
+    assert estimate.date == target
+    assert estimate.days_used == 14
+    assert estimate.confidence == CONFIDENCE_HIGH
+    assert len(estimate.slots) == 96
+    assert None not in estimate.slots
+    assert len(set(estimate.slots)) == 1
+
+
+# Testfall 2: Uppskattningen visas tills de riktiga priserna hämtats
+# Förklaring: Före kl. 14 saknas morgondagens priser och sensorn visar en
+# uppskattning från cachade dygn. När get_prices för morgondagen lyckas
+# ersätts uppskattningen av de riktiga priserna.
+async def test_tomorrow_estimate_replaced_by_real_prices(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa uppskattningen av morgondagens priser i sensorn."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    tomorrow = date(2023, 10, 26)
+
+    async def get_prices(target_date: date) -> list:
+        if target_date == tomorrow:
+            return _day_rows(tomorrow, 3.0)
+        return MOCK_PRICES_UTC
+
+    mock_elpris_api.side_effect = get_prices
+    key = f"{DOMAIN}/se3_2023-10-19"
+    hass_storage[key] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": key,
+        "data": {"prices": _day_rows(date(2023, 10, 19), 1.0)},
+    }
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    estimate = coordinator.get_tomorrow_estimate()
+    assert estimate is not None
+    assert estimate.days_used == 2
+    assert estimate.confidence == CONFIDENCE_LOW
+    # 00:00 finns båda dygnen; 10-19 är samma veckodag och väger tre gånger.
+    weights = (0.9, 3 * 0.9**7)
+    assert estimate.slots[0] == pytest.approx(
+        (weights[0] * 0.5 + weights[1] * 1.0) / sum(weights)
+    )
+    # 05:00 finns bara 10-19.
+    assert estimate.slots[20] == pytest.approx(1.0)
+    assert date(2023, 10, 19) not in coordinator.all_prices
+
+    state = hass.states.get(SPOT_SEK_ENTITY_ID)
+    assert state.attributes[ATTR_TOMORROW_PRICES_SEK] == []
+    assert len(state.attributes[ATTR_TOMORROW_ESTIMATE_SEK]) == 96
+    assert state.attributes[ATTR_ESTIMATE_CONFIDENCE] == CONFIDENCE_LOW
+
+    # Med use_estimate kan plan_load planera in i morgondagen.
+    plan_request = {"area": "SE3", "energy_kwh": 10.0, "max_power_kw": 4.0}
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PLAN_LOAD,
+            plan_request,
+            blocking=True,
+            return_response=True,
+        )
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        {**plan_request, "use_estimate": True},
+        blocking=True,
+        return_response=True,
+    )
+    assert response[ATTR_ESTIMATE_CONFIDENCE] == CONFIDENCE_LOW
+    assert response["quarters"][0]["start"] == "2023-10-25T13:00:00+00:00"
+    assert len(response["quarters"]) == 10
+
+    freezer.move_to("2023-10-25 14:05:00+00:00")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.get_tomorrow_estimate() is None
+    state = hass.states.get(SPOT_SEK_ENTITY_ID)
+    assert len(state.attributes[ATTR_TOMORROW_PRICES_SEK]) == 24
+    assert ATTR_TOMORROW_ESTIMATE_SEK not in state.attributes
+    assert ATTR_ESTIMATE_CONFIDENCE not in state.attributes
+
+
+# Testfall 3: Ingen uppskattning görs om förrän historiken ändras
+# Förklaring: När modellen inte ger någon uppskattning läses historiken inte
+# om vid varje uppdatering. Först när ett dygn i historiken får nya priser
+# görs ett nytt försök.
+async def test_failed_estimate_retried_on_new_history(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att en misslyckad uppskattning inte upprepas i onödan."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    tomorrow = date(2023, 10, 26)
+
+    async def get_prices(target_date: date) -> list | None:
+        return None if target_date == tomorrow else MOCK_PRICES_UTC
+
+    mock_elpris_api.side_effect = get_prices
+    with patch(
+        "custom_components.elpris_kvart.async_estimate_day", return_value=None
+    ) as mock_estimate:
+        config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+        config_entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        coordinator = hass.data[DOMAIN][config_entry.entry_id]
+        assert mock_estimate.await_count == 1
+
+        await coordinator.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert mock_estimate.await_count == 1
+        assert coordinator.get_tomorrow_estimate() is None
+
+        async def get_new_prices(target_date: date) -> list | None:
+            if target_date == tomorrow:
+                return None
+            return _day_rows(target_date, 0.7)
+
+        mock_elpris_api.side_effect = get_new_prices
+        coordinator.all_prices.pop(date(2023, 10, 25))
+        await coordinator.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert mock_estimate.await_count == 2
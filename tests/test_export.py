@@ -0,0 +1,129 @@
+"""Tester för Elpris Kvart export av prishistorik."""
+
+import csv
+import json
+import os
+from datetime import date
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    CONF_SURCHARGE_ORE,
+    DOMAIN,
+    SERVICE_EXPORT_PRICES,
+    STORAGE_VERSION,
+)
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+def _read_export(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as export:
+        return export.read().splitlines()
+
+
+# Testfall 1: Export till CSV och NDJSON
+# Förklaring: Ett dygn som bara finns på disk läses direkt från cachen utan
+# att läggas i minnet. Kolumnerna för påslag och tariff räknas per kvart och
+# dygn utan cachade priser hoppas över och räknas.
+async def test_export_prices(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa tjänsten elpris_kvart.export_prices."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    hass_storage[f"{DOMAIN}/se3_2023-10-23"] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": f"{DOMAIN}/se3_2023-10-23",
+        "data": {
+            "prices": [
+                {
+                    "SEK_per_kWh": 1.0,
+                    "time_start": "2023-10-23T00:00:00+00:00",
+                    "time_end": "2023-10-23T01:00:00+00:00",
+                }
+            ]
+        },
+    }
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3", CONF_SURCHARGE_ORE: 10.0},
+        options={CONF_SURCHARGE_ORE: 10.0},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_PRICES,
+        {
+            "areas": ["SE3"],
+            "start_date": "2023-10-23",
+            "end_date": "2023-10-25",
+            "columns": ["total", "spot", "surcharged"],
+            "tariff_ore": 25,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["rows"] == 4 + len(MOCK_PRICES_UTC)
+    assert response["days_missing"] == 1
+    assert date(2023, 10, 23) not in coordinator.cache.memory
+    csv_path = response["path"]
+    rows = list(
+        csv.DictReader(await hass.async_add_executor_job(_read_export, csv_path))
+    )
+    assert rows[0] == {
+        "area": "SE3",
+        "start": "2023-10-23T00:00:00+00:00",
+        "end": "2023-10-23T00:15:00+00:00",
+        "spot_sek_per_kwh": "1.0",
+        "surcharged_sek_per_kwh": "1.1",
+        "total_sek_per_kwh": "1.35",
+    }
+    assert rows[-1]["start"] == "2023-10-25T13:00:00+00:00"
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_PRICES,
+        {
+            "areas": "SE3",
+            "start_date": "2023-10-25",
+            "end_date": "2023-10-25",
+            "format": "ndjson",
+        },
+        blocking=True,
+        return_response=True,
+    )
+    ndjson_path = response["path"]
+    records = [
+        json.loads(line)
+        for line in await hass.async_add_executor_job(_read_export, ndjson_path)
+    ]
+    assert records[0] == {
+        "area": "SE3",
+        "start": "2023-10-25T00:00:00+00:00",
+        "end": "2023-10-25T00:15:00+00:00",
+        "spot_sek_per_kwh": 0.5,
+    }
+    assert len(records) == len(MOCK_PRICES_UTC)
+
+    # En ny export inom samma sekund skriver inte över den förra.
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_PRICES,
+        {"areas": "SE3", "start_date": "2023-10-25", "end_date": "2023-10-25"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["path"] == csv_path.removesuffix(".csv") + "_2.csv"
+    assert len(await hass.async_add_executor_job(_read_export, csv_path)) == 11
+    for path in (csv_path, ndjson_path, response["path"]):
+        await hass.async_add_executor_job(os.remove, path)
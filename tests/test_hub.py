@@ -0,0 +1,100 @@
+"""Tester för Elpris Kvart hubbläge (HTTP-vy med cachade priser)."""
+
+from datetime import date
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import CLIENT_ID, MockConfigEntry
+
+from custom_components.elpris_kvart import ElprisApi
+from custom_components.elpris_kvart.const import (
+    CONF_HUB_ENABLED,
+    CONF_PRICE_AREA,
+    DOMAIN,
+    HUB_URL_PREFIX,
+)
+from custom_components.elpris_kvart.hub import etag_matches
+
+from .test_sensor import MOCK_PRICES_UTC
+
+# mock_elpris_api ersätter get_prices på klassen; spara den riktiga metoden.
+REAL_GET_PRICES = ElprisApi.get_prices
+
+API_ROWS = [
+    {**item, "EUR_per_kWh": item["SEK_per_kWh"] / 11.5, "EXR": 11.5}
+    for item in MOCK_PRICES_UTC
+]
+
+
+# Testfall 1: Hubben serverar cachade dygn med ETag
+# Förklaring: Samma URL-struktur som det publika API:t, men en åtkomsttoken
+# krävs. Svaret har en ETag och en förfrågan med If-None-Match får 304.
+# Dygn som saknas i cachen och elområden utan påslaget hubbläge ger 404.
+# En ElprisApi som pekar på hubben med en token får samma rader och
+# återanvänder dem vid 304 utan att tolka om svaret.
+async def test_hub_serves_cached_prices(
+    hass: HomeAssistant,
+    hass_client,
+    hass_client_no_auth,
+    hass_admin_user,
+    mock_elpris_api,
+    freezer,
+) -> None:
+    """Testa hubbvyn och en klient som hämtar från den."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = API_ROWS
+
+    for area, hub_enabled in (("SE3", True), ("SE4", False)):
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_PRICE_AREA: area},
+            options={CONF_HUB_ENABLED: hub_enabled},
+        )
+        config_entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    # Token utfärdad efter att klockan flyttats, annars är den inte giltig än.
+    refresh_token = await hass.auth.async_create_refresh_token(
+        hass_admin_user, CLIENT_ID
+    )
+    access_token = hass.auth.async_create_access_token(refresh_token)
+
+    url = f"{HUB_URL_PREFIX}/2023/10-25_SE3.json"
+    anonymous = await hass_client_no_auth()
+    assert (await anonymous.get(url)).status == 401
+
+    client = await hass_client(access_token)
+    response = await client.get(url)
+    assert response.status == 200
+    assert await response.json() == API_ROWS
+    etag = response.headers["ETag"]
+
+    response = await client.get(url, headers={"If-None-Match": f'"x", W/{etag}'})
+    assert response.status == 304
+    response = await client.get(url, headers={"If-None-Match": etag[:-2] + '"'})
+    assert response.status == 200
+    assert (await client.get(f"{HUB_URL_PREFIX}/2023/10-26_SE3.json")).status == 404
+    assert (await client.get(f"{HUB_URL_PREFIX}/2023/10-25_SE4.json")).status == 404
+
+    base_url = str(anonymous.make_url(HUB_URL_PREFIX))
+    api = ElprisApi(anonymous.session, "SE3", base_url)
+    assert await REAL_GET_PRICES(api, date(2023, 10, 25)) is None
+    api = ElprisApi(anonymous.session, "SE3", base_url, access_token)
+    rows = await REAL_GET_PRICES(api, date(2023, 10, 25))
+    assert rows == API_ROWS
+    assert await REAL_GET_PRICES(api, date(2023, 10, 25)) is rows
+    assert await REAL_GET_PRICES(api, date(2023, 10, 26)) is None
+
+
+# Testfall 2: Jämförelse av If-None-Match
+# Förklaring: Huvudet kan innehålla flera ETaggar, svaga ETaggar (W/) och
+# "*". En ETag som bara är en delsträng av en annan matchar inte.
+def test_etag_matches() -> None:
+    """Testa etag_matches."""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x" , W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches('"ab"', '"abc"')
+    assert not etag_matches("", '"abc"')
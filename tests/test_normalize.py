@@ -0,0 +1,109 @@
+"""Tester för Elpris Kvart normalisering av prisrader."""
+
+from datetime import date
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import CONF_PRICE_AREA, DOMAIN
+from custom_components.elpris_kvart.normalize import normalize_day
+from custom_components.elpris_kvart.timeline import SlotTimeline
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+def _row(start: str, end: str, price: float) -> dict:
+    return {
+        "SEK_per_kWh": price,
+        "time_start": f"2023-10-25T{start}:00+00:00",
+        "time_end": f"2023-10-25T{end}:00+00:00",
+    }
+
+
+# Testfall 1: Timrader, kvartsrader, dubbletter och luckor
+# Förklaring: En timrad fördelas på sina fyra kvartar men en kvartsrad för
+# samma tid vinner. En identisk rad räknas som dubblett, en rad med annat
+# pris som konflikt (sista raden gäller). Femminutersrader medelvärdesbildas
+# till sin kvart och kvartar utan pris redovisas som luckor.
+def test_normalize_day() -> None:
+    """Testa normalize_day."""
+    timeline = SlotTimeline(date(2023, 10, 25), dt_util.UTC)
+    rows = [
+        _row("00:00", "01:00", 1.0),
+        _row("00:15", "00:30", 2.0),
+        _row("01:00", "01:15", 3.0),
+        _row("01:00", "01:15", 3.0),
+        _row("01:15", "01:30", 4.0),
+        _row("01:15", "01:30", 5.0),
+        _row("02:00", "02:05", 0.3),
+        _row("02:05", "02:10", 0.6),
+        _row("02:10", "02:15", 0.9),
+        _row("03:00", "02:00", 9.0),
+        _row("23:45", "00:00", 6.0) | {"time_end": "2023-10-26T00:15:00+00:00"},
+    ]
+
+    slots, quality = normalize_day(rows, timeline)
+
+    assert slots[:4] == [1.0, 2.0, 1.0, 1.0]
+    assert slots[4:6] == [3.0, 5.0]
+    assert slots[8] == pytest.approx(0.6)
+    assert slots[95] == 6.0
+    assert quality.resolution == "mixed"
+    assert quality.invalid_rows == 1
+    assert quality.expanded_rows == 2
+    assert quality.aggregated_rows == 3
+    assert quality.duplicate_rows == 1
+    assert quality.conflicting_rows == 1
+    assert quality.missing_slots == 96 - 8
+    assert quality.gaps[:2] == ["01:30-02:00", "02:15-23:45"]
+
+
+# Testfall 2: Överlappande rader med olika upplösning
+# Förklaring: Den finaste upplösningen vinner. En timrad och en kvartsrad
+# för 03:00 ersätts av medelvärdet av femminutersraderna i samma kvart,
+# viktat efter längd, medan resten av timmen får kvartsradens och
+# timradens priser.
+def test_normalize_day_finer_rows_win() -> None:
+    """Testa att finare rader vinner över grövre för samma kvart."""
+    timeline = SlotTimeline(date(2023, 10, 25), dt_util.UTC)
+    rows = [
+        _row("03:00", "03:05", 0.3),
+        _row("03:05", "03:15", 0.6),
+        _row("03:00", "03:15", 2.0),
+        _row("03:15", "03:30", 3.0),
+        _row("03:00", "04:00", 1.0),
+    ]
+
+    slots, quality = normalize_day(rows, timeline)
+
+    assert slots[12] == pytest.approx(0.5)
+    assert slots[13:16] == [3.0, 1.0, 1.0]
+    assert quality.aggregated_rows == 2
+    assert quality.expanded_rows == 1
+    assert quality.conflicting_rows == 0
+
+
+# Testfall 3: Datakvalitet i sensorattribut
+# Förklaring: Diagnostiksensorn för prisdata redovisar per dygn vilken
+# upplösning raderna hade och hur många kvartar som saknar pris.
+async def test_data_quality_attribute(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa attributet data_quality."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.elpris_kvart_se3_prisdata_i_minnet")
+    quality = state.attributes["data_quality"]["2023-10-25"]
+    assert quality["resolution"] == "PT15M"
+    assert quality["rows"] == len(MOCK_PRICES_UTC)
+    assert quality["missing_slots"] == 96 - 6
+    assert quality["gaps"] == ["00:15-12:00", "13:15-24:00"]
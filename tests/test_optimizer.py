@@ -0,0 +1,89 @@
+"""Tester för Elpris Kvart lastplanering."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    CONF_SURCHARGE_ORE,
+    DOMAIN,
+    SERVICE_PLAN_LOAD,
+)
+from custom_components.elpris_kvart.optimizer import plan_load
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+# Testfall 1: Girig planering utan blockkrav
+# Förklaring: Utan minsta blocklängd väljs de billigaste kvartarna. Den
+# dyraste valda kvarten tar bara resten av energin.
+def test_plan_load_greedy() -> None:
+    """Testa planering utan blockkrav."""
+    prices = [3.0, 1.0, None, 2.0, 0.5]
+    plan = plan_load(prices, energy_kwh=1.5, max_power_kw=4.0)
+    assert plan.slots == (1, 4)
+    assert plan.energy_per_slot_kwh == (0.5, 1.0)
+    assert plan.spot_cost_sek == pytest.approx(1.0)
+
+    assert plan_load(prices, energy_kwh=10.0, max_power_kw=4.0) is None
+
+
+# Testfall 2: Minsta blocklängd
+# Förklaring: Med krav på två sammanhängande kvartar kan de två billigaste
+# enskilda kvartarna inte väljas, utan det billigaste paret väljs.
+def test_plan_load_min_block() -> None:
+    """Testa planering med minsta blocklängd."""
+    prices = [0.1, 5.0, 1.0, 1.2, 5.0, 0.2]
+    plan = plan_load(prices, energy_kwh=2.0, max_power_kw=4.0, min_block_slots=2)
+    assert plan.slots == (2, 3)
+    assert plan.spot_cost_sek == pytest.approx(2.2)
+
+    assert plan_load([1.0, None, 1.0], 2.0, 4.0, min_block_slots=2) is None
+
+
+# Testfall 3: Tjänsten plan_load
+# Förklaring: Tjänsten planerar över kända priser från nu och framåt och
+# returnerar kvartar, sammanslagna block och kostnad inklusive påslag.
+async def test_plan_load_service(hass: HomeAssistant, mock_elpris_api, freezer) -> None:
+    """Testa tjänsten elpris_kvart.plan_load."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 00:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3"},
+        options={CONF_SURCHARGE_ORE: 10.0},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_LOAD,
+        {"area": "SE3", "energy_kwh": 1.5, "max_power_kw": 4.0},
+        blocking=True,
+        return_response=True,
+    )
+    assert [quarter["start"] for quarter in response["quarters"]] == [
+        "2023-10-25T00:00:00+00:00",
+        "2023-10-25T13:00:00+00:00",
+    ]
+    assert response["blocks"][1] == {
+        "start": "2023-10-25T13:00:00+00:00",
+        "end": "2023-10-25T13:15:00+00:00",
+    }
+    assert response["expected_spot_cost_sek"] == pytest.approx(0.35)
+    assert response["expected_cost_sek"] == pytest.approx(0.5)
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PLAN_LOAD,
+            {"area": "SE3", "energy_kwh": 100.0, "max_power_kw": 4.0},
+            blocking=True,
+            return_response=True,
+        )
@@ -0,0 +1,219 @@
+"""Tester för Elpris Kvart effekttoppar (effekttariff)."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    mock_restore_cache,
+)
+
+from custom_components.elpris_kvart.const import (
+    CONF_ENERGY_SENSOR,
+    CONF_PEAK_COUNT,
+    CONF_PEAK_FEE_SEK_PER_KW,
+    CONF_PRICE_AREA,
+    DOMAIN,
+)
+from custom_components.elpris_kvart.cost import EnergyCostTracker
+from custom_components.elpris_kvart.peaks import PeakTracker
+
+from .test_sensor import MOCK_PRICES_UTC
+
+ENERGY_ENTITY = "sensor.husets_effekt"
+PEAK_ENTITY = "sensor.elpris_kvart_se3_effekttopp_denna_manad"
+HEADROOM_ENTITY = "sensor.elpris_kvart_se3_effektmarginal"
+FEE_ENTITY = "sensor.elpris_kvart_se3_beraknad_effektavgift"
+
+
+def _ts(day: int, hour: int, minute: int = 0, month: int = 10) -> float:
+    return datetime(2023, month, day, hour, minute, tzinfo=dt_util.UTC).timestamp()
+
+
+# Testfall 1: De N högsta timmarna i en begränsad heap
+# Förklaring: Med N=2 behålls timmarna 5 och 3 kWh medan 1 kWh avvisas. Den
+# pågående timmen ger marginal och prognos, och när den tar slut ersätter
+# den den minsta toppen. Utanför höglasttid räknas inga timmar och vid
+# månadsskifte börjar heapen om.
+async def test_peak_tracker_heap(hass: HomeAssistant, freezer) -> None:
+    """Testa PeakTracker direkt."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 11:30:00+00:00")
+    peaks = PeakTracker(hass, 2)
+    for hour, kwh in ((8, 3.0), (9, 5.0), (10, 1.0)):
+        peaks.async_add_energy(_ts(25, hour), _ts(25, hour + 1), kwh)
+    peaks.async_add_energy(_ts(25, 11), _ts(25, 11, 30), 2.0)
+
+    assert [kw for kw, _ in peaks.sorted_peaks()] == [5.0, 3.0]
+    assert peaks.billing_peak_kw == 4.0
+    assert peaks.headroom_kw() == 1.0
+    assert peaks.projected_peak_kw() == 4.0
+
+    peaks.async_add_energy(_ts(25, 11, 30), _ts(25, 11, 45), 2.0)
+    assert peaks.headroom_kw() == 0.0
+    assert peaks.projected_peak_kw() == 4.5
+
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    peaks.async_roll_over()
+    assert [kw for kw, _ in peaks.sorted_peaks()] == [5.0, 4.0]
+    assert peaks.billing_peak_kw == 4.5
+
+    # Endast höglasttid: vardagar 07-20. Lördag och kväll räknas inte.
+    high_load = PeakTracker(hass, 2, high_load_only=True)
+    high_load.async_add_energy(_ts(28, 9), _ts(28, 10), 9.0)
+    high_load.async_add_energy(_ts(25, 21), _ts(25, 22), 8.0)
+    high_load.async_add_energy(_ts(25, 22), _ts(25, 23), 1.0)
+    high_load.async_roll_over()
+    assert high_load.sorted_peaks() == []
+    assert high_load.headroom_kw() == 0.0
+
+    # En ny månad tömmer toppar från föregående månad.
+    freezer.move_to("2023-11-01 09:30:00+00:00")
+    assert peaks.billing_peak_kw == 0.0
+    peaks.async_add_energy(_ts(1, 8, month=11), _ts(1, 9, month=11), 2.0)
+    peaks.async_add_energy(_ts(1, 9, month=11), _ts(1, 9, 30, month=11), 0.5)
+    assert [kw for kw, _ in peaks.sorted_peaks()] == [2.0]
+
+
+# Testfall 2: Sensorer från en effektsensor, med återställda toppar
+# Förklaring: En topp från tidigare i månaden återställs från förra körningen
+# medan en topp från september ignoreras. 6 kW under 30 minuter ger 3 kWh i
+# timmen 12. När kvartsuppdateringen 13:15 kommer är timmen avslutad och
+# medelvärdet av topparna blir (5 + 3) / 2 = 4 kW.
+async def test_peak_sensors_from_power_sensor(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa effekttoppssensorerna i en konfigurerad integration."""
+    await hass.config.async_set_time_zone("UTC")
+    start = datetime(2023, 10, 25, 12, 0, 0, tzinfo=dt_util.UTC)
+    freezer.move_to(start)
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    mock_restore_cache(
+        hass,
+        [
+            State(
+                PEAK_ENTITY,
+                "5.0",
+                {
+                    "peaks": [
+                        {"start": "2023-10-02T08:00:00+00:00", "kw": 5.0},
+                        {"start": "2023-09-29T08:00:00+00:00", "kw": 9.0},
+                    ]
+                },
+            )
+        ],
+    )
+
+    hass.states.async_set(ENERGY_ENTITY, "6000", {"unit_of_measurement": "W"})
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3"},
+        options={
+            CONF_ENERGY_SENSOR: ENERGY_ENTITY,
+            CONF_PEAK_COUNT: 3,
+            CONF_PEAK_FEE_SEK_PER_KW: 50.0,
+        },
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert float(hass.states.get(PEAK_ENTITY).state) == 5.0
+
+    freezer.move_to(start + timedelta(minutes=30))
+    hass.states.async_set(ENERGY_ENTITY, "0", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+
+    # Färre än tre toppar: varje timme kan bli en ny topp.
+    assert float(hass.states.get(HEADROOM_ENTITY).state) == 0.0
+    fee = hass.states.get(FEE_ENTITY)
+    assert fee.attributes["projected_peak_kw"] == 4.0
+    assert float(fee.state) == 200.0
+    peak = hass.states.get(PEAK_ENTITY)
+    assert peak.attributes["current_hour_kwh"] == pytest.approx(3.0)
+
+    freezer.move_to(start + timedelta(hours=1, minutes=15))
+    async_fire_time_changed(hass, start + timedelta(hours=1, minutes=15))
+    await hass.async_block_till_done()
+
+    peak = hass.states.get(PEAK_ENTITY)
+    assert float(peak.state) == 4.0
+    assert [p["kw"] for p in peak.attributes["peaks"]] == [5.0, 3.0]
+    assert "current_hour_kwh" not in peak.attributes
+
+
+# Testfall 3: Sen energi och utjämning innan timmen stängs
+# Förklaring: En mätaravläsning efter timskiftet ger energi till den timme
+# som redan stängts; toppen för den timmen uppdateras i stället för att
+# timmen läggs in två gånger. Innan en avslutad timme stängs anropas flush
+# så att en källa som håller ett värde hinner rapportera fram till skiftet.
+async def test_late_energy_and_flush(hass: HomeAssistant, freezer) -> None:
+    """Testa sen energi och flush i PeakTracker."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 13:00:00+00:00")
+    flushed = []
+    peaks = PeakTracker(hass, 2, flush=lambda: flushed.append(True))
+    peaks.async_add_energy(_ts(25, 12), _ts(25, 12, 30), 2.0)
+    peaks.async_roll_over()
+    assert flushed == [True]
+    assert [kw for kw, _ in peaks.sorted_peaks()] == [2.0]
+
+    freezer.move_to("2023-10-25 13:20:00+00:00")
+    peaks.async_add_energy(_ts(25, 12, 30), _ts(25, 13, 20), 5.0)
+    assert [kw for kw, _ in peaks.sorted_peaks()] == [pytest.approx(5.0)]
+    assert peaks.billing_peak_kw == pytest.approx(5.0)
+    assert peaks.current_hour_kw() == pytest.approx(2.0)
+    peaks.async_roll_over()
+    assert flushed == [True]
+
+
+# Testfall 4: Timskifte utan prisändring och utan nytt sensorvärde
+# Förklaring: Effekten ligger still på 4 kW från 14:00 och inga priser
+# ändras efter 13:15. Timmen stängs ändå vid 15:00 av en timtimer och den
+# hållna effekten räknas fram till skiftet, så toppen blir 4 kW. Trots tre
+# effektsensorer räknas effekten fram bara en gång per timskifte. En
+# felaktigt sparad avgift ger avgiften 0 i stället för ett fel.
+async def test_hour_closed_by_timer(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att timmen stängs vid timskiftet."""
+    await hass.config.async_set_time_zone("UTC")
+    start = datetime(2023, 10, 25, 14, 0, 0, tzinfo=dt_util.UTC)
+    freezer.move_to(start)
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    hass.states.async_set(ENERGY_ENTITY, "4000", {"unit_of_measurement": "W"})
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3"},
+        options={
+            CONF_ENERGY_SENSOR: ENERGY_ENTITY,
+            CONF_PEAK_COUNT: 2,
+            CONF_PEAK_FEE_SEK_PER_KW: "ogiltig",
+        },
+    )
+    config_entry.add_to_hass(hass)
+    with patch.object(
+        EnergyCostTracker,
+        "async_flush",
+        autospec=True,
+        side_effect=EnergyCostTracker.async_flush,
+    ) as mock_flush:
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+        freezer.move_to(start + timedelta(hours=1))
+        async_fire_time_changed(hass, start + timedelta(hours=1))
+        await hass.async_block_till_done()
+    assert mock_flush.call_count == 1
+
+    peak = hass.states.get(PEAK_ENTITY)
+    assert float(peak.state) == pytest.approx(4.0)
+    assert peak.attributes["peaks"][0]["start"] == "2023-10-25T14:00:00+00:00"
+    fee = hass.states.get(FEE_ENTITY)
+    assert float(fee.state) == 0.0
+    assert fee.attributes["fee_sek_per_kw"] == 0.0
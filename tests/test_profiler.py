@@ -0,0 +1,76 @@
+"""Tester för Elpris Kvart profilering och diagnostik."""
+
+import os
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart import ElprisDataUpdateCoordinator
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    DOMAIN,
+    SERVICE_PROFILE,
+)
+from custom_components.elpris_kvart.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+# Testfall 1: Profilering av- och påslagen via tjänsten
+# Förklaring: Under en profileringsperiod tidmäts de heta metoderna. En ny
+# start under en pågående period avvisas i stället för att stoppa den. När
+# perioden stoppas återställs originalmetoderna, en rapport skrivs till
+# konfigurationskatalogen och sammanfattningen syns i diagnostiken.
+async def test_profile_service_and_diagnostics(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa tjänsten elpris_kvart.profile."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    original = ElprisDataUpdateCoordinator.__dict__["_async_update_data"]
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE, {"duration": 600}, blocking=True
+    )
+    assert ElprisDataUpdateCoordinator.__dict__["_async_update_data"] is not original
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_PROFILE, {"duration": 5, "cprofile": True}, blocking=True
+        )
+    assert ElprisDataUpdateCoordinator.__dict__["_async_update_data"] is not original
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE, {"action": "stop"}, blocking=True
+    )
+    assert ElprisDataUpdateCoordinator.__dict__["_async_update_data"] is original
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_PROFILE, {"action": "stop"}, blocking=True
+        )
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    profile = diagnostics["profiler"]
+    assert not profile["active"]
+    methods = profile["methods"]
+    assert methods["ElprisDataUpdateCoordinator._async_update_data"]["calls"] == 1
+    assert methods["ElprisDataUpdateCoordinator._rebuild_slot_prices"]["calls"] == 1
+    # Uppdateringen gav inga nya priser, så inga sensorer skrevs om.
+    assert "BaseElprisSensor._update_internal_data" not in methods
+    assert os.path.exists(profile["report_path"])
+    assert diagnostics["coordinator"]["days_with_prices"] == ["2023-10-25"]
+    os.remove(profile["report_path"])
@@ -0,0 +1,115 @@
+"""Tester för Elpris Kvart rullande prisfördelningar."""
+
+import statistics
+from datetime import date, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import (
+    ATTR_PERCENTILE,
+    ATTR_WINDOW_DAYS,
+    CONF_PRICE_AREA,
+    DOMAIN,
+    PRICE_LEVEL_NORMAL,
+    PRICE_LEVEL_VERY_EXPENSIVE,
+    STORAGE_VERSION,
+)
+from custom_components.elpris_kvart.rolling import PriceSketch, RollingPriceStats
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+# Testfall 1: Sammanslagningsbar skiss och rullande fönster
+# Förklaring: Medel, standardavvikelse och kvantiler från skissen stämmer med
+# en direkt beräkning. När fönstret flyttas tas bara dygnet som lämnar bort
+# och dygnet som kommer in läggs till, och resultatet blir detsamma som en
+# ny skiss över fönstrets dygn.
+def test_sketch_and_rolling_window() -> None:
+    """Testa PriceSketch och RollingPriceStats."""
+    prices = [0.05 * i for i in range(1, 41)]
+    sketch = PriceSketch.from_prices([*prices, None])
+    assert sketch.count == 40
+    assert sketch.mean == pytest.approx(statistics.fmean(prices))
+    assert sketch.stddev == pytest.approx(statistics.pstdev(prices))
+    assert sketch.quantile(0.5) == pytest.approx(prices[19], abs=0.011)
+    assert sketch.percentile_of(1.0) == pytest.approx(47.5, abs=2.5)
+
+    end = date(2023, 10, 25)
+    days = {end - timedelta(days=offset): [float(offset)] * 4 for offset in range(9)}
+    stats = RollingPriceStats((3, 7))
+    stats.apply(
+        end - timedelta(days=1),
+        {day: (None, PriceSketch.from_prices(slots)) for day, slots in days.items()},
+    )
+    stats.apply(end, {end: (None, PriceSketch.from_prices(days[end]))})
+    assert stats.window_days[3] == {end - timedelta(days=offset) for offset in range(3)}
+    assert stats.windows[3].mean == pytest.approx(1.0)
+    assert stats.windows[7].count == 28
+    assert stats.windows[7].mean == pytest.approx(3.0)
+
+    # Ändrade priser för ett dygn i fönstret byter ut dess skiss.
+    stats.apply(end, {end: (1, PriceSketch.from_prices([3.0] * 4))})
+    assert stats.windows[3].mean == pytest.approx(2.0)
+    assert stats.summary(3)["days"] == 3
+
+
+# Testfall 2: Prisnivå mot de senaste 7 och 30 dygnen
+# Förklaring: Äldre dygn läses från disken utan att läggas i minnet. Ett pris
+# på 2 kr/kWh är normalt jämfört med dagens priser men mycket dyrt jämfört
+# med en billig vecka.
+async def test_rolling_price_level_sensors(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa sensorerna Prisnivå 7 dygn och 30 dygn."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    for offset in range(1, 10):
+        day = date(2023, 10, 25) - timedelta(days=offset)
+        start = dt_util.as_utc(dt_util.start_of_local_day(day))
+        key = f"{DOMAIN}/se3_{day.isoformat()}"
+        hass_storage[key] = {
+            "version": STORAGE_VERSION,
+            "minor_version": 1,
+            "key": key,
+            "data": {
+                "prices": [
+                    {
+                        "SEK_per_kWh": 0.5,
+                        "time_start": (start + timedelta(hours=hour)).isoformat(),
+                        "time_end": (start + timedelta(hours=hour + 1)).isoformat(),
+                    }
+                    for hour in range(24)
+                ]
+            },
+        }
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    assert coordinator.rolling.window_days[7] == {
+        date(2023, 10, 25) - timedelta(days=offset) for offset in range(7)
+    }
+    assert len(coordinator.rolling.window_days[30]) == 10
+    assert date(2023, 10, 20) not in coordinator.all_prices
+
+    today_level = hass.states.get("sensor.elpris_kvart_se3_prisniva")
+    assert today_level.state == PRICE_LEVEL_NORMAL
+    week_level = hass.states.get("sensor.elpris_kvart_se3_prisniva_7_dygn")
+    assert week_level.state == PRICE_LEVEL_VERY_EXPENSIVE
+    assert week_level.attributes[ATTR_WINDOW_DAYS] == 7
+    assert week_level.attributes["days"] == 7
+    assert week_level.attributes["mean_sek"] == pytest.approx(
+        (6 * 96 * 0.5 + 0.5 + 4 * 2.0 + 0.1) / (6 * 96 + 6), abs=1e-4
+    )
+    assert week_level.attributes[ATTR_PERCENTILE] > 99
+    assert (
+        hass.states.get("sensor.elpris_kvart_se3_prisniva_30_dygn").attributes["days"]
+        == 10
+    )
@@ -66,7 +66,7 @@ async def test_sensor_value_at_specific_time(
     config_entry.add_to_hass(hass)
 
     assert await hass.config_entries.async_setup(config_entry.entry_id)
-    await hass.async_block_till_done()
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     # 12:15 UTC -> 2.00 SEK (200 öre)
     # Entity ID: sensor.elpris_kvart_se3_spotpris_i_ore_kwh
@@ -96,7 +96,7 @@ async def test_sensor_update_on_time_change(
     )
     config_entry.add_to_hass(hass)
     assert await hass.config_entries.async_setup(config_entry.entry_id)
-    await hass.async_block_till_done()
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     # 12:59 UTC -> 200 öre
     state = hass.states.get("sensor.elpris_kvart_se3_spotpris_i_ore_kwh")
@@ -130,7 +130,7 @@ async def test_sensor_attributes(hass: HomeAssistant, mock_elpris_api, freezer)
     config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
     config_entry.add_to_hass(hass)
     assert await hass.config_entries.async_setup(config_entry.entry_id)
-    await hass.async_block_till_done()
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     state = hass.states.get("sensor.elpris_kvart_se3_spotpris_i_ore_kwh")
     assert state is not None
@@ -139,3 +139,392 @@ async def test_sensor_attributes(hass: HomeAssistant, mock_elpris_api, freezer)
     assert attributes["max_price_today_ore"] == 200.0
     assert attributes["min_price_today_ore"] == 10.0
     assert len(attributes["raw_today"]) == 6
+
+
+# Testfall 4: Uppstart med cachade priser när API:et inte svarar
+# Förklaring: Dagens priser finns redan i den lokala cachen. Trots att API:et
+# inte levererar någon data ska sensorn direkt visa det cachade priset.
+async def test_setup_serves_cached_prices(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa att uppstarten använder cachade priser utan att vänta på API:et."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:15:00+00:00")
+
+    hass_storage["elpris_kvart/se3_2023-10-25"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "elpris_kvart/se3_2023-10-25",
+        "data": {"prices": MOCK_PRICES_UTC},
+    }
+    mock_elpris_api.return_value = None
+
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+
+    state = hass.states.get("sensor.elpris_kvart_se3_spotpris_i_ore_kwh")
+    assert state is not None
+    assert float(state.state) == 200.0
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+    # Dagens priser fanns i cachen och morgondagens hämtas först efter 14:00.
+    assert mock_elpris_api.call_count == 0
+
+
+# Testfall 5: Sensorn är otillgänglig tills första hämtningen är klar
+# Förklaring: Utan cache och utan svar från API:et ska uppsättningen ändå
+# lyckas, men sensorerna ska markeras som otillgängliga.
+async def test_setup_without_data_marks_unavailable(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att sensorerna är otillgängliga när ingen data finns."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:15:00+00:00")
+    mock_elpris_api.return_value = None
+
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.elpris_kvart_se3_spotpris_i_ore_kwh")
+    assert state is not None
+    assert state.state == "unavailable"
+
+
+# Testfall 6: Timmedel beräknat från kvartspriserna
+# Förklaring: Timmen 12:00-13:00 har fyra kvartar à 2.00 SEK och timmen
+# 13:00-14:00 har bara en kvart à 0.10 SEK.
+async def test_hourly_mean_sensor(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa sensorn för timmedelpris och dess attribut."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:40:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.elpris_kvart_se3_timpris_medel_i_sek_kwh")
+    assert state is not None
+    assert float(state.state) == 2.0
+    hourly = state.attributes["hourly_today"]
+    assert [hour["mean"] for hour in hourly] == [0.5, 2.0, 0.1]
+    assert hourly[1]["time_start"] == "2023-10-25T12:00:00+00:00"
+
+
+# Testfall 7: Rank, percentil och prisnivå för aktuell kvart
+# Förklaring: Klockan 13:00 gäller 0.10 SEK, dagens billigaste av sex kvartar.
+# Kvarten ska få rank 1, percentil 0 och nivån "very_cheap".
+async def test_rank_percentile_and_level(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa rank-, percentil- och prisnivåsensorerna."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 13:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    rank = hass.states.get("sensor.elpris_kvart_se3_prisrank_idag")
+    assert int(rank.state) == 1
+    assert rank.attributes["price_count"] == 6
+    percentile = hass.states.get("sensor.elpris_kvart_se3_prispercentil_idag")
+    assert float(percentile.state) == 0.0
+    level = hass.states.get("sensor.elpris_kvart_se3_prisniva")
+    assert level.state == "very_cheap"
+
+
+# Testfall 8: Uppdatering endast vid prisändring
+# Förklaring: Priset är 2,00 SEK hela timmen 12. Nästa uppvakning ska därför
+# ske 13:00 när priset ändras, och efter sista kända priset vid midnatt.
+async def test_change_point_scheduling(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att sensorerna bara väcks när priset faktiskt ändras."""
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_fire_time_changed,
+    )
+
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    now = dt_util.utcnow()
+    assert coordinator.next_change_after(now) == datetime(
+        2023, 10, 25, 13, 0, tzinfo=dt_util.UTC
+    )
+    assert coordinator.next_change_after(now, hourly=True) == datetime(
+        2023, 10, 25, 13, 0, tzinfo=dt_util.UTC
+    )
+    assert coordinator.next_change_after(
+        datetime(2023, 10, 25, 13, 20, tzinfo=dt_util.UTC)
+    ) == datetime(2023, 10, 26, 0, 0, tzinfo=dt_util.UTC)
+
+    entity_id = "sensor.elpris_kvart_se3_spotpris_i_sek_kwh"
+    last_updated = hass.states.get(entity_id).last_updated
+    freezer.move_to("2023-10-25 12:30:00+00:00")
+    async_fire_time_changed(hass, dt_util.utcnow())
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).last_updated == last_updated
+
+    freezer.move_to("2023-10-25 13:00:00+00:00")
+    async_fire_time_changed(hass, dt_util.utcnow())
+    await hass.async_block_till_done()
+    assert float(hass.states.get(entity_id).state) == 0.1
+
+
+# Testfall 9: Samlad uppdatering av alla entiteter
+# Förklaring: Koordinatorn räknar ut aktuellt pris en gång och skriver sedan
+# alla entiteter i samma anrop, även påslagssensorerna.
+async def test_batched_entity_updates(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att en datauppdatering skriver alla sensorer i ett pass."""
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_capture_events,
+    )
+
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert len(coordinator._entity_listeners) == 17
+    assert coordinator.current_price_sek == 2.0
+
+    events = async_capture_events(hass, "state_changed")
+    today = dt_util.now().date()
+    coordinator.all_prices[today] = [
+        {**item, "SEK_per_kWh": 3.0} if item["SEK_per_kWh"] == 2.0 else item
+        for item in coordinator.all_prices[today]
+    ]
+    coordinator._rebuild_slot_prices()
+    coordinator.async_set_updated_data(coordinator.snapshot)
+    await hass.async_block_till_done()
+
+    assert coordinator.current_price_sek == 3.0
+    changed = {event.data["entity_id"] for event in events}
+    assert "sensor.elpris_kvart_se3_spotpris_i_ore_kwh" in changed
+    assert "sensor.elpris_kvart_se3_timpris_medel_i_sek_kwh" in changed
+    assert (
+        float(hass.states.get("sensor.elpris_kvart_se3_spotpris_i_sek_kwh").state)
+        == 3.0
+    )
+    assert len(events) == len(changed)
+
+
+# Testfall 10: Oförändrad uppdatering gör inget arbete nedströms
+# Förklaring: Koordinatorn publicerar en oföränderlig ögonblicksbild med
+# version per dygn. Ger en uppdatering samma priser behålls versionen och
+# varken lyssnare eller sensorer anropas. Kommer morgondagens priser får
+# bara det dygnet en ny version. Ett historiskt dygn som laddas för en
+# fråga eller rensas ur minnet ändrar inte den publicerade versionen, och
+# laddas det om oförändrat från disk behåller det sin dygnsversion. En
+# uppdatering som inte frågar API:t ändrar inte tiden för senaste anropet.
+async def test_unchanged_refresh_skips_listeners(
+    hass: HomeAssistant, hass_storage, mock_elpris_api, freezer
+) -> None:
+    """Testa versionerad koordinatordata."""
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_capture_events,
+    )
+
+    from custom_components.elpris_kvart.const import STORAGE_VERSION
+
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+    historic = datetime(2023, 10, 20).date()
+    key = f"{DOMAIN}/se3_{historic.isoformat()}"
+    hass_storage[key] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": key,
+        "data": {
+            "prices": [
+                {
+                    "SEK_per_kWh": 0.7,
+                    "time_start": "2023-10-20T00:00:00+00:00",
+                    "time_end": "2023-10-20T01:00:00+00:00",
+                }
+            ]
+        },
+    }
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    snapshot = coordinator.data
+    today = dt_util.now().date()
+    today_version = snapshot.day_versions[today]
+    calls = []
+    coordinator.async_add_listener(lambda: calls.append(1))
+    events = async_capture_events(hass, "state_changed")
+    last_api_call = coordinator.last_api_call_timestamp
+    api_calls = mock_elpris_api.call_count
+
+    freezer.move_to("2023-10-25 12:35:00+00:00")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.data is snapshot
+    assert calls == []
+    assert events == []
+    assert mock_elpris_api.call_count == api_calls
+    assert coordinator.last_api_call_timestamp == last_api_call
+
+    freezer.move_to("2023-10-25 14:05:00+00:00")
+    mock_elpris_api.return_value = [
+        {
+            "SEK_per_kWh": 1.0,
+            "time_start": "2023-10-26T00:00:00+00:00",
+            "time_end": "2023-10-26T00:15:00+00:00",
+        }
+    ]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.data.version == snapshot.version + 1
+    assert coordinator.data.day_versions[today] == today_version
+    assert today + timedelta(days=1) in coordinator.data.day_versions
+    assert calls == [1]
+
+    snapshot = coordinator.data
+    await coordinator.async_ensure_days([historic])
+    assert coordinator.slot_prices[historic][0] == 0.7
+    historic_version = coordinator.day_versions[historic]
+    coordinator.cache.memory_budget_bytes = 0
+    assert coordinator.cache.evict() == [historic]
+    await coordinator.async_refresh()
+    assert historic not in coordinator.slot_prices
+    await coordinator.async_ensure_days([historic])
+    assert coordinator.day_versions[historic] == historic_version
+    assert coordinator.data is snapshot
+    assert calls == [1]
+
+
+# Testfall 11: Ändrade alternativ utan omladdning
+# Förklaring: Ett nytt påslag tillämpas direkt på den körande koordinatorn.
+# Priserna behålls, inga API-anrop görs och påslagssensorerna samt
+# prislistorna med påslag räknas om. Ett alternativ som lägger till
+# entiteter (energisensor) laddar däremot om posten.
+async def test_options_applied_without_reload(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att påslaget ändras utan att integrationen laddas om."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    from custom_components.elpris_kvart.const import ATTR_RAW_TODAY, CONF_ENERGY_SENSOR
+
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3"},
+        options={CONF_SURCHARGE_ORE: 10.0},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    api_calls = mock_elpris_api.call_count
+    paslag_id = "sensor.elpris_kvart_se3_spotpris_paslag_i_ore_kwh"
+    assert float(hass.states.get(paslag_id).state) == 210.0
+
+    hass.config_entries.async_update_entry(
+        config_entry, options={CONF_SURCHARGE_ORE: 25.0}
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hass.data[DOMAIN][config_entry.entry_id] is coordinator
+    assert mock_elpris_api.call_count == api_calls
+    assert float(hass.states.get(paslag_id).state) == 225.0
+    assert (
+        hass.states.get(paslag_id).attributes[ATTR_RAW_TODAY][0]["ore_per_kWh"] == 75.0
+    )
+    assert (
+        float(hass.states.get("sensor.elpris_kvart_se3_spotpris_paslag_ore_kwh").state)
+        == 25.0
+    )
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={CONF_SURCHARGE_ORE: 25.0, CONF_ENERGY_SENSOR: "sensor.energi"},
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert hass.data[DOMAIN][config_entry.entry_id] is not coordinator
+
+
+# Testfall 12: EUR-pris och växelkurs från samma hämtning
+# Förklaring: API:t levererar även EUR_per_kWh och EXR. Alla numeriska
+# kolumner sparas i dygnsraderna och EUR-sensorn samt växelkurssensorn får
+# sina värden från samma koordinator, utan extra API-anrop.
+async def test_eur_price_and_exchange_rate(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa EUR-pris och växelkurs från API-raderna."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    from custom_components.elpris_kvart.const import (
+        ATTR_RAW_TODAY,
+        ATTR_TOMORROW_PRICES_EUR,
+    )
+
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:05:00+00:00")
+    mock_elpris_api.return_value = [
+        {**item, "EUR_per_kWh": item["SEK_per_kWh"] / 11.5, "EXR": 11.5}
+        for item in MOCK_PRICES_UTC
+    ]
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    today_rows = coordinator.all_prices[datetime(2023, 10, 25).date()]
+    assert today_rows[0]["EXR"] == 11.5
+    api_calls = mock_elpris_api.call_count
+
+    eur = hass.states.get("sensor.elpris_kvart_se3_spotpris_i_eur_kwh")
+    assert float(eur.state) == round(2.0 / 11.5, 4)
+    assert eur.attributes[ATTR_RAW_TODAY][0]["EUR_per_kWh"] == round(0.5 / 11.5, 4)
+    assert eur.attributes[ATTR_TOMORROW_PRICES_EUR] == []
+    rate = hass.states.get("sensor.elpris_kvart_se3_vaxelkurs_eur_sek")
+    assert float(rate.state) == 11.5
+    assert mock_elpris_api.call_count == api_calls
@@ -0,0 +1,72 @@
+"""Simuleringstester för Elpris Kvart på en virtuell klocka."""
+
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .simulation import PriceSimulation
+
+STOCKHOLM = dt_util.get_time_zone("Europe/Stockholm")
+
+
+# Testfall 1: Några dygn kring omställningen till vintertid
+# Förklaring: Koordinatorn och sensorerna körs på en virtuell klocka genom
+# dygnet med 25 timmar, en försenad publicering och ett API-avbrott.
+# Sensorerna ska aldrig visa fel pris. Morgondagens priser hämtas tidigast
+# kl. 14 och försök görs var 30:e minut tills de finns.
+async def test_simulate_dst_late_publication_and_outage(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Simulera 2023-10-27 – 2023-10-31 i Europe/Stockholm."""
+    await hass.config.async_set_time_zone("Europe/Stockholm")
+    simulation = PriceSimulation(
+        hass,
+        freezer,
+        mock_elpris_api,
+        publication_delays={date(2023, 10, 30): timedelta(hours=3)},
+        outages=[
+            (
+                datetime(2023, 10, 30, 14, 0, tzinfo=STOCKHOLM),
+                datetime(2023, 10, 30, 16, 0, tzinfo=STOCKHOLM),
+            )
+        ],
+    )
+    report = await simulation.run(
+        datetime(2023, 10, 27, 0, 5, tzinfo=STOCKHOLM),
+        datetime(2023, 10, 31, 0, 5, tzinfo=STOCKHOLM),
+    )
+
+    assert report.stale_minutes == 0
+    assert report.fetched_dates == [
+        date(2023, 10, 27),
+        date(2023, 10, 28),
+        date(2023, 10, 29),
+        date(2023, 10, 30),
+        date(2023, 10, 31),
+    ]
+    # Förseningen 10-29 och avbrottet 10-30 ger fyra misslyckade försök var
+    # (14:05, 14:35, 15:05, 15:35); priserna hämtas 16:05.
+    assert report.failed_fetches == 8
+    assert report.tomorrow_lag_minutes == pytest.approx(2 * 65 + 5 + 185, abs=1)
+
+
+# Testfall 2: Ett helt år (körs bara på begäran)
+# Förklaring: Sätt ELPRIS_SIMULATE_YEAR=1 för att simulera 2023 och skriva
+# ut hämtningar, väckningar, tillståndsskrivningar och inaktuella minuter
+# per dygn.
+@pytest.mark.skipif(
+    not os.environ.get("ELPRIS_SIMULATE_YEAR"), reason="ELPRIS_SIMULATE_YEAR not set"
+)
+async def test_simulate_year(hass: HomeAssistant, mock_elpris_api, freezer) -> None:
+    """Simulera 2023 i Europe/Stockholm."""
+    await hass.config.async_set_time_zone("Europe/Stockholm")
+    simulation = PriceSimulation(hass, freezer, mock_elpris_api)
+    report = await simulation.run(
+        datetime(2023, 1, 1, 0, 5, tzinfo=STOCKHOLM),
+        datetime(2024, 1, 1, 0, 5, tzinfo=STOCKHOLM),
+    )
+    print(report.per_day(), f"{report.steps} steps, {report.cpu_seconds:.1f} s CPU")
+    assert report.stale_minutes == 0
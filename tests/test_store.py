@@ -0,0 +1,49 @@
+"""Tester för Elpris Kvart priscache."""
+
+from datetime import date, timedelta
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.elpris_kvart.store import PriceCache, estimate_day_size
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+# Testfall 1: LRU-utrensning och transparent omladdning från disk
+# Förklaring: Med en minnesbudget för två dygn ska det minst nyligen använda,
+# icke fastnålade dygnet släppas ur minnet men fortfarande kunna läsas från disk.
+async def test_lru_eviction_and_reload(hass: HomeAssistant, hass_storage) -> None:
+    """Testa att kalla dygn rensas ur minnet och laddas om vid behov."""
+    cache = PriceCache(hass, "SE3")
+    days = [date(2023, 10, 20) + timedelta(days=offset) for offset in range(3)]
+    for day in days:
+        await cache.async_save_day(day, MOCK_PRICES_UTC)
+
+    cache.memory_budget_bytes = 2 * estimate_day_size(MOCK_PRICES_UTC)
+    cache.pinned = {days[2]}
+    cache.get(days[0])  # Senast använd, ska därför sparas längst.
+
+    assert cache.evict() == [days[1]]
+    assert list(cache.memory) == [days[2], days[0]]
+
+    assert days[1] not in cache.memory
+    assert await cache.async_get_day(days[1]) == MOCK_PRICES_UTC
+    assert days[1] in cache.memory
+    assert cache.memory_usage_bytes > 0
+
+
+# Testfall 2: Retention tar bort dygn äldre än gränsen ur minnet
+# Förklaring: Med 2 dagars retention ska dygn före gränsen försvinna.
+async def test_prune_respects_retention(hass: HomeAssistant, hass_storage) -> None:
+    """Testa att retentionen rensar gamla dygn."""
+    cache = PriceCache(hass, "SE3")
+    today = date(2023, 10, 25)
+    for offset in range(5):
+        await cache.async_save_day(today - timedelta(days=offset), MOCK_PRICES_UTC)
+
+    await cache.async_prune(today, 2)
+    assert sorted(cache.memory) == [
+        today - timedelta(days=2),
+        today - timedelta(days=1),
+        today,
+    ]
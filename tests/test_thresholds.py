@@ -0,0 +1,93 @@
+"""Tester för Elpris Kvart tröskelhändelser."""
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    CONF_PRICE_THRESHOLDS_ORE,
+    DOMAIN,
+    EVENT_THRESHOLD_CROSSED,
+)
+from custom_components.elpris_kvart.thresholds import find_crossings
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+# Testfall 1: Beräkning av passager
+# Förklaring: En passage uppåt sker när priset går från under till minst
+# tröskeln, nedåt i motsatt fall. Luckor utan pris nollställer jämförelsen.
+def test_find_crossings() -> None:
+    """Testa find_crossings."""
+    crossings = find_crossings(
+        [0, 900, 1800, 2700, 3600],
+        [0.5, 2.0, 2.0, None, 0.1],
+        [100.0, 300.0],
+    )
+    assert [(c.timestamp, c.threshold_ore, c.direction) for c in crossings] == [
+        (900, 100.0, "above")
+    ]
+
+    crossings = find_crossings([0, 900], [2.0, 0.4], [50.0, 100.0])
+    assert [(c.threshold_ore, c.direction) for c in crossings] == [
+        (50.0, "below"),
+        (100.0, "below"),
+    ]
+
+
+# Testfall 2: Händelser vid exakt tidpunkt
+# Förklaring: Efter datahämtningen schemaläggs händelser för kommande
+# passager. De skickas först när kvarten med det nya priset börjar. Kvarten
+# 12:00 följer på en lucka utan pris och ger därför ingen händelse.
+async def test_threshold_events(hass: HomeAssistant, mock_elpris_api, freezer) -> None:
+    """Testa händelsen elpris_kvart_threshold_crossed."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 11:50:00+00:00")
+    mock_elpris_api.return_value = [
+        *MOCK_PRICES_UTC,
+        {
+            "SEK_per_kWh": 1.50,
+            "time_start": "2023-10-25T13:15:00+00:00",
+            "time_end": "2023-10-25T13:30:00+00:00",
+        },
+    ]
+    events = async_capture_events(hass, EVENT_THRESHOLD_CROSSED)
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3"},
+        options={CONF_PRICE_THRESHOLDS_ORE: [100.0]},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert events == []
+
+    for moment in ("12:00", "13:00", "13:15"):
+        freezer.move_to(f"2023-10-25 {moment}:00+00:00")
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+    assert [event.data for event in events] == [
+        {
+            "price_area": "SE3",
+            "threshold_ore": 100.0,
+            "direction": "below",
+            "price_ore": 10.0,
+            "previous_price_ore": 200.0,
+        },
+        {
+            "price_area": "SE3",
+            "threshold_ore": 100.0,
+            "direction": "above",
+            "price_ore": 150.0,
+            "previous_price_ore": 10.0,
+        },
+    ]
@@ -0,0 +1,95 @@
+"""Tester för Elpris Kvart kvartstidslinje."""
+
+from datetime import date, datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    CONF_SURCHARGE_ORE,
+    DOMAIN,
+)
+from custom_components.elpris_kvart.timeline import SlotTimeline
+
+STOCKHOLM = dt_util.get_time_zone("Europe/Stockholm")
+
+
+# Testfall 1: Antal kvartar per dygn vid sommartid/vintertid
+# Förklaring: Ett normalt dygn har 96 kvartar, dygnet då klockan ställs fram
+# har 92 och dygnet då den ställs tillbaka har 100.
+def test_slot_count_on_dst_days() -> None:
+    """Testa att tidslinjen får rätt antal kvartar på DST-dygn."""
+    assert len(SlotTimeline(date(2023, 10, 25), STOCKHOLM)) == 96
+    assert len(SlotTimeline(date(2023, 3, 26), STOCKHOLM)) == 92
+    assert len(SlotTimeline(date(2023, 10, 29), STOCKHOLM)) == 100
+
+
+# Testfall 2: Kvartsindex, UTC-tid och lokal etikett
+# Förklaring: Den 29 oktober förekommer 02:00 två gånger lokalt. Kvart 8 är
+# 02:00 sommartid (00:00 UTC) och kvart 12 är 02:00 vintertid (01:00 UTC).
+def test_slot_mapping_on_autumn_dst_day() -> None:
+    """Testa mappningen index <-> UTC <-> etikett under dubbeltimmen."""
+    timeline = SlotTimeline(date(2023, 10, 29), STOCKHOLM)
+
+    first = datetime(2023, 10, 29, 0, 0, tzinfo=dt_util.UTC)
+    second = datetime(2023, 10, 29, 1, 0, tzinfo=dt_util.UTC)
+    assert timeline.slot_at(first.timestamp()) == 8
+    assert timeline.slot_at(second.timestamp()) == 12
+    assert timeline.label(8) == timeline.label(12) == "02:00"
+    assert timeline.slot_start(12) == second
+    assert timeline.label(99) == "23:45"
+    assert timeline.slot_at(timeline.end_ts) is None
+
+
+# Testfall 3: Sensorn väljer rätt pris under den upprepade timmen
+# Förklaring: Klockan 02:15 vintertid ska priset för den andra 02:00-timmen
+# användas, inte det från sommartid.
+async def test_sensor_price_during_repeated_hour(
+    hass: HomeAssistant, mock_elpris_api, freezer
+) -> None:
+    """Testa att sensorn hanterar den upprepade timmen vid DST."""
+    await hass.config.async_set_time_zone("Europe/Stockholm")
+    freezer.move_to("2023-10-29 01:15:00+00:00")
+
+    mock_elpris_api.return_value = [
+        {
+            "SEK_per_kWh": 1.00,
+            "time_start": "2023-10-29T02:00:00+02:00",
+            "time_end": "2023-10-29T02:00:00+01:00",
+        },
+        {
+            "SEK_per_kWh": 3.00,
+            "time_start": "2023-10-29T02:00:00+01:00",
+            "time_end": "2023-10-29T03:00:00+01:00",
+        },
+    ]
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_PRICE_AREA: "SE3", CONF_SURCHARGE_ORE: 0.0},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.elpris_kvart_se3_spotpris_i_ore_kwh")
+    assert state is not None
+    assert float(state.state) == 300.0
+
+
+# Testfall 4: Timaggregat på dygnet då klockan ställs tillbaka
+# Förklaring: 100 kvartar ska ge 25 timmar där båda 02:00-timmarna hålls isär.
+def test_hourly_aggregate_on_autumn_dst_day() -> None:
+    """Testa att timaggregaten blir 25 timmar på DST-dygnet."""
+    from custom_components.elpris_kvart import ElprisDataUpdateCoordinator
+
+    timeline = SlotTimeline(date(2023, 10, 29), STOCKHOLM)
+    slots = [float(slot // 4) for slot in range(len(timeline))]
+
+    hours, hour_of_slot = ElprisDataUpdateCoordinator._aggregate_hours(timeline, slots)
+    assert len(hours) == 25
+    assert hours[2]["time_start"] != hours[3]["time_start"]
+    assert hours[3]["mean"] == 3.0
+    assert hour_of_slot[99] == 24
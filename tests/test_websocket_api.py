@@ -0,0 +1,157 @@
+"""Tester för Elpris Kvart websocket-API."""
+
+from datetime import date
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elpris_kvart.const import (
+    CONF_PRICE_AREA,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+
+from .test_sensor import MOCK_PRICES_UTC
+
+
+async def _setup_entry(hass: HomeAssistant, mock_elpris_api, freezer) -> None:
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2023-10-25 12:15:00+00:00")
+    mock_elpris_api.return_value = MOCK_PRICES_UTC
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_AREA: "SE3"})
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+# Testfall 1: Hämta dagens priser i kolumnformat
+# Förklaring: Kommandot ska returnera starttider (epoch) och värden i separata
+# listor, i öre med kvartsupplösning, och timmedel med timupplösning.
+async def test_get_prices(
+    hass: HomeAssistant, hass_ws_client, mock_elpris_api, freezer
+) -> None:
+    """Testa kommandot elpris_kvart/prices."""
+    # Anslut innan tiden fryses, annars blir åtkomsttoken ogiltig.
+    client = await hass_ws_client(hass)
+    await _setup_entry(hass, mock_elpris_api, freezer)
+
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "elpris_kvart/prices",
+            "area": "SE3",
+            "start_date": "2023-10-25",
+            "end_date": "2023-10-25",
+            "unit": "ore",
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    result = response["result"]
+    assert result["unit"] == "öre/kWh"
+    assert result["value"] == [50.0, 200.0, 200.0, 200.0, 200.0, 10.0]
+    assert result["start"][0] == 1698192000
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": "elpris_kvart/prices",
+            "area": "SE3",
+            "resolution": "hour",
+        }
+    )
+    response = await client.receive_json()
+    assert response["result"]["value"] == [0.5, 2.0, 0.1]
+
+    await client.send_json({"id": 3, "type": "elpris_kvart/prices", "area": "SE1"})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "not_found"
+
+
+# Testfall 2: Prenumeration skickar bara när datan ändras
+# Förklaring: Första svaret innehåller serien direkt. En uppdatering av
+# koordinatorn med samma data ska inte skicka något nytt meddelande.
+async def test_subscribe_prices(
+    hass: HomeAssistant, hass_ws_client, mock_elpris_api, freezer
+) -> None:
+    """Testa kommandot elpris_kvart/subscribe_prices."""
+    # Anslut innan tiden fryses, annars blir åtkomsttoken ogiltig.
+    client = await hass_ws_client(hass)
+    await _setup_entry(hass, mock_elpris_api, freezer)
+
+    await client.send_json(
+        {"id": 1, "type": "elpris_kvart/subscribe_prices", "area": "SE3"}
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    event = await client.receive_json()
+    assert len(event["event"]["value"]) == 6
+
+    coordinator = next(iter(hass.data[DOMAIN].values()))
+    coordinator.async_update_listeners()
+
+    today = next(iter(coordinator.all_prices))
+    coordinator.all_prices[today] = MOCK_PRICES_UTC[:2]
+    coordinator._rebuild_slot_prices()
+    coordinator.async_update_listeners()
+    event = await client.receive_json()
+    assert event["id"] == 1
+    assert event["event"]["value"] == [0.5, 2.0]
+
+
+# Testfall 3: Prenumererade dygn stannar i minnet
+# Förklaring: Ett historiskt dygn i en öppen prenumeration rensas inte ur
+# minnet, så nästa utskick innehåller fortfarande hela serien. När
+# prenumerationen avslutas kan dygnet rensas igen.
+async def test_subscription_pins_days(
+    hass: HomeAssistant, hass_storage, hass_ws_client, mock_elpris_api, freezer
+) -> None:
+    """Testa att prenumerationen håller sina dygn i minnet."""
+    # Anslut innan tiden fryses, annars blir åtkomsttoken ogiltig.
+    client = await hass_ws_client(hass)
+    key = f"{DOMAIN}/se3_2023-10-20"
+    hass_storage[key] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": key,
+        "data": {
+            "prices": [
+                {
+                    "SEK_per_kWh": 0.7,
+                    "time_start": "2023-10-20T00:00:00+00:00",
+                    "time_end": "2023-10-20T00:15:00+00:00",
+                }
+            ]
+        },
+    }
+    await _setup_entry(hass, mock_elpris_api, freezer)
+    coordinator = next(iter(hass.data[DOMAIN].values()))
+    historic = date(2023, 10, 20)
+
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "elpris_kvart/subscribe_prices",
+            "area": "SE3",
+            "start_date": "2023-10-20",
+            "end_date": "2023-10-25",
+        }
+    )
+    assert (await client.receive_json())["success"]
+    event = await client.receive_json()
+    assert event["event"]["value"][0] == 0.7
+
+    coordinator.cache.memory_budget_bytes = 0
+    assert historic not in coordinator.cache.evict()
+    today = date(2023, 10, 25)
+    coordinator.all_prices[today] = MOCK_PRICES_UTC[:2]
+    coordinator._rebuild_slot_prices()
+    coordinator.async_update_listeners()
+    event = await client.receive_json()
+    assert event["event"]["value"] == [0.7, 0.5, 2.0]
+
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    assert (await client.receive_json())["success"]
+    assert historic in coordinator.cache.evict()